@@ -0,0 +1,63 @@
+"""
+Result Cache - Content-Hash LRU
+In-memory cache for pipeline results keyed by a hash of the input bytes.
+"""
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+
+class ResultCache:
+    """
+    In-memory LRU cache of pipeline results keyed by content hash.
+    
+    Results must provide to_dict(). Entries are sized by their
+    serialized result; least recently used entries are evicted once
+    the total exceeds max_bytes.
+    """
+    
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+    
+    @staticmethod
+    def make_key(data: bytes, *options: Any) -> str:
+        """Key on the input contents and the processing options."""
+        digest = hashlib.sha256(data).hexdigest()
+        return ':'.join([digest, *(str(o) for o in options)])
+    
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+    
+    def put(self, key: str, result: Any) -> None:
+        size = len(json.dumps(result.to_dict(), default=str))
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self.total_bytes -= self._entries.pop(key)[1]
+        
+        self._entries[key] = (result, size)
+        self.total_bytes += size
+        
+        while self.total_bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.total_bytes -= evicted
+            self.evictions += 1
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def clear(self) -> None:
+        self._entries.clear()
+        self.total_bytes = 0
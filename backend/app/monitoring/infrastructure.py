@@ -178,6 +178,29 @@ class InfrastructureMetrics:
         registry=registry
     )
     
+    # OCR metrics
+    ocr_documents_total = Counter(
+        'cerebrum_ocr_documents_total',
+        'Total OCR documents by result source',
+        ['source', 'status'],
+        registry=registry
+    )
+    
+    ocr_pages_total = Counter(
+        'cerebrum_ocr_pages_total',
+        'Total OCR pages by result source',
+        ['source'],
+        registry=registry
+    )
+    
+    ocr_document_duration = Histogram(
+        'cerebrum_ocr_document_duration_seconds',
+        'OCR document processing time',
+        ['source'],
+        buckets=[0.01, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0],
+        registry=registry
+    )
+    
     # Business metrics
     active_users = Gauge(
         'cerebrum_active_users',
@@ -262,6 +285,17 @@ class InfrastructureMetrics:
             ratio = hits / total
             self.cache_hit_ratio.labels(cache=cache).set(ratio)
     
+    def record_ocr_document(self, source: str, duration: float, pages: int, success: bool = True):
+        """Record an OCR document; source is 'ocr', 'text_layer' or 'cache'"""
+        self.ocr_documents_total.labels(
+            source=source,
+            status='success' if success else 'error'
+        ).inc()
+        
+        if success:
+            self.ocr_pages_total.labels(source=source).inc(pages)
+            self.ocr_document_duration.labels(source=source).observe(duration)
+    
     def record_queue_depth(self, queue: str, depth: int):
         """Record queue depth"""
         self.queue_depth.labels(queue=queue).set(depth)
@@ -477,6 +511,16 @@ class GrafanaDashboardGenerator:
                         'cerebrum_cache_hit_ratio',
                         16, 11, 8, 8
                     ),
+                    self._generate_graph_panel(
+                        'OCR Pages per Second',
+                        'sum(rate(cerebrum_ocr_pages_total[5m])) by (source)',
+                        0, 19, 12, 8
+                    ),
+                    self._generate_graph_panel(
+                        'OCR Cache Hit Ratio',
+                        'cerebrum_cache_hit_ratio{cache="ocr"}',
+                        12, 19, 12, 8
+                    ),
                 ]
             },
             'overwrite': True
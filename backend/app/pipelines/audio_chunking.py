@@ -5,15 +5,17 @@ Splits audio files and processes them in parallel for transcription.
 
 import io
 import asyncio
-from typing import Optional, Dict, List, Any, Tuple, Callable
+from collections import deque
+from typing import Optional, Dict, List, Any, Tuple, Callable, AsyncIterator
 from dataclasses import dataclass, field
 from pathlib import Path
 import tempfile
 import os
 
+import numpy as np
+
 try:
     from pydub import AudioSegment
-    from pydub.silence import detect_nonsilent
     PYDUB_AVAILABLE = True
 except ImportError:
     PYDUB_AVAILABLE = False
@@ -22,6 +24,10 @@ from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Whisper resamples to 16 kHz mono, so decode straight to that
+DECODE_SAMPLE_RATE = 16000
+FRAME_MS = 10
+
 
 @dataclass
 class AudioChunk:
@@ -60,6 +66,314 @@ class ChunkingResult:
         }
 
 
+def frame_dbfs(samples: np.ndarray, frame_size: int) -> np.ndarray:
+    """RMS level in dBFS of consecutive frames of int16 PCM (partial tail dropped)."""
+    n_frames = len(samples) // frame_size
+    frames = samples[:n_frames * frame_size].reshape(n_frames, frame_size).astype(np.float32)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    with np.errstate(divide='ignore'):
+        return 20 * np.log10(rms / 32768.0)
+
+
+class PCMBuffer:
+    """
+    Mono int16 sample buffer addressed by absolute sample position.
+    
+    Consumed samples are dropped from the front and the backing array is
+    compacted only once the dropped prefix outweighs the live window, so
+    memory follows the retained window rather than the recording.
+    """
+    
+    def __init__(self, capacity: int = DECODE_SAMPLE_RATE * 60):
+        self._data = np.empty(capacity, dtype=np.int16)
+        self._head = 0
+        self._tail = 0
+        self.start = 0  # absolute position of the first live sample
+    
+    @property
+    def end(self) -> int:
+        return self.start + self._tail - self._head
+    
+    def append(self, samples: np.ndarray) -> None:
+        needed = self._tail + len(samples)
+        if needed > len(self._data):
+            live = self._tail - self._head
+            if live + len(samples) > len(self._data) // 2:
+                data = np.empty(max(2 * len(self._data), 2 * (live + len(samples))), dtype=np.int16)
+            else:
+                data = self._data
+            data[:live] = self._data[self._head:self._tail]
+            self._data, self._head, self._tail = data, 0, live
+            needed = live + len(samples)
+        self._data[self._tail:needed] = samples
+        self._tail = needed
+    
+    def view(self, start: int, end: int) -> np.ndarray:
+        """Samples in [start, end); a view, copy before the buffer moves on."""
+        return self._data[self._head + start - self.start:self._head + end - self.start]
+    
+    def discard_before(self, position: int) -> None:
+        drop = min(max(0, position - self.start), self._tail - self._head)
+        self._head += drop
+        self.start += drop
+
+
+class _DurationSegmenter:
+    """Fixed windows of chunk samples, each reaching back by overlap."""
+    
+    def __init__(self, chunk: int, overlap: int):
+        self.chunk = chunk
+        self.overlap = overlap
+        self.position = 0
+    
+    @property
+    def keep_from(self) -> int:
+        return max(0, self.position - self.overlap)
+    
+    def feed(self, buffer: PCMBuffer, final: bool = False) -> List[Tuple[int, int]]:
+        ranges = []
+        while self.position + self.chunk <= buffer.end or (final and self.position < buffer.end):
+            ranges.append((self.keep_from, min(buffer.end, self.position + self.chunk)))
+            self.position += self.chunk
+        return ranges
+
+
+class _SilenceSegmenter:
+    """
+    Non-silent ranges from frame RMS levels, found incrementally.
+    
+    A range closes once min_silence frames below the threshold follow
+    it; it is padded by keep samples on both sides and dropped if
+    shorter than min_length. Padded ranges longer than max_length are
+    cut into max_length pieces plus a remainder; pieces are emitted
+    while the range is still open once its padded end is known to be
+    past them.
+    """
+    
+    def __init__(
+        self,
+        frame: int,
+        min_silence: int,
+        threshold: float,
+        keep: int,
+        min_length: int,
+        max_length: int
+    ):
+        self.frame = frame
+        self.min_silence = min_silence
+        self.threshold = threshold
+        self.keep = keep
+        self.min_length = min_length
+        self.max_length = max_length
+        self.analyzed = 0  # frames
+        self.range_start: Optional[int] = None  # samples, padded
+        self.last_voiced = 0  # frames
+        self.split = False
+        self.closing: List[Tuple[int, int, bool]] = []
+    
+    @property
+    def keep_from(self) -> int:
+        starts = [start for start, _, _ in self.closing]
+        if self.range_start is not None:
+            starts.append(self.range_start)
+        starts.append(self.analyzed * self.frame - self.keep)
+        return max(0, min(starts))
+    
+    def feed(self, buffer: PCMBuffer, final: bool = False) -> List[Tuple[int, int]]:
+        ranges = []
+        complete = buffer.end // self.frame
+        
+        if complete > self.analyzed:
+            base = self.analyzed
+            silent = frame_dbfs(
+                buffer.view(base * self.frame, complete * self.frame), self.frame
+            ) < self.threshold
+            self.analyzed = complete
+            
+            # Run-length encode the block and walk the runs
+            changes = np.flatnonzero(np.diff(silent.view(np.int8))) + 1
+            for run_start, run_end in zip(
+                np.concatenate(([0], changes)).tolist(),
+                np.concatenate((changes, [len(silent)])).tolist()
+            ):
+                if not silent[run_start]:
+                    if self.range_start is None:
+                        self.range_start = max(0, (base + run_start) * self.frame - self.keep)
+                        self.split = False
+                    self.last_voiced = base + run_end
+                    
+                    padded_end = min(self.last_voiced * self.frame + self.keep, buffer.end)
+                    while padded_end - self.range_start > self.max_length:
+                        ranges.append((self.range_start, self.range_start + self.max_length))
+                        self.range_start += self.max_length
+                        self.split = True
+                
+                elif self.range_start is not None and base + run_end - self.last_voiced >= self.min_silence:
+                    self._close()
+        
+        if final and self.range_start is not None:
+            self._close()
+        
+        # Emit closed ranges once their trailing padding has been decoded
+        waiting = []
+        for start, end, split in self.closing:
+            if end <= buffer.end or final:
+                end = min(end, buffer.end)
+                while end - start > self.max_length:
+                    ranges.append((start, start + self.max_length))
+                    start += self.max_length
+                    split = True
+                if split or end - start >= self.min_length:
+                    ranges.append((start, end))
+            else:
+                waiting.append((start, end, split))
+        self.closing = waiting
+        
+        return sorted(ranges)
+    
+    def _close(self) -> None:
+        end = self.last_voiced * self.frame + self.keep
+        if end > self.range_start:
+            self.closing.append((self.range_start, end, self.split))
+        self.range_start = None
+
+
+async def decode_pcm(
+    audio_data: bytes,
+    filename: str,
+    sample_rate: int = DECODE_SAMPLE_RATE,
+    block_seconds: float = 1.0
+) -> AsyncIterator[np.ndarray]:
+    """
+    Decode audio to mono int16 PCM blocks with an ffmpeg subprocess.
+    
+    Args:
+        audio_data: Raw audio/video bytes
+        filename: Original filename (container hint)
+        sample_rate: Output sample rate
+        block_seconds: Seconds of audio per yielded block
+    
+    Yields:
+        int16 sample arrays
+    """
+    suffix = Path(filename).suffix or '.mp3'
+    converter = AudioSegment.converter if PYDUB_AVAILABLE else 'ffmpeg'
+    block_bytes = int(sample_rate * block_seconds) * 2
+    
+    # A file rather than stdin lets ffmpeg seek (e.g. MP4 with a trailing moov atom)
+    with tempfile.NamedTemporaryFile(suffix=suffix) as source:
+        source.write(audio_data)
+        source.flush()
+        
+        process = await asyncio.create_subprocess_exec(
+            converter, '-nostdin', '-v', 'error', '-i', source.name,
+            '-f', 's16le', '-ac', '1', '-ar', str(sample_rate), 'pipe:1',
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            while True:
+                try:
+                    data = await process.stdout.readexactly(block_bytes)
+                except asyncio.IncompleteReadError as e:
+                    data = e.partial[:len(e.partial) // 2 * 2]
+                    if data:
+                        yield np.frombuffer(data, dtype='<i2')
+                    break
+                yield np.frombuffer(data, dtype='<i2')
+            
+            if await process.wait() != 0:
+                error = (await process.stderr.read()).decode(errors='replace').strip()
+                raise RuntimeError(f"Audio decoding failed: {error}")
+        finally:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+
+
+def _encode_pcm(samples: np.ndarray, sample_rate: int, format: str) -> bytes:
+    """Encode mono int16 PCM; blocking, run in an executor."""
+    audio = AudioSegment(samples.tobytes(), sample_width=2, frame_rate=sample_rate, channels=1)
+    buffer = io.BytesIO()
+    audio.export(buffer, format=format)
+    return buffer.getvalue()
+
+
+class AudioChunkStream:
+    """
+    Encoded chunks yielded as soon as they are ready.
+    
+    PCM blocks are segmented as they arrive and each chunk is encoded in
+    an executor while decoding continues; chunks come out in index
+    order with at most max_pending encodes outstanding. total_duration
+    grows as audio is decoded and is final once iteration ends.
+    """
+    
+    def __init__(
+        self,
+        blocks: AsyncIterator[np.ndarray],
+        segmenter: Any,
+        sample_rate: int = DECODE_SAMPLE_RATE,
+        format: str = "mp3",
+        max_pending: Optional[int] = None
+    ):
+        self.blocks = blocks
+        self.segmenter = segmenter
+        self.sample_rate = sample_rate
+        self.format = format
+        self.max_pending = max_pending or os.cpu_count() or 1
+        self.total_duration = 0.0
+        self.chunk_count = 0
+    
+    def __aiter__(self) -> AsyncIterator[AudioChunk]:
+        return self._run()
+    
+    async def _run(self) -> AsyncIterator[AudioChunk]:
+        buffer = PCMBuffer()
+        pending: deque = deque()
+        
+        try:
+            async for block in self.blocks:
+                buffer.append(block)
+                self.total_duration = buffer.end / self.sample_rate
+                
+                for start, end in self.segmenter.feed(buffer):
+                    pending.append(self._encode(buffer, start, end))
+                buffer.discard_before(self.segmenter.keep_from)
+                
+                while pending and (pending[0].done() or len(pending) > self.max_pending):
+                    yield await pending.popleft()
+            
+            for start, end in self.segmenter.feed(buffer, final=True):
+                pending.append(self._encode(buffer, start, end))
+            
+            while pending:
+                yield await pending.popleft()
+        
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    def _encode(self, buffer: PCMBuffer, start: int, end: int) -> asyncio.Future:
+        samples = buffer.view(start, end).copy()
+        index = self.chunk_count
+        self.chunk_count += 1
+        
+        async def encode() -> AudioChunk:
+            loop = asyncio.get_running_loop()
+            data = await loop.run_in_executor(None, _encode_pcm, samples, self.sample_rate, self.format)
+            return AudioChunk(
+                index=index,
+                data=data,
+                start_time=start / self.sample_rate,
+                end_time=end / self.sample_rate,
+                duration=(end - start) / self.sample_rate,
+                format=self.format
+            )
+        
+        return asyncio.ensure_future(encode())
+
+
 class AudioChunker:
     """
     Audio chunking utility with multiple strategies.
@@ -81,6 +395,74 @@ class AudioChunker:
         if not PYDUB_AVAILABLE:
             raise ImportError("pydub is required for audio chunking")
     
+    def stream_by_duration(
+        self,
+        audio_data: bytes,
+        filename: str,
+        target_duration: Optional[int] = None,
+        format: str = "mp3",
+        sample_rate: int = DECODE_SAMPLE_RATE
+    ) -> AudioChunkStream:
+        """
+        Stream fixed-duration chunks while the audio is decoded.
+        
+        Args:
+            audio_data: Raw audio bytes
+            filename: Original filename
+            target_duration: Target chunk duration in seconds
+            format: Chunk encoding
+            sample_rate: Decoded (mono) sample rate
+        
+        Returns:
+            AudioChunkStream of chunks overlapping by self.overlap seconds
+        """
+        target = target_duration or self.chunk_duration
+        segmenter = _DurationSegmenter(target * sample_rate, self.overlap * sample_rate)
+        return AudioChunkStream(
+            decode_pcm(audio_data, filename, sample_rate), segmenter, sample_rate, format
+        )
+    
+    def stream_by_silence(
+        self,
+        audio_data: bytes,
+        filename: str,
+        min_silence_len: int = 500,  # ms
+        silence_thresh: int = -40,  # dBFS
+        keep_silence: int = 300,  # ms
+        format: str = "mp3",
+        sample_rate: int = DECODE_SAMPLE_RATE
+    ) -> AudioChunkStream:
+        """
+        Stream chunks split at silences while the audio is decoded.
+        
+        Silence is detected on 10 ms frame RMS levels computed with NumPy
+        over each decoded block.
+        
+        Args:
+            audio_data: Raw audio bytes
+            filename: Original filename
+            min_silence_len: Minimum silence length to consider
+            silence_thresh: Silence threshold in dBFS
+            keep_silence: Amount of silence to keep at boundaries
+            format: Chunk encoding
+            sample_rate: Decoded (mono) sample rate
+        
+        Returns:
+            AudioChunkStream of speech chunks
+        """
+        frame = sample_rate * FRAME_MS // 1000
+        segmenter = _SilenceSegmenter(
+            frame=frame,
+            min_silence=max(1, min_silence_len // FRAME_MS),
+            threshold=silence_thresh,
+            keep=keep_silence * sample_rate // 1000,
+            min_length=self.min_chunk_duration * sample_rate,
+            max_length=self.max_chunk_duration * sample_rate
+        )
+        return AudioChunkStream(
+            decode_pcm(audio_data, filename, sample_rate), segmenter, sample_rate, format
+        )
+    
     async def chunk_by_duration(
         self,
         audio_data: bytes,
@@ -98,57 +480,8 @@ class AudioChunker:
         Returns:
             ChunkingResult with audio chunks
         """
-        import time
-        start_time = time.time()
-        
-        target = target_duration or self.chunk_duration
-        
         try:
-            # Load audio
-            audio = await self._load_audio(audio_data, filename)
-            
-            total_duration = len(audio) / 1000  # Convert to seconds
-            chunks = []
-            
-            chunk_length = target * 1000  # Convert to milliseconds
-            overlap_length = self.overlap * 1000
-            
-            chunk_index = 0
-            position = 0
-            
-            while position < len(audio):
-                # Calculate chunk boundaries
-                chunk_start = max(0, position - overlap_length)
-                chunk_end = min(len(audio), position + chunk_length)
-                
-                # Extract chunk
-                chunk_audio = audio[chunk_start:chunk_end]
-                
-                # Export to bytes
-                chunk_data = await self._export_chunk(chunk_audio, "mp3")
-                
-                chunk = AudioChunk(
-                    index=chunk_index,
-                    data=chunk_data,
-                    start_time=chunk_start / 1000,
-                    end_time=chunk_end / 1000,
-                    duration=(chunk_end - chunk_start) / 1000,
-                    format="mp3"
-                )
-                chunks.append(chunk)
-                
-                position += chunk_length
-                chunk_index += 1
-            
-            processing_time = time.time() - start_time
-            
-            return ChunkingResult(
-                chunks=chunks,
-                total_duration=total_duration,
-                total_chunks=len(chunks),
-                processing_time=processing_time
-            )
-            
+            return await self._collect(self.stream_by_duration(audio_data, filename, target_duration))
         except Exception as e:
             logger.error(f"Duration-based chunking failed: {e}")
             raise
@@ -174,71 +507,27 @@ class AudioChunker:
         Returns:
             ChunkingResult with audio chunks
         """
-        import time
-        start_time = time.time()
-        
         try:
-            # Load audio
-            audio = await self._load_audio(audio_data, filename)
-            total_duration = len(audio) / 1000
-            
-            # Detect non-silent ranges
-            nonsilent_ranges = detect_nonsilent(
-                audio,
-                min_silence_len=min_silence_len,
-                silence_thresh=silence_thresh
-            )
-            
-            chunks = []
-            chunk_index = 0
-            
-            for start, end in nonsilent_ranges:
-                # Add padding
-                chunk_start = max(0, start - keep_silence)
-                chunk_end = min(len(audio), end + keep_silence)
-                
-                # Extract chunk
-                chunk_audio = audio[chunk_start:chunk_end]
-                
-                # Skip if too short
-                if len(chunk_audio) < self.min_chunk_duration * 1000:
-                    continue
-                
-                # Split if too long
-                if len(chunk_audio) > self.max_chunk_duration * 1000:
-                    sub_chunks = await self._split_large_chunk(
-                        chunk_audio, chunk_index, chunk_start / 1000
-                    )
-                    chunks.extend(sub_chunks)
-                    chunk_index += len(sub_chunks)
-                else:
-                    # Export to bytes
-                    chunk_data = await self._export_chunk(chunk_audio, "mp3")
-                    
-                    chunk = AudioChunk(
-                        index=chunk_index,
-                        data=chunk_data,
-                        start_time=chunk_start / 1000,
-                        end_time=chunk_end / 1000,
-                        duration=(chunk_end - chunk_start) / 1000,
-                        format="mp3"
-                    )
-                    chunks.append(chunk)
-                    chunk_index += 1
-            
-            processing_time = time.time() - start_time
-            
-            return ChunkingResult(
-                chunks=chunks,
-                total_duration=total_duration,
-                total_chunks=len(chunks),
-                processing_time=processing_time
-            )
-            
+            return await self._collect(self.stream_by_silence(
+                audio_data, filename, min_silence_len, silence_thresh, keep_silence
+            ))
         except Exception as e:
             logger.error(f"Silence-based chunking failed: {e}")
             raise
     
+    async def _collect(self, stream: AudioChunkStream) -> ChunkingResult:
+        import time
+        start_time = time.time()
+        
+        chunks = [chunk async for chunk in stream]
+        
+        return ChunkingResult(
+            chunks=chunks,
+            total_duration=stream.total_duration,
+            total_chunks=len(chunks),
+            processing_time=time.time() - start_time
+        )
+    
     async def chunk_by_sentences(
         self,
         audio_data: bytes,
@@ -322,32 +611,6 @@ class AudioChunker:
         audio.export(buffer, format=format)
         return buffer.getvalue()
     
-    async def _split_large_chunk(
-        self,
-        audio: AudioSegment,
-        start_index: int,
-        start_time: float
-    ) -> List[AudioChunk]:
-        """Split a large chunk into smaller pieces."""
-        chunks = []
-        chunk_length = self.max_chunk_duration * 1000
-        
-        for i in range(0, len(audio), chunk_length):
-            chunk_audio = audio[i:i + chunk_length]
-            chunk_data = await self._export_chunk(chunk_audio, "mp3")
-            
-            chunk = AudioChunk(
-                index=start_index + i // chunk_length,
-                data=chunk_data,
-                start_time=start_time + i / 1000,
-                end_time=start_time + min(i + chunk_length, len(audio)) / 1000,
-                duration=min(chunk_length, len(audio) - i) / 1000,
-                format="mp3"
-            )
-            chunks.append(chunk)
-        
-        return chunks
-    
     async def _create_chunk_from_segments(
         self,
         audio: AudioSegment,
@@ -418,6 +681,55 @@ class ParallelProcessor:
                 progress_callback(len(results), len(chunks))
         
         return results
+    
+    async def process_stream(
+        self,
+        chunks: AsyncIterator[AudioChunk],
+        processor: Callable[[AudioChunk], Any],
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> Tuple[List[AudioChunk], List[Any]]:
+        """
+        Process chunks as they are produced.
+        
+        Each chunk is submitted on arrival, so processing overlaps
+        chunking. Progress totals count the chunks seen so far.
+        
+        Args:
+            chunks: Async iterator of audio chunks
+            processor: Async function to process each chunk
+            progress_callback: Optional progress callback
+        
+        Returns:
+            Chunks (data released) and results, both in chunk order
+        """
+        semaphore = asyncio.Semaphore(self.max_workers)
+        seen: List[AudioChunk] = []
+        done = 0
+        
+        async def process_with_limit(chunk: AudioChunk) -> Any:
+            nonlocal done
+            async with semaphore:
+                result = await processor(chunk)
+            done += 1
+            if progress_callback:
+                progress_callback(done, len(seen))
+            return result
+        
+        tasks = []
+        try:
+            async for chunk in chunks:
+                seen.append(chunk)
+                tasks.append(asyncio.ensure_future(process_with_limit(chunk)))
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        
+        # Keep chunk metadata only; audio bytes are no longer needed
+        for chunk in seen:
+            chunk.data = b""
+        return seen, list(results)
 
 
 class AudioProcessingPipeline:
@@ -454,26 +766,28 @@ class AudioProcessingPipeline:
         Returns:
             Dictionary with chunking info and processing results
         """
-        # Chunk audio
+        import time
+        start_time = time.time()
+        
+        # Stream chunks so processing overlaps decoding
         if self.chunking_strategy == "duration":
-            chunking_result = await self.chunker.chunk_by_duration(
-                audio_data, filename, **chunking_kwargs
-            )
+            stream = self.chunker.stream_by_duration(audio_data, filename, **chunking_kwargs)
         elif self.chunking_strategy == "silence":
-            chunking_result = await self.chunker.chunk_by_silence(
-                audio_data, filename, **chunking_kwargs
-            )
+            stream = self.chunker.stream_by_silence(audio_data, filename, **chunking_kwargs)
         else:
             raise ValueError(f"Unknown chunking strategy: {self.chunking_strategy}")
         
-        logger.info(f"Created {chunking_result.total_chunks} chunks")
+        chunks, results = await self.parallel_processor.process_stream(
+            stream, processor, progress_callback
+        )
         
-        # Process chunks in parallel
-        results = await self.parallel_processor.process_chunks(
-            chunking_result.chunks,
-            processor,
-            progress_callback
+        chunking_result = ChunkingResult(
+            chunks=chunks,
+            total_duration=stream.total_duration,
+            total_chunks=len(chunks),
+            processing_time=time.time() - start_time
         )
+        logger.info(f"Created {chunking_result.total_chunks} chunks")
         
         return {
             "chunking": chunking_result.to_dict(),
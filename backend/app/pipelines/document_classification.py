@@ -111,6 +111,24 @@ class LayoutLMClassifier:
         11: (DocumentType.MEETING_MINUTES, DocumentCategory.COMMUNICATION),
     }
     
+    CATEGORY_MAPPING = dict(TYPE_MAPPING.values())
+    
+    # Keywords for rule-based classification
+    KEYWORDS = {
+        DocumentType.CONTRACT: ['contract', 'agreement', 'terms', 'conditions', 'parties'],
+        DocumentType.INVOICE: ['invoice', 'bill', 'payment due', 'total amount', 'subtotal'],
+        DocumentType.RECEIPT: ['receipt', 'paid', 'transaction', 'thank you'],
+        DocumentType.DRAWING: ['drawing', 'plan', 'elevation', 'section', 'detail'],
+        DocumentType.SPECIFICATION: ['specification', 'spec', 'requirements', 'standards'],
+        DocumentType.PERMIT: ['permit', 'approval', 'authorized', 'license'],
+        DocumentType.REPORT: ['report', 'analysis', 'findings', 'summary'],
+        DocumentType.CHANGE_ORDER: ['change order', 'variation', 'modification', 'additional'],
+        DocumentType.RFQ: ['rfq', 'request for quote', 'quotation', 'bid'],
+        DocumentType.SUBMITTAL: ['submittal', 'shop drawing', 'product data', 'sample'],
+        DocumentType.CORRESPONDENCE: ['letter', 'email', 'regarding', 'dear', 'sincerely'],
+        DocumentType.MEETING_MINUTES: ['minutes', 'meeting', 'attendees', 'action items'],
+    }
+    
     def __init__(self, model_path: Optional[str] = None):
         self.model = None
         self.processor = None
@@ -220,26 +238,11 @@ class LayoutLMClassifier:
         text_lower = text.lower()
         
         # Keyword-based classification
-        keywords = {
-            DocumentType.CONTRACT: ['contract', 'agreement', 'terms', 'conditions', 'parties'],
-            DocumentType.INVOICE: ['invoice', 'bill', 'payment due', 'total amount', 'subtotal'],
-            DocumentType.RECEIPT: ['receipt', 'paid', 'transaction', 'thank you'],
-            DocumentType.DRAWING: ['drawing', 'plan', 'elevation', 'section', 'detail'],
-            DocumentType.SPECIFICATION: ['specification', 'spec', 'requirements', 'standards'],
-            DocumentType.PERMIT: ['permit', 'approval', 'authorized', 'license'],
-            DocumentType.REPORT: ['report', 'analysis', 'findings', 'summary'],
-            DocumentType.CHANGE_ORDER: ['change order', 'variation', 'modification', 'additional'],
-            DocumentType.RFQ: ['rfq', 'request for quote', 'quotation', 'bid'],
-            DocumentType.SUBMITTAL: ['submittal', 'shop drawing', 'product data', 'sample'],
-            DocumentType.CORRESPONDENCE: ['letter', 'email', 'regarding', 'dear', 'sincerely'],
-            DocumentType.MEETING_MINUTES: ['minutes', 'meeting', 'attendees', 'action items'],
+        scores = {
+            doc_type: sum(1 for word in words if word in text_lower)
+            for doc_type, words in self.KEYWORDS.items()
         }
         
-        scores = {}
-        for doc_type, words in keywords.items():
-            score = sum(1 for word in words if word in text_lower)
-            scores[doc_type] = score
-        
         # Get best match
         if scores:
             best_type = max(scores, key=scores.get)
@@ -249,25 +252,9 @@ class LayoutLMClassifier:
             best_type = DocumentType.UNKNOWN
             confidence = 0.0
         
-        # Map to category
-        category_mapping = {
-            DocumentType.CONTRACT: DocumentCategory.LEGAL,
-            DocumentType.INVOICE: DocumentCategory.FINANCIAL,
-            DocumentType.RECEIPT: DocumentCategory.FINANCIAL,
-            DocumentType.DRAWING: DocumentCategory.TECHNICAL,
-            DocumentType.SPECIFICATION: DocumentCategory.TECHNICAL,
-            DocumentType.PERMIT: DocumentCategory.ADMINISTRATIVE,
-            DocumentType.REPORT: DocumentCategory.TECHNICAL,
-            DocumentType.CHANGE_ORDER: DocumentCategory.FINANCIAL,
-            DocumentType.RFQ: DocumentCategory.COMMUNICATION,
-            DocumentType.SUBMITTAL: DocumentCategory.TECHNICAL,
-            DocumentType.CORRESPONDENCE: DocumentCategory.COMMUNICATION,
-            DocumentType.MEETING_MINUTES: DocumentCategory.COMMUNICATION,
-        }
-        
         classification = DocumentClassification(
             document_type=best_type,
-            category=category_mapping.get(best_type, DocumentCategory.OTHER),
+            category=self.CATEGORY_MAPPING.get(best_type, DocumentCategory.OTHER),
             confidence=confidence,
             key_fields=self._extract_key_fields(text, best_type)
         )
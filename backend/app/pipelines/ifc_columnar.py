@@ -0,0 +1,242 @@
+"""
+Columnar Export for IFC Extraction Results
+Writes property and takeoff rows as Parquet, Arrow IPC or CSV in row groups.
+"""
+
+import csv
+import json
+import os
+from typing import Optional, Dict, List, Any, Tuple, Iterable
+from enum import Enum
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class ColumnarFormat(Enum):
+    """Columnar output formats."""
+    PARQUET = "parquet"
+    ARROW = "arrow"
+    CSV = "csv"
+
+
+# Long-format schemas: one row per property / quantity, typed numeric columns
+PROPERTY_COLUMNS: List[Tuple[str, str]] = [
+    ("element_id", "int64"),
+    ("global_id", "string"),
+    ("element_type", "string"),
+    ("element_name", "string"),
+    ("set_name", "string"),
+    ("is_quantity", "bool"),
+    ("property_name", "string"),
+    ("property_type", "string"),
+    ("value", "string"),
+    ("numeric_value", "float64"),
+    ("unit", "string"),
+]
+
+TAKEOFF_COLUMNS: List[Tuple[str, str]] = [
+    ("element_id", "int64"),
+    ("global_id", "string"),
+    ("element_type", "string"),
+    ("element_name", "string"),
+    ("classification", "string"),
+    ("material", "string"),
+    ("quantity_name", "string"),
+    ("quantity_type", "string"),
+    ("value", "float64"),
+    ("unit", "string"),
+    ("source", "string"),
+]
+
+
+def _arrow_type(column_type: str) -> Any:
+    return {
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+        "bool": pa.bool_(),
+        "string": pa.string(),
+    }[column_type]
+
+
+class ColumnarWriter:
+    """
+    Row-group writer for flat, typed rows.
+
+    Rows are buffered column-wise and flushed every row_group_size rows,
+    so memory is bounded by one row group rather than the whole model.
+    Output goes to a temporary file and is moved into place on close.
+    Without pyarrow, Parquet and Arrow requests fall back to CSV and the
+    output suffix becomes .csv (see output_path).
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        columns: List[Tuple[str, str]],
+        format: ColumnarFormat = ColumnarFormat.PARQUET,
+        row_group_size: int = 65536
+    ):
+        if format != ColumnarFormat.CSV and not ARROW_AVAILABLE:
+            logger.warning(f"pyarrow not available, writing CSV instead of {format.value}")
+            format = ColumnarFormat.CSV
+            output_path = os.path.splitext(output_path)[0] + ".csv"
+
+        self.output_path = output_path
+        self.columns = columns
+        self.format = format
+        self.row_group_size = row_group_size
+        self.rows_written = 0
+        self.row_groups = 0
+
+        self._tmp_path = f"{output_path}.tmp"
+        self._buffer: Dict[str, List[Any]] = {name: [] for name, _ in columns}
+        self._buffered = 0
+        self._writer: Optional[Any] = None
+        self._file: Optional[Any] = None
+
+        if format == ColumnarFormat.CSV:
+            self._file = open(self._tmp_path, "w", newline="")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow([name for name, _ in columns])
+        else:
+            self._schema = pa.schema([(name, _arrow_type(kind)) for name, kind in columns])
+            if format == ColumnarFormat.PARQUET:
+                self._writer = pq.ParquetWriter(self._tmp_path, self._schema)
+            else:
+                self._writer = pa_ipc.new_file(self._tmp_path, self._schema)
+
+    def write_row(self, row: Dict[str, Any]) -> None:
+        """Buffer a row; flushes when a row group is full."""
+        for name, _ in self.columns:
+            self._buffer[name].append(row.get(name))
+        self._buffered += 1
+        if self._buffered >= self.row_group_size:
+            self.flush()
+
+    def write_rows(self, rows: Iterable[Dict[str, Any]]) -> None:
+        for row in rows:
+            self.write_row(row)
+
+    def flush(self) -> None:
+        """Write buffered rows as one row group."""
+        if not self._buffered:
+            return
+
+        if self.format == ColumnarFormat.CSV:
+            self._writer.writerows(zip(*(self._buffer[name] for name, _ in self.columns)))
+        else:
+            batch = pa.record_batch(
+                [pa.array(self._buffer[name], type=_arrow_type(kind)) for name, kind in self.columns],
+                schema=self._schema
+            )
+            self._writer.write_batch(batch)
+
+        self.rows_written += self._buffered
+        self.row_groups += 1
+        self._buffer = {name: [] for name, _ in self.columns}
+        self._buffered = 0
+
+    def close(self) -> None:
+        """Flush remaining rows and move the file into place."""
+        if self._writer is None:
+            return
+        self.flush()
+        if self.format == ColumnarFormat.CSV:
+            self._file.close()
+        else:
+            self._writer.close()
+        self._writer = None
+        os.replace(self._tmp_path, self.output_path)
+
+    def abort(self) -> None:
+        """Discard the partial output."""
+        if self._writer is None:
+            return
+        try:
+            if self.format == ColumnarFormat.CSV:
+                self._file.close()
+            else:
+                self._writer.close()
+        finally:
+            self._writer = None
+            if os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
+
+    def __enter__(self) -> 'ColumnarWriter':
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def _text(value: Any) -> Optional[str]:
+    """String form of a property value; lists and dicts as JSON."""
+    if value is None:
+        return None
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=str)
+    return str(value)
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return None
+
+
+def property_rows(elem_props: Any) -> Iterable[Dict[str, Any]]:
+    """Long-format rows for one ElementProperties."""
+    base = {
+        "element_id": int(elem_props.element_id),
+        "global_id": elem_props.global_id,
+        "element_type": elem_props.element_type,
+        "element_name": elem_props.name,
+    }
+    for sets, is_quantity in ((elem_props.property_sets, False), (elem_props.quantity_sets, True)):
+        for pset in sets:
+            for prop in pset.properties:
+                yield {
+                    **base,
+                    "set_name": pset.name,
+                    "is_quantity": is_quantity,
+                    "property_name": prop.name,
+                    "property_type": prop.property_type,
+                    "value": _text(prop.value),
+                    "numeric_value": _number(prop.value),
+                    "unit": _text(prop.unit),
+                }
+
+
+def takeoff_rows(takeoff: Any) -> Iterable[Dict[str, Any]]:
+    """Long-format rows for one ElementTakeoff."""
+    material = takeoff.material.get('name') or takeoff.material.get('type')
+    base = {
+        "element_id": int(takeoff.element_id),
+        "global_id": takeoff.global_id,
+        "element_type": takeoff.element_type,
+        "element_name": takeoff.name,
+        "classification": takeoff.classification.get('reference'),
+        "material": material,
+    }
+    for q in takeoff.quantities:
+        yield {
+            **base,
+            "quantity_name": q.name,
+            "quantity_type": q.quantity_type.value,
+            "value": _number(q.value),
+            "unit": _text(q.unit),
+            "source": q.source,
+        }
@@ -4,10 +4,14 @@ Compresses mesh geometry for efficient transmission and storage.
 """
 
 import json
+import os
 import struct
-from typing import Optional, Dict, List, Any, Tuple, BinaryIO
+import time
+import zipfile
+from typing import Optional, Dict, List, Any, Tuple, BinaryIO, Iterable, Iterator
 from dataclasses import dataclass, field
 from enum import Enum
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 import numpy as np
 import hashlib
 import gzip
@@ -77,6 +81,7 @@ class CompressionStats:
     average_ratio: float
     processing_time: float
     errors: List[str] = field(default_factory=list)
+    mesh_stats: List[Dict[str, Any]] = field(default_factory=list)
     
     @property
     def overall_compression_percentage(self) -> float:
@@ -84,6 +89,20 @@ class CompressionStats:
             return 0.0
         return (1 - self.total_compressed_size / self.total_original_size) * 100
     
+    def record(self, mesh: CompressedMesh, elapsed: float) -> None:
+        """Add one compressed mesh, keeping totals and the average ratio current."""
+        self.total_compressed += 1
+        self.total_original_size += mesh.original_size
+        self.total_compressed_size += mesh.compressed_size
+        self.average_ratio += (mesh.compression_ratio - self.average_ratio) / self.total_compressed
+        self.mesh_stats.append({
+            "mesh_id": mesh.mesh_id,
+            "compression_ratio": mesh.compression_ratio,
+            "original_size": mesh.original_size,
+            "compressed_size": mesh.compressed_size,
+            "compression_time": elapsed
+        })
+    
     def to_dict(self) -> Dict[str, Any]:
         return {
             "total_meshes": self.total_meshes,
@@ -93,7 +112,8 @@ class CompressionStats:
             "overall_compression_percentage": self.overall_compression_percentage,
             "average_ratio": self.average_ratio,
             "processing_time": self.processing_time,
-            "errors": self.errors
+            "errors": self.errors,
+            "mesh_stats": self.mesh_stats
         }
 
 
@@ -103,12 +123,12 @@ class DracoCompressor:
     Provides efficient compression for transmission and storage.
     """
     
+    # Missing Draco is reported once per process, on first fallback use
+    _fallback_warned = False
+    
     def __init__(self, quantization_bits: int = 14):
         self.quantization_bits = quantization_bits
         self._encoder = None
-        
-        if not DRACO_AVAILABLE:
-            logger.warning("Draco library not available, using fallback compression")
     
     def compress_mesh(
         self,
@@ -139,6 +159,9 @@ class DracoCompressor:
                     vertices, faces, normals, uvs, mesh_id, compression_level
                 )
             else:
+                if not DracoCompressor._fallback_warned:
+                    logger.warning("Draco library not available, using fallback compression")
+                    DracoCompressor._fallback_warned = True
                 return self._compress_fallback(
                     vertices, faces, normals, uvs, mesh_id
                 )
@@ -344,13 +367,175 @@ class DracoCompressor:
             return None
 
 
+class CompressedArchiveWriter:
+    """
+    Zip archive written one mesh at a time.
+    
+    Mesh payloads go straight to disk (stored, as they are already
+    gzipped); only their small manifest entries are kept until close.
+    The archive is written beside the output and moved into place with
+    its manifest on close; abort discards it.
+    """
+    
+    def __init__(self, output_path: str):
+        self.output_path = output_path
+        self._tmp_path = f"{output_path}.tmp"
+        self._zip = zipfile.ZipFile(self._tmp_path, 'w', zipfile.ZIP_DEFLATED)
+        self._entries: List[Dict[str, Any]] = []
+        self._total_size = 0
+    
+    def add(self, mesh: CompressedMesh) -> None:
+        self._zip.writestr(
+            f'meshes/{mesh.mesh_id}.drc', mesh.compressed_data, compress_type=zipfile.ZIP_STORED
+        )
+        self._entries.append(mesh.to_dict())
+        self._total_size += mesh.compressed_size
+    
+    def close(self) -> None:
+        """Write the manifest and move the archive into place."""
+        if self._zip is None:
+            return
+        manifest = {'meshes': self._entries, 'total_size': self._total_size}
+        self._zip.writestr('manifest.json', json.dumps(manifest, separators=(',', ':')))
+        self._zip.close()
+        self._zip = None
+        os.replace(self._tmp_path, self.output_path)
+    
+    def abort(self) -> None:
+        """Discard the partial archive."""
+        if self._zip is None:
+            return
+        try:
+            self._zip.close()
+        finally:
+            self._zip = None
+            if os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
+    
+    def __enter__(self) -> 'CompressedArchiveWriter':
+        return self
+    
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+_worker_compressor: Optional[DracoCompressor] = None
+
+
+def _init_compression_worker(quantization_bits: int) -> None:
+    """Process pool initializer: build one compressor per worker."""
+    global _worker_compressor
+    _worker_compressor = DracoCompressor(quantization_bits)
+
+
+def _compress_one(
+    index: int,
+    mesh: Dict[str, Any],
+    compression_level: CompressionLevel,
+    compressor: Optional[DracoCompressor] = None
+) -> Tuple[int, Optional[CompressedMesh], float, Optional[str]]:
+    """Compress a single mesh; also the process pool entry point."""
+    compressor = compressor or _worker_compressor
+    start = time.perf_counter()
+    try:
+        compressed = compressor.compress_mesh(
+            vertices=mesh['vertices'],
+            faces=mesh['faces'],
+            normals=mesh.get('normals'),
+            uvs=mesh.get('uvs'),
+            mesh_id=mesh.get('id', f'mesh_{index}'),
+            compression_level=compression_level
+        )
+        error = None if compressed else f"Failed to compress mesh {index}"
+    except Exception as e:
+        compressed, error = None, f"Error compressing mesh {index}: {e}"
+    return index, compressed, time.perf_counter() - start, error
+
+
 class BatchCompressor:
     """Compress multiple meshes in batch."""
     
-    def __init__(self, compression_level: CompressionLevel = CompressionLevel.STANDARD):
+    def __init__(
+        self,
+        compression_level: CompressionLevel = CompressionLevel.STANDARD,
+        max_workers: int = 1
+    ):
         self.compression_level = compression_level
+        self.max_workers = max_workers
         self.compressor = DracoCompressor()
     
+    def _empty_stats(self) -> CompressionStats:
+        return CompressionStats(
+            total_meshes=0,
+            total_compressed=0,
+            total_original_size=0,
+            total_compressed_size=0,
+            average_ratio=1.0,
+            processing_time=0.0
+        )
+    
+    def compress_stream(
+        self,
+        meshes: Iterable[Dict[str, Any]],
+        stats: Optional[CompressionStats] = None,
+        max_workers: Optional[int] = None,
+        max_in_flight: Optional[int] = None
+    ) -> Iterator[CompressedMesh]:
+        """
+        Compress meshes pulled lazily from an iterable.
+        
+        With more than one worker meshes are compressed on a process pool
+        and yielded in completion order; at most max_in_flight meshes
+        (default two per worker) are held at any time. Timing, ratios and
+        errors are recorded into stats as meshes complete.
+        """
+        stats = stats if stats is not None else self._empty_stats()
+        max_workers = max_workers or self.max_workers
+        
+        def handle(outcome) -> Optional[CompressedMesh]:
+            _, compressed, elapsed, error = outcome
+            if compressed:
+                stats.record(compressed, elapsed)
+            else:
+                stats.errors.append(error)
+            return compressed
+        
+        if max_workers <= 1:
+            for i, mesh in enumerate(meshes):
+                stats.total_meshes += 1
+                compressed = handle(_compress_one(i, mesh, self.compression_level, self.compressor))
+                if compressed:
+                    yield compressed
+            return
+        
+        max_in_flight = max_in_flight or 2 * max_workers
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_compression_worker,
+            initargs=(self.compressor.quantization_bits,)
+        ) as executor:
+            pending = set()
+            for i, mesh in enumerate(meshes):
+                stats.total_meshes += 1
+                pending.add(executor.submit(_compress_one, i, mesh, self.compression_level))
+                
+                while len(pending) >= max_in_flight:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        compressed = handle(future.result())
+                        if compressed:
+                            yield compressed
+            
+            while pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    compressed = handle(future.result())
+                    if compressed:
+                        yield compressed
+    
     def compress_batch(
         self,
         meshes: List[Dict[str, Any]],
@@ -366,54 +551,60 @@ class BatchCompressor:
         Returns:
             Tuple of (compressed meshes, statistics)
         """
-        import time
         start_time = time.time()
-        
+        stats = self._empty_stats()
         compressed_meshes = []
-        errors = []
-        total_original = 0
-        total_compressed = 0
         
-        for i, mesh in enumerate(meshes):
-            try:
-                compressed = self.compressor.compress_mesh(
-                    vertices=mesh['vertices'],
-                    faces=mesh['faces'],
-                    normals=mesh.get('normals'),
-                    uvs=mesh.get('uvs'),
-                    mesh_id=mesh.get('id', f'mesh_{i}'),
-                    compression_level=self.compression_level
-                )
-                
-                if compressed:
-                    compressed_meshes.append(compressed)
-                    total_original += compressed.original_size
-                    total_compressed += compressed.compressed_size
-                else:
-                    errors.append(f"Failed to compress mesh {i}")
-                
-                if progress_callback:
-                    progress_callback(i + 1, len(meshes))
-                    
-            except Exception as e:
-                errors.append(f"Error compressing mesh {i}: {e}")
+        for compressed in self.compress_stream(meshes, stats):
+            compressed_meshes.append(compressed)
+            if progress_callback:
+                progress_callback(len(compressed_meshes) + len(stats.errors), len(meshes))
         
-        avg_ratio = (
-            sum(c.compression_ratio for c in compressed_meshes) / len(compressed_meshes)
-            if compressed_meshes else 1.0
-        )
+        stats.processing_time = time.time() - start_time
+        return compressed_meshes, stats
+    
+    def compress_to_archive(
+        self,
+        meshes: Iterable[Dict[str, Any]],
+        output_path: str,
+        progress_callback: Optional[callable] = None,
+        max_workers: Optional[int] = None
+    ) -> CompressionStats:
+        """
+        Compress meshes straight into an archive without holding them.
         
-        stats = CompressionStats(
-            total_meshes=len(meshes),
-            total_compressed=len(compressed_meshes),
-            total_original_size=total_original,
-            total_compressed_size=total_compressed,
-            average_ratio=avg_ratio,
-            processing_time=time.time() - start_time,
-            errors=errors
-        )
+        Each mesh is appended to the archive as soon as it is compressed,
+        so memory is bounded by the meshes in flight rather than the model.
         
-        return compressed_meshes, stats
+        Args:
+            meshes: Iterable of mesh dictionaries; consumed lazily
+            output_path: Archive path
+            progress_callback: Optional callback(done, total); total is None
+                when meshes has no length
+            max_workers: Worker processes (default: the compressor's setting)
+        
+        Returns:
+            Compression statistics
+        """
+        start_time = time.time()
+        stats = self._empty_stats()
+        total = len(meshes) if hasattr(meshes, '__len__') else None
+        
+        try:
+            with CompressedArchiveWriter(output_path) as writer:
+                for compressed in self.compress_stream(meshes, stats, max_workers):
+                    writer.add(compressed)
+                    if progress_callback:
+                        progress_callback(stats.total_compressed + len(stats.errors), total)
+            
+            logger.info(f"Created compressed archive: {output_path}")
+            
+        except Exception as e:
+            logger.error(f"Failed to create archive: {e}")
+            stats.errors.append(str(e))
+        
+        stats.processing_time = time.time() - start_time
+        return stats
     
     def create_compressed_archive(
         self,
@@ -422,19 +613,9 @@ class BatchCompressor:
     ) -> bool:
         """Create a compressed archive of all meshes."""
         try:
-            import zipfile
-            
-            with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zf:
-                # Write manifest
-                manifest = {
-                    'meshes': [m.to_dict() for m in compressed_meshes],
-                    'total_size': sum(m.compressed_size for m in compressed_meshes)
-                }
-                zf.writestr('manifest.json', json.dumps(manifest, indent=2))
-                
-                # Write each mesh
+            with CompressedArchiveWriter(output_path) as writer:
                 for mesh in compressed_meshes:
-                    zf.writestr(f'meshes/{mesh.mesh_id}.drc', mesh.compressed_data)
+                    writer.add(mesh)
             
             logger.info(f"Created compressed archive: {output_path}")
             return True
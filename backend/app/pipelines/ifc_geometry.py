@@ -7,7 +7,8 @@ import os
 import json
 import asyncio
 import tempfile
-from typing import Optional, Dict, List, Any, Tuple, Callable
+import threading
+from typing import Optional, Dict, List, Any, Tuple, Callable, Iterator, AsyncIterator
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
@@ -94,9 +95,9 @@ class IFCGeometryExtractor:
     Supports multiple output formats and optimization options.
     """
     
-    def __init__(self, ifc_file_path: str):
+    def __init__(self, ifc_file_path: str, ifc_file: Optional[Any] = None):
         self.ifc_file_path = ifc_file_path
-        self._ifc_file: Optional[Any] = None
+        self._ifc_file: Optional[Any] = ifc_file  # reuse an already opened file
         self._settings: Optional[Any] = None
         self._serializer: Optional[Any] = None
         
@@ -131,10 +132,123 @@ class IFCGeometryExtractor:
         self._settings.set(self._settings.SEW_SHELLS, sew_shells)
         self._settings.set(self._settings.VALIDATE, validate)
     
+    def _get_elements(self, element_types: Optional[List[str]] = None) -> List[Any]:
+        """Elements of the requested types, or all IfcElements."""
+        if element_types:
+            elements = []
+            for elem_type in element_types:
+                elements.extend(self._ifc_file.by_type(elem_type))
+            return elements
+        
+        # Get all geometric elements
+        return self._ifc_file.by_type('IfcElement')
+    
+    def iter_geometry(
+        self,
+        elements: List[Any],
+        num_threads: Optional[int] = None,
+        errors: Optional[List[str]] = None
+    ) -> Iterator[GeometryData]:
+        """
+        Yield geometry for the given elements from one iterator pass.
+        
+        The geometry iterator tessellates on num_threads workers (all cores
+        by default), so this replaces one iterator per element. Elements
+        without a representation are skipped; elements that fail to
+        convert are logged and, if given, appended to errors.
+        """
+        include = [
+            e for e in elements
+            if getattr(e, 'Representation', None)
+        ]
+        if not include:
+            return
+        
+        iterator = ifcopenshell.geom.iterator(
+            self._settings,
+            self._ifc_file,
+            num_threads or os.cpu_count() or 1,
+            include=include
+        )
+        
+        if not iterator.initialize():
+            return
+        
+        while True:
+            shape = iterator.get()
+            try:
+                yield self._shape_to_geometry(shape, self._ifc_file.by_id(shape.id))
+            except Exception as e:
+                error_msg = f"Failed to extract geometry for {shape.guid}: {e}"
+                logger.warning(error_msg)
+                if errors is not None:
+                    errors.append(error_msg)
+            
+            if not iterator.next():
+                break
+    
+    async def stream_geometry(
+        self,
+        element_types: Optional[List[str]] = None,
+        num_threads: Optional[int] = None,
+        max_pending: int = 256,
+        errors: Optional[List[str]] = None
+    ) -> AsyncIterator[GeometryData]:
+        """
+        Stream geometry as it is tessellated.
+        
+        The iterator runs on a background thread and hands results over a
+        bounded queue, so consumers (LOD, compression, spatial indexing)
+        can start before extraction finishes without blocking the event
+        loop, and a slow consumer pauses extraction instead of buffering
+        the whole model. Per-element failures go to errors as in
+        iter_geometry.
+        """
+        if not self._ifc_file and not self.open_file():
+            raise RuntimeError(f"Failed to open IFC file: {self.ifc_file_path}")
+        
+        if not self._settings:
+            self.initialize_settings()
+        
+        elements = self._get_elements(element_types)
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        done = object()
+        cancelled = threading.Event()
+        
+        def produce():
+            try:
+                for geom_data in self.iter_geometry(elements, num_threads, errors):
+                    if cancelled.is_set():
+                        return
+                    asyncio.run_coroutine_threadsafe(queue.put(geom_data), loop).result()
+                outcome = done
+            except Exception as e:
+                outcome = e
+            asyncio.run_coroutine_threadsafe(queue.put(outcome), loop).result()
+        
+        producer = loop.run_in_executor(None, produce)
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            cancelled.set()
+            # Unblock a producer waiting on a full queue
+            while not queue.empty():
+                queue.get_nowait()
+            await producer
+    
     async def extract_all_geometry(
         self,
         element_types: Optional[List[str]] = None,
-        progress_callback: Optional[Callable[[int, int], None]] = None
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        single_pass: bool = True,
+        num_threads: Optional[int] = None
     ) -> ExtractionResult:
         """
         Extract geometry for all elements in the IFC file.
@@ -142,6 +256,9 @@ class IFCGeometryExtractor:
         Args:
             element_types: Optional list of IFC element types to extract (e.g., ['IfcWall', 'IfcDoor'])
             progress_callback: Optional callback(current, total) for progress updates
+            single_pass: Tessellate everything in one multi-threaded iterator
+                pass (see stream_geometry) instead of element by element
+            num_threads: Iterator workers for single_pass; defaults to all cores
         
         Returns:
             ExtractionResult with all extracted geometries
@@ -161,13 +278,7 @@ class IFCGeometryExtractor:
                 self.initialize_settings()
             
             # Get elements to process
-            if element_types:
-                elements = []
-                for elem_type in element_types:
-                    elements.extend(self._ifc_file.by_type(elem_type))
-            else:
-                # Get all geometric elements
-                elements = self._ifc_file.by_type('IfcElement')
+            elements = self._get_elements(element_types)
             
             result.element_count = len(elements)
             logger.info(f"Extracting geometry for {len(elements)} elements")
@@ -177,21 +288,35 @@ class IFCGeometryExtractor:
             total_vertices = 0
             total_faces = 0
             
-            for i, element in enumerate(elements):
-                try:
-                    geom_data = await self._extract_element_geometry(element)
-                    if geom_data:
-                        geometries.append(geom_data)
-                        total_vertices += len(geom_data.vertices) // 3
-                        total_faces += len(geom_data.faces) // 3
+            if single_pass:
+                async for geom_data in self.stream_geometry(
+                    element_types, num_threads, errors=result.warnings
+                ):
+                    geometries.append(geom_data)
+                    total_vertices += len(geom_data.vertices) // 3
+                    total_faces += len(geom_data.faces) // 3
                     
-                    if progress_callback and i % 10 == 0:
-                        progress_callback(i + 1, len(elements))
+                    if progress_callback and len(geometries) % 10 == 1:
+                        progress_callback(len(geometries), len(elements))
+                
+                if progress_callback:
+                    progress_callback(len(elements), len(elements))
+            else:
+                for i, element in enumerate(elements):
+                    try:
+                        geom_data = await self._extract_element_geometry(element)
+                        if geom_data:
+                            geometries.append(geom_data)
+                            total_vertices += len(geom_data.vertices) // 3
+                            total_faces += len(geom_data.faces) // 3
                         
-                except Exception as e:
-                    error_msg = f"Failed to extract geometry for {element.GlobalId}: {e}"
-                    logger.warning(error_msg)
-                    result.warnings.append(error_msg)
+                        if progress_callback and i % 10 == 0:
+                            progress_callback(i + 1, len(elements))
+                            
+                    except Exception as e:
+                        error_msg = f"Failed to extract geometry for {element.GlobalId}: {e}"
+                        logger.warning(error_msg)
+                        result.warnings.append(error_msg)
             
             result.geometries = geometries
             result.total_vertices = total_vertices
@@ -241,8 +366,14 @@ class IFCGeometryExtractor:
             if not self._ifc_file:
                 self.open_file()
             
+            if not self._settings:
+                self.initialize_settings()
+            
             spatial_elements = self._ifc_file.by_type(structure_type)
             
+            # Collect contained elements, then tessellate them in one pass
+            containers: Dict[int, str] = {}
+            contained = []
             for spatial_elem in spatial_elements:
                 elem_name = spatial_elem.Name if hasattr(spatial_elem, 'Name') else spatial_elem.GlobalId
                 structure[elem_name] = []
@@ -251,9 +382,14 @@ class IFCGeometryExtractor:
                 if hasattr(spatial_elem, 'ContainsElements'):
                     for rel in spatial_elem.ContainsElements:
                         for element in rel.RelatedElements:
-                            geom_data = await self._extract_element_geometry(element)
-                            if geom_data:
-                                structure[elem_name].append(geom_data)
+                            containers[element.id()] = elem_name
+                            contained.append(element)
+            
+            geometries = await asyncio.get_running_loop().run_in_executor(
+                None, lambda: list(self.iter_geometry(contained))
+            )
+            for geom_data in geometries:
+                structure[containers[int(geom_data.element_id)]].append(geom_data)
             
             return structure
             
@@ -271,54 +407,47 @@ class IFCGeometryExtractor:
             if not hasattr(element, 'Representation') or not element.Representation:
                 return None
             
-            # Create geometry iterator
-            iterator = ifcopenshell.geom.iterator(
-                self._settings, 
-                self._ifc_file, 
-                include=[element]
-            )
-            
-            if not iterator.initialize():
-                return None
-            
-            # Process geometry
-            shape = iterator.get()
-            
-            # Extract mesh data
-            vertices = np.array(shape.geometry.verts)
-            faces = np.array(shape.geometry.faces)
-            normals = np.array(shape.geometry.normals) if shape.geometry.normals else np.array([])
-            
-            # Calculate bounds
-            if len(vertices) > 0:
-                verts_reshaped = vertices.reshape(-1, 3)
-                bounds = {
-                    "min": verts_reshaped.min(axis=0).tolist(),
-                    "max": verts_reshaped.max(axis=0).tolist(),
-                    "center": verts_reshaped.mean(axis=0).tolist()
-                }
-            else:
-                bounds = {}
-            
-            # Get transformation matrix
-            transformation = np.array(shape.transformation.matrix).reshape(4, 4)
-            
-            return GeometryData(
-                element_id=str(element.id()),
-                global_id=element.GlobalId,
-                element_type=element.is_a(),
-                name=getattr(element, 'Name', ''),
-                vertices=vertices,
-                faces=faces,
-                normals=normals,
-                bounds=bounds,
-                transformation=transformation
-            )
+            # Tessellate directly; an iterator per element is far slower
+            shape = ifcopenshell.geom.create_shape(self._settings, element)
+            return self._shape_to_geometry(shape, element)
             
         except Exception as e:
             logger.warning(f"Geometry extraction failed for element {element.GlobalId}: {e}")
             return None
     
+    def _shape_to_geometry(self, shape: Any, element: Any) -> GeometryData:
+        """Convert a tessellated shape into GeometryData."""
+        # Extract mesh data
+        vertices = np.array(shape.geometry.verts)
+        faces = np.array(shape.geometry.faces)
+        normals = np.array(shape.geometry.normals) if shape.geometry.normals else np.array([])
+        
+        # Calculate bounds
+        if len(vertices) > 0:
+            verts_reshaped = vertices.reshape(-1, 3)
+            bounds = {
+                "min": verts_reshaped.min(axis=0).tolist(),
+                "max": verts_reshaped.max(axis=0).tolist(),
+                "center": verts_reshaped.mean(axis=0).tolist()
+            }
+        else:
+            bounds = {}
+        
+        # Get transformation matrix
+        transformation = np.array(shape.transformation.matrix).reshape(4, 4)
+        
+        return GeometryData(
+            element_id=str(element.id()),
+            global_id=element.GlobalId,
+            element_type=element.is_a(),
+            name=getattr(element, 'Name', ''),
+            vertices=vertices,
+            faces=faces,
+            normals=normals,
+            bounds=bounds,
+            transformation=transformation
+        )
+    
     def export_to_format(
         self,
         geometries: List[GeometryData],
@@ -545,41 +674,149 @@ class IFCGeometryExtractor:
 
 
 class GeometryCache:
-    """Cache for extracted geometry data."""
+    """
+    Binary cache for extracted geometry.
+    
+    Each entry is one ``.geom`` file: a magic tag, a JSON header with the
+    per-element names and bounds, then an offset table and contiguous
+    float32 vertex/normal/uv and uint32 index buffers. Files are
+    memory-mapped on load, so meshes come back as zero-copy views and a
+    single element can be read by GlobalId without touching the rest.
+    """
+    
+    MAGIC = b"CRBGEO01"
+    ALIGNMENT = 16
+    BUFFERS = (
+        ("vertices", np.float32),
+        ("faces", np.uint32),
+        ("normals", np.float32),
+        ("uvs", np.float32),
+    )
     
-    def __init__(self, cache_dir: str = "/tmp/ifc_geometry_cache"):
+    def __init__(self, cache_dir: str = "/tmp/ifc_geometry_cache", max_open: int = 8):
         self.cache_dir = cache_dir
+        self.max_open = max_open
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+        self._open: Dict[str, Tuple[Dict[str, Any], np.ndarray, Dict[str, int]]] = {}
         os.makedirs(cache_dir, exist_ok=True)
     
+    def file_digest(self, ifc_path: str) -> str:
+        """SHA-256 of the file contents, memoized on size and mtime."""
+        stat = os.stat(ifc_path)
+        signature = (os.path.abspath(ifc_path), stat.st_size, stat.st_mtime_ns)
+        
+        if signature not in self._digests:
+            digest = hashlib.sha256()
+            with open(ifc_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+            self._digests[signature] = digest.hexdigest()
+        
+        return self._digests[signature]
+    
     def get_cache_key(self, ifc_path: str, options: Dict[str, Any]) -> str:
-        """Generate cache key for IFC file and options."""
-        data = f"{ifc_path}:{json.dumps(options, sort_keys=True)}"
+        """Generate cache key for IFC file contents, mtime and options."""
+        stat = os.stat(ifc_path)
+        data = f"{self.file_digest(ifc_path)}:{stat.st_mtime_ns}:{json.dumps(options, sort_keys=True)}"
         return hashlib.sha256(data.encode()).hexdigest()
     
+    def _cache_path(self, cache_key: str) -> str:
+        return os.path.join(self.cache_dir, f"{cache_key}.geom")
+    
+    def _aligned(self, offset: int) -> int:
+        return -(-offset // self.ALIGNMENT) * self.ALIGNMENT
+    
+    def _open_entry(self, cache_key: str):
+        """Header, mapped bytes and GlobalId lookup for a cache entry."""
+        if cache_key in self._open:
+            return self._open[cache_key]
+        
+        cache_path = self._cache_path(cache_key)
+        if not os.path.exists(cache_path):
+            return None
+        
+        data = np.memmap(cache_path, dtype=np.uint8, mode='r')
+        if bytes(data[:len(self.MAGIC)]) != self.MAGIC:
+            raise ValueError(f"Not a geometry cache file: {cache_path}")
+        
+        header_len = int(data[8:16].view(np.uint64)[0])
+        header = json.loads(bytes(data[16:16 + header_len]).decode())
+        lookup = {gid: i for i, gid in enumerate(header['elements']['global_id'])}
+        
+        if len(self._open) >= self.max_open:
+            self._open.pop(next(iter(self._open)))
+        self._open[cache_key] = (header, data, lookup)
+        return self._open[cache_key]
+    
+    def _view(self, data: np.ndarray, header: Dict[str, Any], name: str, dtype) -> np.ndarray:
+        offset, nbytes = header['sections'][name]
+        start = header['data_start'] + offset
+        return data[start:start + nbytes].view(dtype)
+    
+    def _geometry_at(self, header: Dict[str, Any], data: np.ndarray, index: int) -> GeometryData:
+        elements = header['elements']
+        table = self._view(data, header, 'table', np.int64).reshape(-1, 2 * len(self.BUFFERS))
+        transforms = self._view(data, header, 'transforms', np.float64).reshape(-1, 4, 4)
+        
+        arrays = {}
+        for b, (name, dtype) in enumerate(self.BUFFERS):
+            start, count = table[index, 2 * b], table[index, 2 * b + 1]
+            arrays[name] = self._view(data, header, name, dtype)[start:start + count]
+        
+        return GeometryData(
+            element_id=elements['element_id'][index],
+            global_id=elements['global_id'][index],
+            element_type=elements['element_type'][index],
+            name=elements['name'][index],
+            bounds=elements['bounds'][index],
+            material_ids=elements['material_ids'][index],
+            transformation=transforms[index],
+            **arrays
+        )
+    
     def get_cached_geometry(self, cache_key: str) -> Optional[ExtractionResult]:
         """Get cached geometry if available."""
-        cache_path = os.path.join(self.cache_dir, f"{cache_key}.json")
-        
-        if os.path.exists(cache_path):
-            try:
-                with open(cache_path, 'r') as f:
-                    data = json.load(f)
-                
-                # Reconstruct result
-                result = ExtractionResult(success=True)
-                result.geometries = [GeometryData(**g) for g in data.get('geometries', [])]
-                result.element_count = data.get('element_count', 0)
-                result.total_vertices = data.get('total_vertices', 0)
-                result.total_faces = data.get('total_faces', 0)
-                
-                logger.info(f"Loaded cached geometry: {cache_key}")
-                return result
-                
-            except Exception as e:
-                logger.warning(f"Failed to load cached geometry: {e}")
+        try:
+            entry = self._open_entry(cache_key)
+            if entry is None:
+                return None
+            header, data, _ = entry
+            
+            # Reconstruct result
+            result = ExtractionResult(success=True)
+            result.geometries = [
+                self._geometry_at(header, data, i)
+                for i in range(len(header['elements']['global_id']))
+            ]
+            result.element_count = header.get('element_count', 0)
+            result.total_vertices = header.get('total_vertices', 0)
+            result.total_faces = header.get('total_faces', 0)
+            
+            logger.info(f"Loaded cached geometry: {cache_key}")
+            return result
+            
+        except Exception as e:
+            logger.warning(f"Failed to load cached geometry: {e}")
         
         return None
     
+    def get_cached_element(self, cache_key: str, global_id: str) -> Optional[GeometryData]:
+        """Get one cached element by GlobalId, reading only its buffers."""
+        try:
+            entry = self._open_entry(cache_key)
+            if entry is None:
+                return None
+            header, data, lookup = entry
+            
+            index = lookup.get(global_id)
+            if index is None:
+                return None
+            return self._geometry_at(header, data, index)
+            
+        except Exception as e:
+            logger.warning(f"Failed to load cached element {global_id}: {e}")
+            return None
+    
     def cache_geometry(
         self, 
         cache_key: str, 
@@ -587,18 +824,69 @@ class GeometryCache:
     ) -> bool:
         """Cache extracted geometry."""
         try:
-            cache_path = os.path.join(self.cache_dir, f"{cache_key}.json")
-            
-            data = {
-                'geometries': [g.to_dict() for g in result.geometries],
+            cache_path = self._cache_path(cache_key)
+            geometries = result.geometries
+            
+            # Concatenate each buffer and record per-element (start, count)
+            table = np.zeros((len(geometries), 2 * len(self.BUFFERS)), dtype=np.int64)
+            buffers = {}
+            for b, (name, dtype) in enumerate(self.BUFFERS):
+                arrays = [np.asarray(getattr(g, name)).ravel().astype(dtype) for g in geometries]
+                counts = np.array([len(a) for a in arrays], dtype=np.int64)
+                table[:, 2 * b] = np.cumsum(counts) - counts
+                table[:, 2 * b + 1] = counts
+                buffers[name] = np.concatenate(arrays) if arrays else np.empty(0, dtype=dtype)
+            
+            transforms = np.array(
+                [np.asarray(g.transformation, dtype=np.float64).reshape(4, 4) for g in geometries],
+                dtype=np.float64
+            ).reshape(-1, 4, 4)
+            
+            sections = [('table', table), ('transforms', transforms)]
+            sections += [(name, buffers[name]) for name, _ in self.BUFFERS]
+            
+            layout = {}
+            offset = 0
+            for name, array in sections:
+                layout[name] = [offset, array.nbytes]
+                offset = self._aligned(offset + array.nbytes)
+            
+            header = {
+                'elements': {
+                    'element_id': [g.element_id for g in geometries],
+                    'global_id': [g.global_id for g in geometries],
+                    'element_type': [g.element_type for g in geometries],
+                    'name': [g.name for g in geometries],
+                    'bounds': [g.bounds for g in geometries],
+                    'material_ids': [list(g.material_ids) for g in geometries],
+                },
                 'element_count': result.element_count,
                 'total_vertices': result.total_vertices,
                 'total_faces': result.total_faces,
+                'sections': layout,
                 'cached_at': datetime.utcnow().isoformat()
             }
             
-            with open(cache_path, 'w') as f:
-                json.dump(data, f)
+            # data_start depends on the header length, which includes it
+            header['data_start'] = 0
+            while True:
+                header_bytes = json.dumps(header).encode()
+                data_start = self._aligned(16 + len(header_bytes))
+                if header['data_start'] == data_start:
+                    break
+                header['data_start'] = data_start
+            
+            tmp_path = f"{cache_path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(self.MAGIC)
+                f.write(np.uint64(len(header_bytes)).tobytes())
+                f.write(header_bytes)
+                for name, array in sections:
+                    f.write(b"\0" * (data_start + layout[name][0] - f.tell()))
+                    f.write(np.ascontiguousarray(array).tobytes())
+            
+            self._open.pop(cache_key, None)
+            os.replace(tmp_path, cache_path)
             
             logger.info(f"Cached geometry: {cache_key}")
             return True
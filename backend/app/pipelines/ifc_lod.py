@@ -4,10 +4,13 @@ Generates simplified geometry representations for different LOD levels.
 """
 
 import numpy as np
-from typing import Optional, Dict, List, Any, Tuple, Callable
+from typing import Optional, Dict, List, Any, Tuple, Callable, Iterator
 from dataclasses import dataclass, field
 from enum import Enum
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+import heapq
 import json
+import os
 
 try:
     import ifcopenshell
@@ -125,6 +128,9 @@ class LODGenerator:
         LODLevel.LOD_500: 1.00    # 100% (full detail)
     }
     
+    # Above this many faces LOD_300/350 fall back to vertex clustering
+    QUADRIC_MAX_FACES = 50000
+    
     def __init__(self):
         self._simplifiers: Dict[str, Callable] = {
             'decimation': self._decimate_mesh,
@@ -179,7 +185,7 @@ class LODGenerator:
                 elif lod in (LODLevel.LOD_300, LODLevel.LOD_350):
                     # Use decimation for precise
                     simplified = self._decimate_mesh(
-                        vertices, faces, normals, uvs, target_ratio
+                        vertices, faces, normals, uvs, target_ratio, lod
                     )
                 else:
                     # Full detail
@@ -206,11 +212,12 @@ class LODGenerator:
         faces: np.ndarray,
         normals: Optional[np.ndarray],
         uvs: Optional[np.ndarray],
-        target_ratio: float
+        target_ratio: float,
+        lod_level: LODLevel = LODLevel.LOD_300
     ) -> LODRepresentation:
         """
-        Decimate mesh using edge collapse algorithm.
-        Simplified implementation - production would use proper mesh decimation.
+        Decimate mesh using quadric error metric edge collapse.
+        Very large meshes fall back to vertex clustering.
         """
         try:
             # Calculate target face count
@@ -219,7 +226,7 @@ class LODGenerator:
             if target_faces >= len(faces):
                 # No simplification needed
                 return LODRepresentation(
-                    lod_level=LODLevel.LOD_300,
+                    lod_level=lod_level,
                     vertices=vertices.copy(),
                     faces=faces.copy(),
                     normals=normals.copy() if normals is not None else None,
@@ -228,18 +235,23 @@ class LODGenerator:
                     generation_method="decimation"
                 )
             
-            # Simple vertex clustering for demonstration
-            # Production would use proper decimation (e.g., OpenMesh, CGAL)
-            simplified_vertices, simplified_faces = self._vertex_clustering(
-                vertices, faces, target_ratio
-            )
+            if len(faces) > self.QUADRIC_MAX_FACES:
+                simplified_vertices, simplified_faces = self._vertex_clustering(
+                    vertices, faces, target_ratio
+                )
+                method = "vertex_clustering"
+            else:
+                simplified_vertices, simplified_faces = self._quadric_decimation(
+                    vertices, faces, target_faces
+                )
+                method = "quadric_decimation"
             
             return LODRepresentation(
-                lod_level=LODLevel.LOD_300,
+                lod_level=lod_level,
                 vertices=simplified_vertices,
                 faces=simplified_faces,
                 simplification_ratio=len(simplified_faces) / len(faces),
-                generation_method="vertex_clustering"
+                generation_method=method
             )
             
         except Exception as e:
@@ -269,35 +281,148 @@ class LODGenerator:
         # Assign vertices to grid cells
         grid_coords = ((vertices - min_bounds) / ranges * (grid_size - 1)).astype(int)
         grid_coords = np.clip(grid_coords, 0, grid_size - 1)
+        cell_keys = np.ravel_multi_index(grid_coords.T, (grid_size,) * 3)
+        
+        # Number cells in order of first appearance and average their vertices
+        cells, first, inverse = np.unique(cell_keys, return_index=True, return_inverse=True)
+        order = np.argsort(first)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        cell_index = rank[inverse.ravel()]
+        
+        counts = np.bincount(cell_index, minlength=len(cells))
+        new_vertices = np.stack([
+            np.bincount(cell_index, weights=vertices[:, axis], minlength=len(cells))
+            for axis in range(3)
+        ], axis=1) / counts[:, None]
+        
+        # Remap faces, skipping degenerate ones
+        new_faces = cell_index[faces]
+        keep = (
+            (new_faces[:, 0] != new_faces[:, 1])
+            & (new_faces[:, 1] != new_faces[:, 2])
+            & (new_faces[:, 0] != new_faces[:, 2])
+        )
+        
+        return new_vertices, new_faces[keep]
+    
+    def _quadric_decimation(
+        self,
+        vertices: np.ndarray,
+        faces: np.ndarray,
+        target_faces: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Garland-Heckbert edge collapse until target_faces remain.
+        
+        Each vertex carries the sum of the plane quadrics of its faces;
+        edges are collapsed cheapest first into the position minimising
+        the combined quadric. Collapses that would flip a face are skipped.
+        """
+        positions = np.asarray(vertices, dtype=np.float64).reshape(-1, 3).copy()
+        faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3).copy()
+        
+        # Plane quadrics per face, accumulated per vertex
+        tri = positions[faces]
+        normals = _triangle_normals(tri)
+        lengths = np.linalg.norm(normals, axis=1)
+        planes = np.zeros((len(faces), 4))
+        valid = lengths > 0
+        planes[valid, :3] = normals[valid] / lengths[valid, None]
+        planes[:, 3] = -np.einsum('ij,ij->i', planes[:, :3], tri[:, 0])
+        face_quadrics = planes[:, :, None] * planes[:, None, :]
+        quadrics = np.zeros((len(positions), 4, 4))
+        for corner in range(3):
+            np.add.at(quadrics, faces[:, corner], face_quadrics)
         
-        # Create cell to vertex mapping
-        cell_map = {}
-        new_vertices = []
-        
-        for i, coord in enumerate(grid_coords):
-            key = tuple(coord)
-            if key not in cell_map:
-                cell_map[key] = len(new_vertices)
-                # Use average position for cell
-                cell_vertices = vertices[(grid_coords == coord).all(axis=1)]
-                new_vertices.append(cell_vertices.mean(axis=0))
-        
-        new_vertices = np.array(new_vertices)
-        
-        # Remap faces
-        new_faces = []
-        for face in faces:
-            new_face = [
-                cell_map[tuple(grid_coords[face[0]])],
-                cell_map[tuple(grid_coords[face[1]])],
-                cell_map[tuple(grid_coords[face[2]])]
-            ]
+        vertex_faces: List[set] = [set() for _ in range(len(positions))]
+        for f, face in enumerate(faces.tolist()):
+            for v in face:
+                vertex_faces[v].add(f)
+        
+        face_alive = np.ones(len(faces), dtype=bool)
+        version = [0] * len(positions)
+        alive_faces = len(faces)
+        
+        def collapse_targets(a: np.ndarray, b: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+            """Cheapest collapse cost and position for each edge (a, b)."""
+            q = quadrics[a] + quadrics[b]
+            candidates = np.stack([
+                positions[a], positions[b], (positions[a] + positions[b]) / 2, positions[a]
+            ], axis=1)
+            solvable = np.abs(np.linalg.det(q[:, :3, :3])) > 1e-12
+            if solvable.any():
+                candidates[solvable, 3] = np.linalg.solve(
+                    q[solvable, :3, :3], -q[solvable, :3, 3:]
+                )[..., 0]
+            h = np.concatenate([candidates, np.ones(candidates.shape[:2] + (1,))], axis=2)
+            costs = np.einsum('nki,nij,nkj->nk', h, q, h)
+            best = costs.argmin(axis=1)
+            rows = np.arange(len(a))
+            return costs[rows, best], candidates[rows, best]
+        
+        heap: List[Tuple[float, int, int, int, int, Tuple[float, float, float]]] = []
+        
+        def push_edges(a: np.ndarray, b: np.ndarray):
+            a, b = np.minimum(a, b), np.maximum(a, b)
+            costs, targets = collapse_targets(a, b)
+            for cost, va, vb, p in zip(costs.tolist(), a.tolist(), b.tolist(), targets.tolist()):
+                heapq.heappush(heap, (cost, va, vb, version[va], version[vb], p))
+        
+        edges = np.sort(np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [0, 2]]]), axis=1)
+        edges = np.unique(edges[edges[:, 0] != edges[:, 1]], axis=0)
+        if len(edges):
+            push_edges(edges[:, 0], edges[:, 1])
+        
+        def flips(a: int, b: int, p: np.ndarray) -> bool:
+            """Whether moving a and b to p turns any surviving face upside down."""
+            # Faces shared by a and b collapse away
+            kept = list(vertex_faces[a] ^ vertex_faces[b])
+            if not kept:
+                return False
+            corners = faces[kept]
+            before = positions[corners]
+            after = before.copy()
+            after[(corners == a) | (corners == b)] = p
+            n0 = _triangle_normals(before)
+            n1 = _triangle_normals(after)
+            return bool(((n0 * n1).sum(axis=1) <= 0).any())
+        
+        while alive_faces > target_faces and heap:
+            _, a, b, ver_a, ver_b, p = heapq.heappop(heap)
+            if version[a] != ver_a or version[b] != ver_b:
+                continue  # stale entry
+            
+            p = np.array(p)
+            if flips(a, b, p):
+                continue
+            
+            # Merge b into a
+            positions[a] = p
+            quadrics[a] += quadrics[b]
+            for f in vertex_faces[b]:
+                if a in faces[f]:
+                    face_alive[f] = False
+                    alive_faces -= 1
+                    for v in faces[f].tolist():
+                        if v != b:
+                            vertex_faces[v].discard(f)
+                else:
+                    faces[f][faces[f] == b] = a
+                    vertex_faces[a].add(f)
+            vertex_faces[b] = set()
+            version[a] += 1
+            version[b] += 1
             
-            # Skip degenerate faces
-            if len(set(new_face)) == 3:
-                new_faces.append(new_face)
+            if vertex_faces[a]:
+                neighbours = np.unique(faces[list(vertex_faces[a])])
+                neighbours = neighbours[neighbours != a]
+                push_edges(np.full(len(neighbours), a), neighbours)
         
-        return new_vertices, np.array(new_faces)
+        # Compact to the surviving vertices
+        remaining = faces[face_alive]
+        used, compact = np.unique(remaining, return_inverse=True)
+        return positions[used], compact.reshape(-1, 3)
     
     def _create_bounding_box(
         self,
@@ -390,8 +515,16 @@ class LODGenerator:
     ) -> LODRepresentation:
         """Create voxel-based simplification."""
         # Use vertex clustering as voxel approximation
-        return self._decimate_mesh(
-            vertices, faces, normals, uvs, target_ratio
+        simplified_vertices, simplified_faces = self._vertex_clustering(
+            vertices, faces, target_ratio
+        )
+        
+        return LODRepresentation(
+            lod_level=LODLevel.LOD_300,
+            vertices=simplified_vertices,
+            faces=simplified_faces,
+            simplification_ratio=len(simplified_faces) / len(faces),
+            generation_method="vertex_clustering"
         )
     
     def select_lod_for_distance(
@@ -428,6 +561,72 @@ class LODGenerator:
         return LODLevel.LOD_100
 
 
+def _triangle_normals(triangles: np.ndarray) -> np.ndarray:
+    """Unnormalized normals of (n, 3, 3) triangles; cheaper than np.cross on small batches."""
+    u = triangles[:, 1] - triangles[:, 0]
+    v = triangles[:, 2] - triangles[:, 0]
+    return np.stack([
+        u[:, 1] * v[:, 2] - u[:, 2] * v[:, 1],
+        u[:, 2] * v[:, 0] - u[:, 0] * v[:, 2],
+        u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0],
+    ], axis=1)
+
+
+def _chunked(items: Iterator[Any], size: int) -> Iterator[List[Any]]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _build_element_lod(
+    generator: LODGenerator,
+    mesh: Tuple[Any, ...],
+    target_lods: Optional[List[LODLevel]]
+) -> Optional[ElementLOD]:
+    """Generate LOD representations for one tessellated element."""
+    element_id, global_id, element_type, name, vertices, faces = mesh
+    try:
+        element_lod = ElementLOD(
+            element_id=element_id,
+            global_id=global_id,
+            element_type=element_type,
+            name=name
+        )
+        if len(vertices) == 0 or len(faces) == 0:
+            return element_lod
+        
+        element_lod.original_vertex_count = len(vertices)
+        element_lod.original_face_count = len(faces)
+        element_lod.representations = generator.generate_lod_representations(
+            vertices, faces, target_lods=target_lods
+        )
+        return element_lod
+        
+    except Exception as e:
+        logger.warning(f"Failed to generate LOD for {global_id}: {e}")
+        return None
+
+
+def _generate_lod_chunk(
+    meshes: List[Tuple[Any, ...]],
+    target_lods: Optional[List[LODLevel]],
+    generator: Optional[LODGenerator] = None
+) -> List[ElementLOD]:
+    """Process pool entry point: LODs for a chunk of elements."""
+    generator = generator or LODGenerator()
+    element_lods = []
+    for mesh in meshes:
+        element_lod = _build_element_lod(generator, mesh, target_lods)
+        if element_lod:
+            element_lods.append(element_lod)
+    return element_lods
+
+
 class IFCLODGenerator:
     """Generates LOD representations for IFC models."""
     
@@ -452,15 +651,25 @@ class IFCLODGenerator:
         self,
         element_types: Optional[List[str]] = None,
         target_lods: Optional[List[LODLevel]] = None,
-        progress_callback: Optional[Callable[[int, int], None]] = None
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        max_workers: Optional[int] = None,
+        chunk_size: int = 64
     ) -> List[ElementLOD]:
         """
         Generate LOD representations for all elements in model.
         
+        Geometry is tessellated in one pass and simplified on a process
+        pool in chunks of elements, with at most two chunks per worker in
+        flight so memory stays bounded on large models. A chunk whose
+        worker fails as a whole (e.g. a crashed process breaking the
+        pool) is simplified inline instead.
+        
         Args:
             element_types: Optional list of element types
             target_lods: List of LOD levels to generate
             progress_callback: Optional progress callback
+            max_workers: Worker processes (default: all cores; 1 runs inline)
+            chunk_size: Elements per worker task
         
         Returns:
             List of ElementLOD
@@ -481,66 +690,93 @@ class IFCLODGenerator:
         
         logger.info(f"Generating LODs for {len(elements)} elements")
         
-        for i, element in enumerate(elements):
-            try:
-                element_lod = self._generate_element_lod(
-                    element, target_lods
-                )
+        max_workers = max_workers or os.cpu_count() or 1
+        meshes = self._iter_element_meshes(elements)
+        
+        if max_workers <= 1:
+            for i, mesh in enumerate(meshes):
+                element_lod = _build_element_lod(self._lod_generator, mesh, target_lods)
                 if element_lod:
                     element_lods.append(element_lod)
                 
                 if progress_callback and i % 100 == 0:
                     progress_callback(i + 1, len(elements))
-                    
-            except Exception as e:
-                logger.warning(f"Failed to generate LOD for {element.GlobalId}: {e}")
+            return element_lods
+        
+        done = 0
+        pending = {}
+        results: Dict[int, List[ElementLOD]] = {}
+        next_result = 0
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for sequence, chunk in enumerate(_chunked(meshes, chunk_size)):
+                try:
+                    pending[executor.submit(_generate_lod_chunk, chunk, target_lods)] = (sequence, chunk)
+                except BrokenExecutor as e:
+                    results[sequence] = self._generate_chunk_inline(chunk, target_lods, e)
+                    done += len(chunk)
+                    if progress_callback:
+                        progress_callback(done, len(elements))
+                
+                while len(pending) >= 2 * max_workers:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        seq, chunk = pending.pop(future)
+                        results[seq] = self._chunk_result(future, chunk, target_lods)
+                        done += len(chunk)
+                        if progress_callback:
+                            progress_callback(done, len(elements))
+            
+            for future in list(pending):
+                seq, chunk = pending.pop(future)
+                results[seq] = self._chunk_result(future, chunk, target_lods)
+                done += len(chunk)
+                if progress_callback:
+                    progress_callback(done, len(elements))
+        
+        # Keep model order regardless of completion order
+        while next_result in results:
+            element_lods.extend(results.pop(next_result))
+            next_result += 1
         
         return element_lods
     
-    def _generate_element_lod(
+    def _chunk_result(
         self,
-        element: Any,
+        future: Any,
+        chunk: List[Tuple[Any, ...]],
         target_lods: Optional[List[LODLevel]]
-    ) -> Optional[ElementLOD]:
-        """Generate LOD representations for a single element."""
+    ) -> List[ElementLOD]:
         try:
-            # This would extract actual geometry from IFC
-            # For now, create placeholder
-            
-            element_lod = ElementLOD(
-                element_id=str(element.id()),
-                global_id=element.GlobalId,
-                element_type=element.is_a(),
-                name=getattr(element, 'Name', '')
-            )
-            
-            # Placeholder geometry - production would extract from IFC
-            vertices = np.array([
-                [0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0],
-                [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1]
-            ])
-            faces = np.array([
-                [0, 1, 2], [0, 2, 3],
-                [4, 6, 5], [4, 7, 6],
-                [0, 4, 5], [0, 5, 1],
-                [2, 6, 7], [2, 7, 3]
-            ])
-            
-            element_lod.original_vertex_count = len(vertices)
-            element_lod.original_face_count = len(faces)
-            
-            # Generate LODs
-            representations = self._lod_generator.generate_lod_representations(
-                vertices, faces, target_lods=target_lods
-            )
-            
-            element_lod.representations = representations
-            
-            return element_lod
-            
+            return future.result()
         except Exception as e:
-            logger.warning(f"Failed to generate element LOD: {e}")
-            return None
+            return self._generate_chunk_inline(chunk, target_lods, e)
+    
+    def _generate_chunk_inline(
+        self,
+        chunk: List[Tuple[Any, ...]],
+        target_lods: Optional[List[LODLevel]],
+        error: Exception
+    ) -> List[ElementLOD]:
+        logger.warning(f"LOD chunk of {len(chunk)} elements failed in worker, processing inline: {error}")
+        return _generate_lod_chunk(chunk, target_lods, self._lod_generator)
+    
+    def _iter_element_meshes(self, elements: List[Any]) -> Iterator[Tuple[Any, ...]]:
+        """Tessellate elements in one pass as picklable mesh tuples."""
+        from app.pipelines.ifc_geometry import IFCGeometryExtractor
+        
+        extractor = IFCGeometryExtractor(self.ifc_file_path, ifc_file=self._ifc_file)
+        extractor.initialize_settings()
+        
+        for geometry in extractor.iter_geometry(elements):
+            yield (
+                geometry.element_id,
+                geometry.global_id,
+                geometry.element_type,
+                geometry.name,
+                geometry.vertices.reshape(-1, 3),
+                geometry.faces.reshape(-1, 3),
+            )
     
     def close(self) -> None:
         """Close IFC file."""
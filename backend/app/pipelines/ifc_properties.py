@@ -4,7 +4,9 @@ Extracts property sets (Pset_WallCommon, etc.) from IFC elements.
 """
 
 import json
-from typing import Optional, Dict, List, Any, Union
+from collections import defaultdict, deque
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+from typing import Optional, Dict, List, Any, Union, Callable, Sequence, Tuple, Iterable, Iterator
 from dataclasses import dataclass, field, asdict
 from enum import Enum
 from datetime import datetime
@@ -16,6 +18,7 @@ except ImportError:
     IFC_AVAILABLE = False
 
 from app.core.logging import get_logger
+from app.pipelines.ifc_columnar import ColumnarFormat, ColumnarWriter, PROPERTY_COLUMNS, property_rows
 
 logger = get_logger(__name__)
 
@@ -134,6 +137,154 @@ class ExtractionSummary:
     processing_time: float = 0.0
 
 
+class RelationshipIndex:
+    """
+    Property and association relationships keyed by element step id.
+    
+    Built in one pass over IfcRelDefinesByProperties and IfcRelAssociates
+    instead of walking IsDefinedBy/HasAssociations separately for every
+    element and every consumer (psets, qsets, materials, classification).
+    """
+    
+    def __init__(self):
+        self.definitions: Dict[int, List[Any]] = defaultdict(list)
+        self.associations: Dict[int, List[Any]] = defaultdict(list)
+    
+    @classmethod
+    def build(cls, ifc_file: Any) -> "RelationshipIndex":
+        """Index all relationships in an open IFC file."""
+        index = cls()
+        
+        for rel in ifc_file.by_type('IfcRelDefinesByProperties'):
+            definitions = rel.RelatingPropertyDefinition
+            # IFC4 allows a set of definitions on one relationship
+            if not isinstance(definitions, (list, tuple)):
+                definitions = [definitions]
+            for obj in rel.RelatedObjects or ():
+                index.definitions[obj.id()].extend(definitions)
+        
+        for rel in ifc_file.by_type('IfcRelAssociates'):
+            if rel.is_a('IfcRelAssociatesMaterial') or rel.is_a('IfcRelAssociatesClassification'):
+                for obj in rel.RelatedObjects or ():
+                    index.associations[obj.id()].append(rel)
+        
+        return index
+    
+    @classmethod
+    def for_element(cls, element: Any) -> "RelationshipIndex":
+        """Index a single element by walking its inverse attributes."""
+        index = cls()
+        
+        for rel in getattr(element, 'IsDefinedBy', None) or ():
+            if rel.is_a('IfcRelDefinesByProperties'):
+                definitions = rel.RelatingPropertyDefinition
+                if not isinstance(definitions, (list, tuple)):
+                    definitions = [definitions]
+                index.definitions[element.id()].extend(definitions)
+        
+        for rel in getattr(element, 'HasAssociations', None) or ():
+            if rel.is_a('IfcRelAssociatesMaterial') or rel.is_a('IfcRelAssociatesClassification'):
+                index.associations[element.id()].append(rel)
+        
+        return index
+    
+    def property_sets(self, element: Any) -> List[Any]:
+        """IfcPropertySet definitions of an element."""
+        return [d for d in self.definitions.get(element.id(), ()) if d.is_a('IfcPropertySet')]
+    
+    def quantity_sets(self, element: Any) -> List[Any]:
+        """IfcElementQuantity definitions of an element."""
+        return [d for d in self.definitions.get(element.id(), ()) if d.is_a('IfcElementQuantity')]
+    
+    def materials(self, element: Any) -> List[Any]:
+        """Relating materials of an element, in association order."""
+        return [
+            rel.RelatingMaterial for rel in self.associations.get(element.id(), ())
+            if rel.is_a('IfcRelAssociatesMaterial')
+        ]
+    
+    def classifications(self, element: Any) -> List[Any]:
+        """Relating classifications of an element, in association order."""
+        return [
+            rel.RelatingClassification for rel in self.associations.get(element.id(), ())
+            if rel.is_a('IfcRelAssociatesClassification')
+        ]
+
+
+def iter_element_chunks(
+    ifc_file_path: str,
+    element_ids: Sequence[int],
+    worker: Callable[..., List[Any]],
+    worker_args: Tuple[Any, ...],
+    initializer: Callable[[str], None],
+    max_workers: int,
+    chunk_size: int,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    fallback: Optional[Callable[[List[int]], List[Any]]] = None
+) -> Iterator[Any]:
+    """
+    Run a chunk worker over element step ids on a process pool.
+    
+    Each worker process opens the file once through the initializer;
+    only step ids and plain results cross the process boundary.
+    Results are yielded in model order with at most two chunks per
+    worker in flight, so consumers can stream them. A chunk whose worker
+    fails as a whole (e.g. a crashed process breaking the pool) is
+    processed inline through the fallback; without one the error is
+    raised.
+    
+    Args:
+        ifc_file_path: Path to IFC file
+        element_ids: Element step ids
+        worker: Module-level function taking (step_ids, *worker_args)
+        worker_args: Extra arguments for the worker
+        initializer: Module-level function opening the file in a worker
+        max_workers: Worker processes
+        chunk_size: Elements per worker task
+        progress_callback: Optional progress callback
+        fallback: Inline function taking step_ids, used for failed chunks
+    
+    Yields:
+        Worker results, element by element
+    """
+    pending = deque()
+    done = 0
+    
+    def collect():
+        nonlocal done
+        future, chunk = pending.popleft()
+        try:
+            if future is None:
+                raise BrokenExecutor("process pool is broken")
+            results = future.result()
+        except Exception as e:
+            if fallback is None:
+                raise
+            logger.warning(f"Chunk of {len(chunk)} elements failed in worker, processing inline: {e}")
+            results = fallback(chunk)
+        done += len(chunk)
+        if progress_callback:
+            progress_callback(done, len(element_ids))
+        return results
+    
+    with ProcessPoolExecutor(
+        max_workers=max_workers, initializer=initializer, initargs=(ifc_file_path,)
+    ) as executor:
+        for start in range(0, len(element_ids), chunk_size):
+            chunk = list(element_ids[start:start + chunk_size])
+            try:
+                future = executor.submit(worker, chunk, *worker_args)
+            except BrokenExecutor:
+                future = None
+            pending.append((future, chunk))
+            
+            if len(pending) >= 2 * max_workers:
+                yield from collect()
+        
+        while pending:
+            yield from collect()
+
+
 class IFCPropertyExtractor:
     """
     Extracts property sets and quantities from IFC elements.
@@ -225,9 +376,14 @@ class IFCPropertyExtractor:
         'IfcBuildingStorey': ['Qto_BuildingStoreyBaseQuantities']
     }
     
-    def __init__(self, ifc_file_path: str):
+    def __init__(self, ifc_file_path: str, ifc_file: Optional[Any] = None):
         self.ifc_file_path = ifc_file_path
-        self._ifc_file: Optional[Any] = None
+        self._ifc_file: Optional[Any] = ifc_file  # reuse an already opened file
+        self._relationships: Optional[RelationshipIndex] = None
+        # Parsed sets and associations by definition id; shared between
+        # elements, so treat returned PropertySets as read-only
+        self._set_cache: Dict[int, Optional[PropertySet]] = {}
+        self._association_cache: Dict[int, Dict[str, Any]] = {}
         
         if not IFC_AVAILABLE:
             raise ImportError("IfcOpenShell is required for IFC processing")
@@ -241,6 +397,16 @@ class IFCPropertyExtractor:
             logger.error(f"Failed to open IFC file: {e}")
             return False
     
+    @property
+    def relationships(self) -> Optional[RelationshipIndex]:
+        """Relationship index of the open file, built on first use."""
+        if self._relationships is None and self._ifc_file is not None:
+            self._relationships = RelationshipIndex.build(self._ifc_file)
+        return self._relationships
+    
+    def _relations(self, element: Any) -> RelationshipIndex:
+        return self.relationships or RelationshipIndex.for_element(element)
+    
     def extract_element_properties(
         self, 
         element: Any,
@@ -280,60 +446,97 @@ class IFCPropertyExtractor:
     
     def extract_all_properties(
         self,
-        element_types: Optional[List[str]] = None
+        element_types: Optional[List[str]] = None,
+        include_quantities: bool = True,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        max_workers: Optional[int] = None,
+        chunk_size: int = 256
     ) -> List[ElementProperties]:
         """
         Extract properties for all elements.
         
+        Relationships are indexed once per file. With more than one
+        worker, chunks of elements are extracted on a process pool where
+        each worker opens the file and builds its own index once.
+        
         Args:
             element_types: Optional list of element types to extract
+            include_quantities: Whether to include quantity sets
+            progress_callback: Optional progress callback
+            max_workers: Worker processes (default: 1, runs inline)
+            chunk_size: Elements per worker task
         
         Returns:
             List of ElementProperties
         """
+        return list(self.iter_properties(
+            element_types, include_quantities, progress_callback, max_workers, chunk_size
+        ))
+    
+    def iter_properties(
+        self,
+        element_types: Optional[List[str]] = None,
+        include_quantities: bool = True,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        max_workers: Optional[int] = None,
+        chunk_size: int = 256
+    ) -> Iterator[ElementProperties]:
+        """Yield ElementProperties in model order; see extract_all_properties."""
         if not self._ifc_file:
             if not self.open_file():
-                return []
-        
-        all_properties = []
+                return
         
-        if element_types:
-            elements = []
-            for elem_type in element_types:
-                elements.extend(self._ifc_file.by_type(elem_type))
-        else:
-            elements = self._ifc_file.by_type('IfcElement')
+        elements = self._get_elements(element_types)
         
         logger.info(f"Extracting properties for {len(elements)} elements")
         
-        for element in elements:
+        max_workers = max_workers or 1
+        if max_workers > 1 and len(elements) > chunk_size:
+            yield from iter_element_chunks(
+                self.ifc_file_path,
+                [element.id() for element in elements],
+                _extract_properties_chunk,
+                (include_quantities,),
+                _init_property_worker,
+                max_workers,
+                chunk_size,
+                progress_callback,
+                fallback=lambda ids: _extract_properties_chunk(ids, include_quantities, self)
+            )
+            return
+        
+        for i, element in enumerate(elements):
             try:
-                props = self.extract_element_properties(element)
-                all_properties.append(props)
+                yield self.extract_element_properties(element, include_quantities)
             except Exception as e:
                 logger.warning(f"Failed to extract properties for {element.GlobalId}: {e}")
-        
-        return all_properties
+            
+            if progress_callback and i % 100 == 0:
+                progress_callback(i + 1, len(elements))
+    
+    def _get_elements(self, element_types: Optional[List[str]] = None) -> List[Any]:
+        if element_types:
+            elements = []
+            for elem_type in element_types:
+                elements.extend(self._ifc_file.by_type(elem_type))
+            return elements
+        return self._ifc_file.by_type('IfcElement')
+    
+    def _cached_set(self, definition: Any, parser: Callable[[Any], Optional[PropertySet]]) -> Optional[PropertySet]:
+        key = definition.id()
+        if key not in self._set_cache:
+            self._set_cache[key] = parser(definition)
+        return self._set_cache[key]
     
     def _extract_property_sets(self, element: Any) -> List[PropertySet]:
         """Extract property sets from element."""
         property_sets = []
         
         try:
-            # Get property set relations
-            if hasattr(element, 'IsDefinedBy'):
-                for definition in element.IsDefinedBy:
-                    if definition.is_a('IfcRelDefinesByProperties'):
-                        property_set_def = definition.RelatingPropertyDefinition
-                        
-                        if property_set_def.is_a('IfcPropertySet'):
-                            pset = self._parse_property_set(property_set_def)
-                            if pset:
-                                property_sets.append(pset)
-                        
-                        elif property_set_def.is_a('IfcPropertySetDefinition'):
-                            # Handle other property set definition types
-                            pass
+            for property_set_def in self._relations(element).property_sets(element):
+                pset = self._cached_set(property_set_def, self._parse_property_set)
+                if pset:
+                    property_sets.append(pset)
         
         except Exception as e:
             logger.warning(f"Failed to extract property sets: {e}")
@@ -422,15 +625,10 @@ class IFCPropertyExtractor:
         quantity_sets = []
         
         try:
-            if hasattr(element, 'IsDefinedBy'):
-                for definition in element.IsDefinedBy:
-                    if definition.is_a('IfcRelDefinesByProperties'):
-                        quantity_def = definition.RelatingPropertyDefinition
-                        
-                        if quantity_def.is_a('IfcElementQuantity'):
-                            qset = self._parse_quantity_set(quantity_def)
-                            if qset:
-                                quantity_sets.append(qset)
+            for quantity_def in self._relations(element).quantity_sets(element):
+                qset = self._cached_set(quantity_def, self._parse_quantity_set)
+                if qset:
+                    quantity_sets.append(qset)
         
         except Exception as e:
             logger.warning(f"Failed to extract quantity sets: {e}")
@@ -525,63 +723,83 @@ class IFCPropertyExtractor:
         material_info = {}
         
         try:
-            if hasattr(element, 'HasAssociations'):
-                for association in element.HasAssociations:
-                    if association.is_a('IfcRelAssociatesMaterial'):
-                        material = association.RelatingMaterial
-                        
-                        if material.is_a('IfcMaterial'):
-                            material_info['name'] = material.Name
-                            material_info['category'] = getattr(material, 'Category', None)
-                        
-                        elif material.is_a('IfcMaterialLayerSet'):
-                            material_info['type'] = 'layer_set'
-                            material_info['layers'] = [
-                                {
-                                    'material': layer.Material.Name if layer.Material else None,
-                                    'thickness': layer.LayerThickness
-                                }
-                                for layer in material.MaterialLayers
-                            ]
-                        
-                        elif material.is_a('IfcMaterialProfileSet'):
-                            material_info['type'] = 'profile_set'
-                            material_info['profiles'] = [
-                                {
-                                    'name': profile.Name,
-                                    'material': profile.Material.Name if profile.Material else None
-                                }
-                                for profile in material.MaterialProfiles
-                            ]
+            for material in self._relations(element).materials(element):
+                material_info.update(self._cached_association(material, self._parse_material))
         
         except Exception as e:
             logger.warning(f"Failed to extract material info: {e}")
         
         return material_info
     
+    def _parse_material(self, material: Any) -> Dict[str, Any]:
+        """Parse a relating material into material info fields."""
+        if material.is_a('IfcMaterial'):
+            return {
+                'name': material.Name,
+                'category': getattr(material, 'Category', None)
+            }
+        
+        if material.is_a('IfcMaterialLayerSet'):
+            return {
+                'type': 'layer_set',
+                'layers': [
+                    {
+                        'material': layer.Material.Name if layer.Material else None,
+                        'thickness': layer.LayerThickness
+                    }
+                    for layer in material.MaterialLayers
+                ]
+            }
+        
+        if material.is_a('IfcMaterialProfileSet'):
+            return {
+                'type': 'profile_set',
+                'profiles': [
+                    {
+                        'name': profile.Name,
+                        'material': profile.Material.Name if profile.Material else None
+                    }
+                    for profile in material.MaterialProfiles
+                ]
+            }
+        
+        return {}
+    
     def _extract_classification(self, element: Any) -> Dict[str, Any]:
         """Extract classification information for element."""
         classification = {}
         
         try:
-            if hasattr(element, 'HasAssociations'):
-                for association in element.HasAssociations:
-                    if association.is_a('IfcRelAssociatesClassification'):
-                        classification_ref = association.RelatingClassification
-                        
-                        if classification_ref.is_a('IfcClassificationReference'):
-                            classification['reference'] = classification_ref.Identification
-                            classification['name'] = classification_ref.Name
-                            
-                            if classification_ref.ReferencedSource:
-                                source = classification_ref.ReferencedSource
-                                classification['source'] = source.Name if hasattr(source, 'Name') else None
+            for classification_ref in self._relations(element).classifications(element):
+                classification.update(
+                    self._cached_association(classification_ref, self._parse_classification)
+                )
         
         except Exception as e:
             logger.warning(f"Failed to extract classification: {e}")
         
         return classification
     
+    def _parse_classification(self, classification_ref: Any) -> Dict[str, Any]:
+        """Parse a relating classification into classification fields."""
+        classification = {}
+        
+        if classification_ref.is_a('IfcClassificationReference'):
+            classification['reference'] = classification_ref.Identification
+            classification['name'] = classification_ref.Name
+            
+            if classification_ref.ReferencedSource:
+                source = classification_ref.ReferencedSource
+                classification['source'] = source.Name if hasattr(source, 'Name') else None
+        
+        return classification
+    
+    def _cached_association(self, entity: Any, parser: Callable[[Any], Dict[str, Any]]) -> Dict[str, Any]:
+        key = entity.id()
+        if key not in self._association_cache:
+            self._association_cache[key] = parser(entity)
+        return self._association_cache[key]
+    
     def _convert_value(self, value: Any) -> Any:
         """Convert IFC value to Python value."""
         if value is None:
@@ -655,9 +873,79 @@ class IFCPropertyExtractor:
             logger.error(f"Export failed: {e}")
             return False
     
+    def export_to_columnar(
+        self,
+        output_path: str,
+        properties: Optional[Iterable[ElementProperties]] = None,
+        format: ColumnarFormat = ColumnarFormat.PARQUET,
+        row_group_size: int = 65536,
+        **extract_kwargs: Any
+    ) -> bool:
+        """
+        Export properties as one typed row per property or quantity.
+        
+        Rows are written in row groups as elements arrive, so memory is
+        bounded by the row group. Without pyarrow the output is CSV.
+        
+        Args:
+            output_path: Output file path
+            properties: ElementProperties to export (default: stream the
+                whole model through iter_properties)
+            format: Parquet, Arrow IPC or CSV
+            row_group_size: Rows per row group
+            **extract_kwargs: Passed to iter_properties when streaming
+        
+        Returns:
+            True if the file was written
+        """
+        if properties is None:
+            properties = self.iter_properties(**extract_kwargs)
+        
+        try:
+            with ColumnarWriter(output_path, PROPERTY_COLUMNS, format, row_group_size) as writer:
+                for elem_props in properties:
+                    writer.write_rows(property_rows(elem_props))
+            
+            logger.info(f"Exported {writer.rows_written} property rows to {writer.output_path}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Columnar export failed: {e}")
+            return False
+    
     def close(self) -> None:
         """Close IFC file."""
         self._ifc_file = None
+        self._relationships = None
+        self._set_cache.clear()
+        self._association_cache.clear()
+
+
+_worker_extractor: Optional[IFCPropertyExtractor] = None
+
+
+def _init_property_worker(ifc_file_path: str) -> None:
+    """Process pool initializer: open the file once per worker."""
+    global _worker_extractor
+    _worker_extractor = IFCPropertyExtractor(ifc_file_path)
+    _worker_extractor.open_file()
+
+
+def _extract_properties_chunk(
+    element_ids: List[int],
+    include_quantities: bool,
+    extractor: Optional[IFCPropertyExtractor] = None
+) -> List[ElementProperties]:
+    """Process pool entry point: properties for a chunk of elements."""
+    extractor = extractor or _worker_extractor
+    all_properties = []
+    for element_id in element_ids:
+        element = extractor._ifc_file.by_id(element_id)
+        try:
+            all_properties.append(extractor.extract_element_properties(element, include_quantities))
+        except Exception as e:
+            logger.warning(f"Failed to extract properties for {element.GlobalId}: {e}")
+    return all_properties
 
 
 # Convenience function
@@ -9,6 +9,7 @@ from dataclasses import dataclass, field
 from enum import Enum
 import json
 import hashlib
+import os
 
 try:
     from rtree import index
@@ -142,45 +143,123 @@ class SpatialQueryResult:
         return len(self.objects)
 
 
+@dataclass
+class ClashPairs:
+    """
+    Overlapping object pairs from a spatial self-join.
+    
+    ``first``/``second`` index into ``global_ids``; each pair appears once
+    with first < second.
+    """
+    global_ids: np.ndarray
+    first: np.ndarray
+    second: np.ndarray
+    overlap: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.first)
+    
+    def pairs(self) -> Iterator[Tuple[str, str, float]]:
+        """Iterate (global_id_a, global_id_b, overlap_volume)."""
+        for a, b, v in zip(self.first.tolist(), self.second.tolist(), self.overlap.tolist()):
+            yield self.global_ids[a], self.global_ids[b], v
+
+
 class RTreeSpatialIndex:
     """
     R-tree based spatial index for IFC elements.
     Provides efficient spatial queries for clash detection and selection.
+    
+    Pass a path to keep the tree on disk (``<path>.idx``/``<path>.dat``
+    plus a ``<path>.objects.json`` object table); ``open`` then reattaches
+    to it without rebuilding.
     """
     
-    def __init__(self, dimension: int = 3):
+    def __init__(self, dimension: int = 3, path: Optional[str] = None):
         self.dimension = dimension
+        self.path = path
+        self.signature: Optional[str] = None
         self._index: Optional[index.Index] = None
         self._objects: Dict[str, SpatialObject] = {}
+        self._rids: Dict[str, int] = {}
+        self._global_ids: Dict[int, str] = {}
         self._id_counter = 0
+        self._arrays: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
         
         if not RTREE_AVAILABLE:
             raise ImportError("R-tree library is required for spatial indexing")
     
-    def create_index(self, temp_dir: Optional[str] = None) -> None:
-        """Create new R-tree index."""
+    def _properties(self, overwrite: bool = True) -> 'index.Property':
         p = index.Property()
         p.dimension = self.dimension
+        if self.path:
+            p.overwrite = overwrite
+        return p
+    
+    def create_index(self, temp_dir: Optional[str] = None) -> None:
+        """Create new R-tree index."""
+        p = self._properties()
         
         if temp_dir:
             p.dat_extension = 'rtree_dat'
             p.idx_extension = 'rtree_idx'
         
-        self._index = index.Index(properties=p)
+        if self.path:
+            self._index = index.Index(self.path, properties=p)
+        else:
+            self._index = index.Index(properties=p)
         logger.info(f"Created {self.dimension}D R-tree index")
     
+    def bulk_load(self, objects: List[SpatialObject]) -> int:
+        """
+        Replace the index contents with objects in one packed build.
+        
+        Uses the libspatialindex bulk loader (sort-tile-recursive
+        packing), which is much faster than repeated inserts and gives
+        fuller, less overlapping nodes.
+        """
+        unique = {obj.global_id: obj for obj in objects}
+        self.clear()
+        
+        if not unique:
+            self.create_index()
+            return 0
+        
+        boxes = np.array([obj.bounding_box.to_tuple() for obj in unique.values()], dtype=np.float64)
+        ids = np.arange(1, len(unique) + 1, dtype=np.int64)
+        
+        if self.path:
+            self._index = index.Index(self.path, (ids, boxes[:, :3], boxes[:, 3:]), properties=self._properties())
+        else:
+            self._index = index.Index((ids, boxes[:, :3], boxes[:, 3:]), properties=self._properties())
+        
+        for rid, obj in zip(ids.tolist(), unique.values()):
+            self._objects[obj.global_id] = obj
+            self._rids[obj.global_id] = rid
+            self._global_ids[rid] = obj.global_id
+        self._id_counter = len(unique)
+        
+        logger.info(f"Bulk loaded {len(unique)} objects into index")
+        return len(unique)
+    
     def insert(self, obj: SpatialObject) -> bool:
-        """Insert object into spatial index."""
+        """Insert object into spatial index; an existing GlobalId is updated."""
         if not self._index:
             self.create_index()
         
+        if obj.global_id in self._objects:
+            return self.update(obj)
+        
         try:
             self._id_counter += 1
             idx_id = self._id_counter
             
             bbox = obj.bounding_box.to_tuple()
-            self._index.insert(idx_id, bbox, obj=obj.global_id)
+            self._index.insert(idx_id, bbox)
+            self._arrays = None
             self._objects[obj.global_id] = obj
+            self._rids[obj.global_id] = idx_id
+            self._global_ids[idx_id] = obj.global_id
             
             return True
             
@@ -189,11 +268,14 @@ class RTreeSpatialIndex:
             return False
     
     def insert_many(self, objects: List[SpatialObject]) -> int:
-        """Insert multiple objects into index."""
-        inserted = 0
-        for obj in objects:
-            if self.insert(obj):
-                inserted += 1
+        """Insert multiple objects into index; bulk loads an empty index."""
+        if not self._objects:
+            inserted = self.bulk_load(objects)
+        else:
+            inserted = 0
+            for obj in objects:
+                if self.insert(obj):
+                    inserted += 1
         
         logger.info(f"Inserted {inserted}/{len(objects)} objects into index")
         return inserted
@@ -204,19 +286,43 @@ class RTreeSpatialIndex:
             return False
         
         try:
-            obj = self._objects[global_id]
-            
-            # Find and remove from index
-            # Note: R-tree doesn't support direct deletion by object ID
-            # We need to rebuild or use a different approach
-            
-            del self._objects[global_id]
+            self._arrays = None
+            obj = self._objects.pop(global_id)
+            rid = self._rids.pop(global_id)
+            del self._global_ids[rid]
+            self._index.delete(rid, obj.bounding_box.to_tuple())
             return True
             
         except Exception as e:
             logger.error(f"Failed to remove object {global_id}: {e}")
             return False
     
+    def update(self, obj: SpatialObject) -> bool:
+        """Replace the stored object and its box for obj.global_id."""
+        previous = self._objects.get(obj.global_id)
+        if previous is None:
+            return self.insert(obj)
+        
+        try:
+            self._arrays = None
+            rid = self._rids[obj.global_id]
+            if previous.bounding_box.to_tuple() != obj.bounding_box.to_tuple():
+                self._index.delete(rid, previous.bounding_box.to_tuple())
+                self._index.insert(rid, obj.bounding_box.to_tuple())
+            self._objects[obj.global_id] = obj
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to update object {obj.global_id}: {e}")
+            return False
+    
+    def get(self, global_id: str) -> Optional[SpatialObject]:
+        """Get an indexed object by GlobalId."""
+        return self._objects.get(global_id)
+    
+    def __len__(self) -> int:
+        return len(self._objects)
+    
     def intersects(
         self, 
         bbox: BoundingBox,
@@ -230,17 +336,17 @@ class RTreeSpatialIndex:
             objects_only: If True, return SpatialObjects; else return IDs
         
         Returns:
-            List of intersecting objects or IDs
+            List of intersecting objects or GlobalIds
         """
         if not self._index:
             return []
         
         try:
-            results = list(self._index.intersection(bbox.to_tuple(), objects=objects_only))
+            results = [self._global_ids[r] for r in self._index.intersection(bbox.to_tuple())]
             
             if objects_only:
                 # Return SpatialObjects
-                return [self._objects.get(r) for r in results if r in self._objects]
+                return [self._objects[r] for r in results]
             else:
                 # Return IDs
                 return results
@@ -275,9 +381,9 @@ class RTreeSpatialIndex:
                 point[0] + epsilon, point[1] + epsilon, point[2] + epsilon
             )
             
-            results = list(self._index.nearest(bbox, num_results, objects=True))
+            results = self._index.nearest(bbox, num_results)
             
-            return [self._objects.get(r) for r in results if r in self._objects]
+            return [self._objects[self._global_ids[r]] for r in results]
             
         except Exception as e:
             logger.error(f"Nearest query failed: {e}")
@@ -296,13 +402,13 @@ class RTreeSpatialIndex:
                 point[0] + epsilon, point[1] + epsilon, point[2] + epsilon
             )
             
-            candidates = list(self._index.intersection(bbox, objects=True))
+            candidates = self._index.intersection(bbox)
             
             # Filter to those that actually contain the point
             results = []
-            for global_id in candidates:
-                obj = self._objects.get(global_id)
-                if obj and obj.bounding_box.contains_point(point):
+            for rid in candidates:
+                obj = self._objects[self._global_ids[rid]]
+                if obj.bounding_box.contains_point(point):
                     results.append(obj)
             
             return results
@@ -340,40 +446,114 @@ class RTreeSpatialIndex:
         Find all potential clashes (intersections) between objects.
         
         Args:
-            tolerance: Minimum overlap distance to consider a clash
+            tolerance: Minimum overlap volume to consider a clash
         
         Returns:
             List of (object1, object2, overlap_volume) tuples
         """
-        clashes = []
-        checked_pairs = set()
+        result = self.clash_pairs(min_overlap=tolerance)
+        return [
+            (self._objects[a], self._objects[b], overlap)
+            for a, b, overlap in result.pairs()
+        ]
+    
+    def _snapshot(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """GlobalIds, (n, 6) boxes and element types in insertion order."""
+        if self._arrays is None:
+            objects = list(self._objects.values())
+            global_ids = np.array([o.global_id for o in objects], dtype=object)
+            boxes = np.array(
+                [o.bounding_box.to_tuple() for o in objects], dtype=np.float64
+            ).reshape(-1, 6)
+            types = np.array([o.element_type for o in objects], dtype=object)
+            self._arrays = (global_ids, boxes, types)
+        return self._arrays
+    
+    def clash_pairs(
+        self,
+        tolerance: float = 0.0,
+        min_overlap: Optional[float] = None,
+        types_a: Optional[List[str]] = None,
+        types_b: Optional[List[str]] = None,
+        chunk_pairs: int = 1000000
+    ) -> ClashPairs:
+        """
+        Self-join the index: every pair of boxes within tolerance, once.
         
-        for obj_id, obj in self._objects.items():
-            # Find candidates that intersect
-            candidates = self.intersects(obj.bounding_box, objects_only=True)
-            
-            for other in candidates:
-                if other.global_id == obj.global_id:
-                    continue
+        Boxes are swept along the axis with the widest spread; each box
+        is paired only with boxes that start after it and before its end
+        on that axis, so no pair is produced twice and no dedup set is
+        needed. Candidates are expanded and filtered in vectorized chunks
+        of about chunk_pairs.
+        
+        Args:
+            tolerance: Gap up to which separated boxes still pair
+            min_overlap: Keep only pairs whose overlap volume exceeds this
+            types_a: Element types for one side of a pair (default: any)
+            types_b: Element types for the other side (default: any)
+            chunk_pairs: Candidate pairs examined per vectorized step
+        
+        Returns:
+            ClashPairs with index arrays into its global_ids
+        """
+        global_ids, boxes, types = self._snapshot()
+        empty = np.empty(0, dtype=np.int64)
+        
+        # Drop objects that cannot satisfy either side of the type filter
+        in_a = np.isin(types, types_a) if types_a else np.ones(len(types), dtype=bool)
+        in_b = np.isin(types, types_b) if types_b else np.ones(len(types), dtype=bool)
+        candidates = np.flatnonzero(in_a | in_b)
+        if len(candidates) < 2:
+            return ClashPairs(global_ids, empty, empty, np.empty(0))
+        
+        lo = boxes[candidates, :3] - tolerance / 2
+        hi = boxes[candidates, 3:] + tolerance / 2
+        axis = int(np.argmax(np.ptp(lo + hi, axis=0)))
+        order = np.argsort(lo[:, axis], kind='stable')
+        lo, hi, candidates = lo[order], hi[order], candidates[order]
+        
+        # Box k pairs with sorted boxes k+1 .. end[k]-1
+        end = np.searchsorted(lo[:, axis], hi[:, axis], side='right')
+        counts = np.maximum(end - np.arange(len(lo)) - 1, 0)
+        bounds = np.concatenate([[0], np.cumsum(counts)])
+        
+        firsts, seconds, overlaps = [], [], []
+        start = 0
+        while start < len(lo):
+            stop = max(start + 1, int(np.searchsorted(bounds, bounds[start] + chunk_pairs, side='right')) - 1)
+            stop = min(stop, len(lo))
+            block = counts[start:stop]
+            if block.sum():
+                i = np.repeat(np.arange(start, stop), block)
+                j = np.arange(len(i)) - np.repeat(bounds[start:stop] - bounds[start], block) + i + 1
                 
-                # Create unique pair key
-                pair_key = tuple(sorted([obj.global_id, other.global_id]))
-                if pair_key in checked_pairs:
-                    continue
-                checked_pairs.add(pair_key)
+                hit = np.all((lo[i] <= hi[j]) & (hi[i] >= lo[j]), axis=1)
+                i, j = i[hit], j[hit]
+                a, b = candidates[i], candidates[j]
                 
-                # Check for actual intersection
-                if obj.bounding_box.intersects(other.bounding_box):
-                    # Calculate overlap volume
-                    overlap = self._calculate_overlap(
-                        obj.bounding_box, 
-                        other.bounding_box
-                    )
-                    
-                    if overlap > tolerance:
-                        clashes.append((obj, other, overlap))
+                if types_a or types_b:
+                    keep = (in_a[a] & in_b[b]) | (in_a[b] & in_b[a])
+                    a, b = a[keep], b[keep]
+                
+                overlap = np.prod(np.clip(
+                    np.minimum(boxes[a, 3:], boxes[b, 3:]) - np.maximum(boxes[a, :3], boxes[b, :3]),
+                    0, None
+                ), axis=1)
+                if min_overlap is not None:
+                    keep = overlap > min_overlap
+                    a, b, overlap = a[keep], b[keep], overlap[keep]
+                
+                firsts.append(np.minimum(a, b))
+                seconds.append(np.maximum(a, b))
+                overlaps.append(overlap)
+            start = stop
+        
+        if not firsts:
+            return ClashPairs(global_ids, empty, empty, np.empty(0))
         
-        return clashes
+        first, second, overlap = (np.concatenate(x) for x in (firsts, seconds, overlaps))
+        order = np.lexsort((second, first))
+        return ClashPairs(global_ids, first[order], second[order], overlap[order])
     
     def _calculate_overlap(
         self, 
@@ -398,7 +578,7 @@ class RTreeSpatialIndex:
     
     def get_bounds(self) -> Optional[BoundingBox]:
         """Get bounding box of entire index."""
-        if not self._index:
+        if not self._index or not self._objects:
             return None
         
         try:
@@ -425,12 +605,79 @@ class RTreeSpatialIndex:
     
     def clear(self) -> None:
         """Clear the index."""
+        self._arrays = None
         self._objects.clear()
+        self._rids.clear()
+        self._global_ids.clear()
         self._id_counter = 0
         if self._index:
             self._index.close()
             self._index = None
     
+    def _object_table_path(self) -> str:
+        return f"{self.path}.objects.json"
+    
+    def flush(self) -> bool:
+        """Write a disk-backed index and its object table to disk."""
+        if not self.path or not self._index:
+            return False
+        
+        try:
+            self._index.flush()
+            data = {
+                "dimension": self.dimension,
+                "id_counter": self._id_counter,
+                "signature": self.signature,
+                "objects": [
+                    dict(v.to_dict(), rid=self._rids[k]) for k, v in self._objects.items()
+                ]
+            }
+            
+            tmp_path = f"{self._object_table_path()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self._object_table_path())
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to flush index: {e}")
+            return False
+    
+    def close(self) -> None:
+        """Flush a disk-backed index and release it."""
+        self.flush()
+        if self._index:
+            self._index.close()
+            self._index = None
+    
+    @classmethod
+    def open(cls, path: str) -> Optional['RTreeSpatialIndex']:
+        """Reattach to an index written with a path, without rebuilding it."""
+        try:
+            if not os.path.exists(f"{path}.idx"):
+                return None
+            
+            with open(f"{path}.objects.json", 'r') as f:
+                data = json.load(f)
+            
+            instance = cls(dimension=data.get('dimension', 3), path=path)
+            instance._index = index.Index(path, properties=instance._properties(overwrite=False))
+            instance._id_counter = data.get('id_counter', 0)
+            instance.signature = data.get('signature')
+            
+            for obj_data in data.get('objects', []):
+                obj = _spatial_object_from_dict(obj_data)
+                instance._objects[obj.global_id] = obj
+                instance._rids[obj.global_id] = obj_data['rid']
+                instance._global_ids[obj_data['rid']] = obj.global_id
+            
+            logger.info(f"Opened spatial index at {path} ({len(instance._objects)} objects)")
+            return instance
+            
+        except Exception as e:
+            logger.error(f"Failed to open index: {e}")
+            return None
+    
     def save(self, filepath: str) -> bool:
         """Save index to file."""
         try:
@@ -458,23 +705,12 @@ class RTreeSpatialIndex:
                 data = json.load(f)
             
             instance = cls(dimension=data.get('dimension', 3))
-            instance._id_counter = data.get('id_counter', 0)
             
             # Rebuild index
-            instance.create_index()
-            
-            for global_id, obj_data in data.get('objects', {}).items():
-                bbox = BoundingBox(**obj_data['bounding_box'])
-                obj = SpatialObject(
-                    id=obj_data['id'],
-                    global_id=obj_data['global_id'],
-                    element_type=obj_data['element_type'],
-                    name=obj_data['name'],
-                    bounding_box=bbox,
-                    geometry_hash=obj_data.get('geometry_hash'),
-                    metadata=obj_data.get('metadata', {})
-                )
-                instance.insert(obj)
+            instance.bulk_load([
+                _spatial_object_from_dict(obj_data)
+                for obj_data in data.get('objects', {}).values()
+            ])
             
             logger.info(f"Loaded spatial index from {filepath}")
             return instance
@@ -484,6 +720,18 @@ class RTreeSpatialIndex:
             return None
 
 
+def _spatial_object_from_dict(obj_data: Dict[str, Any]) -> SpatialObject:
+    return SpatialObject(
+        id=obj_data['id'],
+        global_id=obj_data['global_id'],
+        element_type=obj_data['element_type'],
+        name=obj_data['name'],
+        bounding_box=BoundingBox(**obj_data['bounding_box']),
+        geometry_hash=obj_data.get('geometry_hash'),
+        metadata=obj_data.get('metadata', {})
+    )
+
+
 class IFCSpatialIndexer:
     """Builds spatial index from IFC file."""
     
@@ -506,7 +754,8 @@ class IFCSpatialIndexer:
     def build_index(
         self,
         element_types: Optional[List[str]] = None,
-        progress_callback: Optional[Callable[[int, int], None]] = None
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        index_path: Optional[str] = None
     ) -> RTreeSpatialIndex:
         """
         Build spatial index from IFC elements.
@@ -514,6 +763,7 @@ class IFCSpatialIndexer:
         Args:
             element_types: Optional list of element types to index
             progress_callback: Optional callback(current, total)
+            index_path: Optional path to keep the index on disk
         
         Returns:
             RTreeSpatialIndex with all elements
@@ -522,8 +772,7 @@ class IFCSpatialIndexer:
             if not self.open_file():
                 raise ValueError("Failed to open IFC file")
         
-        spatial_index = RTreeSpatialIndex(dimension=3)
-        spatial_index.create_index()
+        spatial_index = RTreeSpatialIndex(dimension=3, path=index_path)
         
         # Get elements to index
         if element_types:
@@ -536,11 +785,12 @@ class IFCSpatialIndexer:
         logger.info(f"Building spatial index for {len(elements)} elements")
         
         # Process each element
+        spatial_objects = []
         for i, element in enumerate(elements):
             try:
                 spatial_obj = self._create_spatial_object(element)
                 if spatial_obj:
-                    spatial_index.insert(spatial_obj)
+                    spatial_objects.append(spatial_obj)
                 
                 if progress_callback and i % 100 == 0:
                     progress_callback(i + 1, len(elements))
@@ -548,6 +798,8 @@ class IFCSpatialIndexer:
             except Exception as e:
                 logger.warning(f"Failed to index element {element.GlobalId}: {e}")
         
+        spatial_index.bulk_load(spatial_objects)
+        
         logger.info(f"Built spatial index with {len(spatial_index._objects)} objects")
         
         return spatial_index
@@ -592,9 +844,17 @@ class IFCSpatialIndexer:
 
 
 # Convenience function
+def _source_signature(ifc_file_path: str, element_types: Optional[List[str]]) -> str:
+    """Identify an IFC file version and type filter without reading the file."""
+    stat = os.stat(ifc_file_path)
+    data = f"{os.path.abspath(ifc_file_path)}:{stat.st_size}:{stat.st_mtime_ns}:{sorted(element_types or [])}"
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
 async def build_ifc_spatial_index(
     ifc_file_path: str,
-    element_types: Optional[List[str]] = None
+    element_types: Optional[List[str]] = None,
+    index_path: Optional[str] = None
 ) -> RTreeSpatialIndex:
     """
     Build spatial index from IFC file.
@@ -602,11 +862,26 @@ async def build_ifc_spatial_index(
     Args:
         ifc_file_path: Path to IFC file
         element_types: Optional list of element types to index
+        index_path: Optional on-disk location; an index already built there
+            from the same file and types is reopened instead of rebuilt
     
     Returns:
         RTreeSpatialIndex
     """
+    signature = _source_signature(ifc_file_path, element_types) if index_path else None
+    
+    if index_path:
+        existing = RTreeSpatialIndex.open(index_path)
+        if existing and existing.signature == signature:
+            return existing
+        if existing:
+            existing.close()
+    
     indexer = IFCSpatialIndexer(ifc_file_path)
-    index = indexer.build_index(element_types)
+    index = indexer.build_index(element_types, index_path=index_path)
     indexer.close()
+    
+    if index_path:
+        index.signature = signature
+        index.flush()
     return index
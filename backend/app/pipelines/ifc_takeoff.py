@@ -4,7 +4,7 @@ Extracts quantities from IFC models for cost estimation and material planning.
 """
 
 import json
-from typing import Optional, Dict, List, Any, Callable
+from typing import Optional, Dict, List, Any, Callable, Iterable, Iterator
 from dataclasses import dataclass, field
 from enum import Enum
 from datetime import datetime
@@ -17,8 +17,9 @@ except ImportError:
     IFC_AVAILABLE = False
 
 from app.core.logging import get_logger
+from app.pipelines.ifc_columnar import ColumnarFormat, ColumnarWriter, TAKEOFF_COLUMNS, takeoff_rows
 from app.pipelines.ifc_properties import (
-    IFCPropertyExtractor, PropertyValue, PropertySet
+    IFCPropertyExtractor, ElementProperties, PropertyValue, PropertySet, iter_element_chunks
 )
 
 logger = get_logger(__name__)
@@ -164,8 +165,9 @@ class QuantityTakeoffEngine:
         """Open IFC file."""
         try:
             self._ifc_file = ifcopenshell.open(self.ifc_file_path)
-            self._property_extractor = IFCPropertyExtractor(self.ifc_file_path)
-            self._property_extractor.open_file()
+            self._property_extractor = IFCPropertyExtractor(
+                self.ifc_file_path, ifc_file=self._ifc_file
+            )
             return True
         except Exception as e:
             logger.error(f"Failed to open IFC file: {e}")
@@ -175,50 +177,76 @@ class QuantityTakeoffEngine:
         self,
         element_types: Optional[List[str]] = None,
         include_calculated: bool = True,
-        progress_callback: Optional[Callable[[int, int], None]] = None
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        max_workers: Optional[int] = None,
+        chunk_size: int = 256
     ) -> List[ElementTakeoff]:
         """
         Generate quantity takeoff for all elements.
         
+        Property, quantity, material and classification relationships are
+        indexed once per file and shared by all elements. With more than
+        one worker, chunks of elements are taken off on a process pool.
+        
         Args:
             element_types: Optional list of element types
             include_calculated: Whether to include calculated quantities
             progress_callback: Optional progress callback
+            max_workers: Worker processes (default: 1, runs inline)
+            chunk_size: Elements per worker task
         
         Returns:
             List of ElementTakeoff
         """
+        takeoffs = list(self.iter_takeoff(
+            element_types, include_calculated, progress_callback, max_workers, chunk_size
+        ))
+        logger.info(f"Generated takeoff for {len(takeoffs)} elements")
+        return takeoffs
+    
+    def iter_takeoff(
+        self,
+        element_types: Optional[List[str]] = None,
+        include_calculated: bool = True,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        max_workers: Optional[int] = None,
+        chunk_size: int = 256
+    ) -> Iterator[ElementTakeoff]:
+        """Yield ElementTakeoff in model order; see generate_takeoff."""
         if not self._ifc_file:
             if not self.open_file():
-                return []
+                return
         
-        takeoffs = []
-        
-        # Get elements
-        if element_types:
-            elements = []
-            for elem_type in element_types:
-                elements.extend(self._ifc_file.by_type(elem_type))
-        else:
-            elements = self._ifc_file.by_type('IfcElement')
+        elements = self._property_extractor._get_elements(element_types)
         
         logger.info(f"Generating takeoff for {len(elements)} elements")
         
+        max_workers = max_workers or 1
+        if max_workers > 1 and len(elements) > chunk_size:
+            yield from iter_element_chunks(
+                self.ifc_file_path,
+                [element.id() for element in elements],
+                _takeoff_chunk,
+                (include_calculated,),
+                _init_takeoff_worker,
+                max_workers,
+                chunk_size,
+                progress_callback,
+                fallback=lambda ids: _takeoff_chunk(ids, include_calculated, self)
+            )
+            return
+        
         for i, element in enumerate(elements):
             try:
                 takeoff = self._generate_element_takeoff(element, include_calculated)
                 if takeoff:
-                    takeoffs.append(takeoff)
+                    yield takeoff
                 
                 if progress_callback and i % 100 == 0:
                     progress_callback(i + 1, len(elements))
                     
             except Exception as e:
                 logger.warning(f"Failed to generate takeoff for {element.GlobalId}: {e}")
-        
-        logger.info(f"Generated takeoff for {len(takeoffs)} elements")
-        
-        return takeoffs
     
     def _generate_element_takeoff(
         self, 
@@ -234,20 +262,22 @@ class QuantityTakeoffEngine:
                 name=getattr(element, 'Name', '')
             )
             
+            # Property sets, material and classification in one lookup
+            props = self._property_extractor.extract_element_properties(
+                element, include_quantities=False
+            )
+            
             # Extract IFC quantities
             ifc_quantities = self._extract_ifc_quantities(element)
             takeoff.quantities.extend(ifc_quantities)
             
             # Calculate additional quantities if requested
             if include_calculated:
-                calculated = self._calculate_quantities(element)
+                calculated = self._calculate_quantities(element, props)
                 takeoff.quantities.extend(calculated)
             
-            # Get classification
-            takeoff.classification = self._property_extractor._extract_classification(element)
-            
-            # Get material
-            takeoff.material = self._property_extractor._extract_material_info(element)
+            takeoff.classification = props.classification
+            takeoff.material = props.material_info
             
             return takeoff
             
@@ -260,17 +290,11 @@ class QuantityTakeoffEngine:
         quantities = []
         
         try:
-            # Get quantity sets
-            if hasattr(element, 'IsDefinedBy'):
-                for definition in element.IsDefinedBy:
-                    if definition.is_a('IfcRelDefinesByProperties'):
-                        quantity_def = definition.RelatingPropertyDefinition
-                        
-                        if quantity_def.is_a('IfcElementQuantity'):
-                            for q in quantity_def.Quantities:
-                                quantity = self._parse_ifc_quantity(q)
-                                if quantity:
-                                    quantities.append(quantity)
+            for quantity_def in self._property_extractor._relations(element).quantity_sets(element):
+                for q in quantity_def.Quantities:
+                    quantity = self._parse_ifc_quantity(q)
+                    if quantity:
+                        quantities.append(quantity)
         
         except Exception as e:
             logger.warning(f"Failed to extract IFC quantities: {e}")
@@ -348,7 +372,11 @@ class QuantityTakeoffEngine:
         
         return None
     
-    def _calculate_quantities(self, element: Any) -> List[Quantity]:
+    def _calculate_quantities(
+        self,
+        element: Any,
+        props: Optional[ElementProperties] = None
+    ) -> List[Quantity]:
         """Calculate additional quantities from geometry."""
         calculated = []
         
@@ -356,7 +384,10 @@ class QuantityTakeoffEngine:
             element_type = element.is_a()
             
             # Get dimensions from properties
-            props = self._property_extractor.extract_element_properties(element)
+            if props is None:
+                props = self._property_extractor.extract_element_properties(
+                    element, include_quantities=False
+                )
             
             # Calculate based on element type
             if element_type == 'IfcWall':
@@ -482,20 +513,23 @@ class QuantityTakeoffEngine:
         """Generate summary of takeoff results."""
         summary = TakeoffSummary(total_elements=len(takeoffs))
         
-        # Count by element type
-        for takeoff in takeoffs:
-            elem_type = takeoff.element_type
-            summary.total_by_type[elem_type] = summary.total_by_type.get(elem_type, 0) + 1
-            
-            # Sum quantities
-            for q in takeoff.quantities:
-                qtype = q.quantity_type.value
-                if qtype not in summary.total_quantities:
-                    summary.total_quantities[qtype] = {}
-                
-                summary.total_quantities[qtype][q.name] = (
-                    summary.total_quantities[qtype].get(q.name, 0) + q.value
-                )
+        # Count by element type, in first-seen order
+        type_codes: Dict[str, int] = {}
+        type_index = _factorize((t.element_type for t in takeoffs), type_codes, len(takeoffs))
+        counts = np.bincount(type_index, minlength=len(type_codes))
+        summary.total_by_type = dict(zip(type_codes, counts.tolist()))
+        
+        # Sum quantities per (type, name) with one weighted bincount
+        quantities = [q for t in takeoffs for q in t.quantities]
+        key_codes: Dict[Any, int] = {}
+        key_index = _factorize(
+            ((q.quantity_type.value, q.name) for q in quantities), key_codes, len(quantities)
+        )
+        values = np.fromiter((q.value for q in quantities), dtype=np.float64, count=len(quantities))
+        totals = np.bincount(key_index, weights=values, minlength=len(key_codes))
+        
+        for (qtype, name), total in zip(key_codes, totals.tolist()):
+            summary.total_quantities.setdefault(qtype, {})[name] = total
         
         # Calculate grand totals
         for qtype, quantities in summary.total_quantities.items():
@@ -576,6 +610,46 @@ class QuantityTakeoffEngine:
             logger.error(f"JSON export failed: {e}")
             return False
     
+    def export_to_columnar(
+        self,
+        output_path: str,
+        takeoffs: Optional[Iterable[ElementTakeoff]] = None,
+        format: ColumnarFormat = ColumnarFormat.PARQUET,
+        row_group_size: int = 65536,
+        **takeoff_kwargs: Any
+    ) -> bool:
+        """
+        Export takeoff as one typed row per element quantity.
+        
+        Rows are written in row groups as elements arrive, so memory is
+        bounded by the row group. Without pyarrow the output is CSV.
+        
+        Args:
+            output_path: Output file path
+            takeoffs: ElementTakeoff to export (default: stream the whole
+                model through iter_takeoff)
+            format: Parquet, Arrow IPC or CSV
+            row_group_size: Rows per row group
+            **takeoff_kwargs: Passed to iter_takeoff when streaming
+        
+        Returns:
+            True if the file was written
+        """
+        if takeoffs is None:
+            takeoffs = self.iter_takeoff(**takeoff_kwargs)
+        
+        try:
+            with ColumnarWriter(output_path, TAKEOFF_COLUMNS, format, row_group_size) as writer:
+                for takeoff in takeoffs:
+                    writer.write_rows(takeoff_rows(takeoff))
+            
+            logger.info(f"Exported {writer.rows_written} takeoff rows to {writer.output_path}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Columnar export failed: {e}")
+            return False
+    
     def close(self) -> None:
         """Close IFC file."""
         self._ifc_file = None
@@ -583,6 +657,42 @@ class QuantityTakeoffEngine:
             self._property_extractor.close()
 
 
+def _factorize(keys: Any, codes: Dict[Any, int], count: int) -> np.ndarray:
+    """Integer codes for keys in first-seen order; codes maps key -> code."""
+    return np.fromiter(
+        (codes.setdefault(key, len(codes)) for key in keys), dtype=np.intp, count=count
+    )
+
+
+_worker_engine: Optional[QuantityTakeoffEngine] = None
+
+
+def _init_takeoff_worker(ifc_file_path: str) -> None:
+    """Process pool initializer: open the file once per worker."""
+    global _worker_engine
+    _worker_engine = QuantityTakeoffEngine(ifc_file_path)
+    _worker_engine.open_file()
+
+
+def _takeoff_chunk(
+    element_ids: List[int],
+    include_calculated: bool,
+    engine: Optional[QuantityTakeoffEngine] = None
+) -> List[ElementTakeoff]:
+    """Process pool entry point: takeoff for a chunk of elements."""
+    engine = engine or _worker_engine
+    takeoffs = []
+    for element_id in element_ids:
+        element = engine._ifc_file.by_id(element_id)
+        try:
+            takeoff = engine._generate_element_takeoff(element, include_calculated)
+            if takeoff:
+                takeoffs.append(takeoff)
+        except Exception as e:
+            logger.warning(f"Failed to generate takeoff for {element.GlobalId}: {e}")
+    return takeoffs
+
+
 # Convenience function
 async def generate_ifc_takeoff(
     ifc_file_path: str,
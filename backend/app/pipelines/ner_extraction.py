@@ -4,7 +4,11 @@ Extracts entities like dates, amounts, organizations, people from documents.
 """
 
 import re
-from typing import Optional, Dict, List, Any, Tuple, Set
+import os
+import bisect
+import asyncio
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+from typing import Optional, Dict, List, Any, Tuple, Callable
 from dataclasses import dataclass, field
 from enum import Enum
 from datetime import datetime
@@ -20,6 +24,84 @@ from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Construction-specific entity ruler patterns
+CONSTRUCTION_ORG_PATTERNS = [
+    {"label": "ORG", "pattern": [{"LOWER": "general"}, {"LOWER": "contractor"}]},
+    {"label": "ORG", "pattern": [{"LOWER": "subcontractor"}]},
+    {"label": "ORG", "pattern": [{"LOWER": "architect"}]},
+    {"label": "ORG", "pattern": [{"LOWER": "engineer"}]},
+    {"label": "ORG", "pattern": [{"LOWER": "consultant"}]},
+]
+
+# Pipes whose output entity extraction never reads
+UNUSED_PIPES = ["tagger", "parser", "attribute_ruler", "lemmatizer", "senter"]
+
+# Sentence ends, or paragraph breaks, used to cut long texts into windows
+_SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+|\n\s*\n')
+
+
+def _load_nlp(model_name: str) -> Any:
+    """Load a spaCy model for NER only, with the construction entity ruler."""
+    nlp = spacy.load(model_name)
+    nlp.select_pipes(disable=[name for name in UNUSED_PIPES if name in nlp.pipe_names])
+    
+    ruler = nlp.add_pipe("entity_ruler", before="ner")
+    ruler.add_patterns(CONSTRUCTION_ORG_PATTERNS)
+    return nlp
+
+
+def split_windows(text: str, max_chars: int) -> List[Tuple[int, str]]:
+    """
+    Split text into sentence-aligned windows.
+    
+    Windows end at the last sentence or paragraph break that fits;
+    a single sentence longer than max_chars is cut at whitespace.
+    
+    Args:
+        text: Input text
+        max_chars: Maximum window length
+    
+    Returns:
+        List of (offset, window_text) covering the text in order
+    """
+    windows = []
+    start = 0
+    while len(text) - start > max_chars:
+        limit = start + max_chars
+        cut = None
+        for match in _SENTENCE_BREAK.finditer(text, start, limit):
+            cut = match.end()
+        if cut is None:
+            cut = text.rfind(' ', start, limit) + 1 or limit
+        windows.append((start, text[start:cut]))
+        start = cut
+    
+    if start < len(text):
+        windows.append((start, text[start:]))
+    return windows
+
+
+def _pipe_entities(nlp: Any, texts: List[str], batch_size: int) -> List[List[Tuple[str, int, int, str]]]:
+    """Entity spans (label, start, end, text) per text via nlp.pipe."""
+    return [
+        [(ent.label_, ent.start_char, ent.end_char, ent.text) for ent in doc.ents]
+        for doc in nlp.pipe(texts, batch_size=batch_size)
+    ]
+
+
+# Per-process model, loaded once by the pool initializer
+_worker_nlp = None
+
+
+def _init_ner_worker(model_name: str) -> None:
+    global _worker_nlp
+    _worker_nlp = _load_nlp(model_name)
+
+
+def _ner_windows(texts: List[str], batch_size: int) -> List[List[Tuple[str, int, int, str]]]:
+    """Process pool task: entity spans for a batch of windows."""
+    return _pipe_entities(_worker_nlp, texts, batch_size)
+
 
 class EntityType(Enum):
     """Types of named entities."""
@@ -108,9 +190,27 @@ class SpacyNERExtractor:
         ],
     }
     
-    def __init__(self, model_name: str = "en_core_web_lg"):
+    # CUSTOM_PATTERNS compiled once, in pattern order
+    COMPILED_PATTERNS = [
+        (entity_type, re.compile(pattern, re.IGNORECASE))
+        for entity_type, patterns in CUSTOM_PATTERNS.items()
+        for pattern in patterns
+    ]
+    
+    def __init__(
+        self,
+        model_name: str = "en_core_web_lg",
+        window_chars: int = 20000,
+        max_workers: Optional[int] = None
+    ):
         self.model_name = model_name
+        # Longer texts reach the model as sentence-aligned windows
+        self.window_chars = window_chars
+        self.max_workers = max_workers or os.cpu_count() or 1
         self.nlp = None
+        self._nlp_lock = asyncio.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_workers = 0
         
         if SPACY_AVAILABLE:
             self._load_model()
@@ -119,31 +219,36 @@ class SpacyNERExtractor:
         """Load spaCy model."""
         try:
             logger.info(f"Loading spaCy model: {self.model_name}")
-            self.nlp = spacy.load(self.model_name)
-            
-            # Add custom entity ruler
-            ruler = self.nlp.add_pipe("entity_ruler", before="ner")
-            
-            # Add construction-specific patterns
-            patterns = [
-                {"label": "ORG", "pattern": [{"LOWER": "general"}, {"LOWER": "contractor"}]},
-                {"label": "ORG", "pattern": [{"LOWER": "subcontractor"}]},
-                {"label": "ORG", "pattern": [{"LOWER": "architect"}]},
-                {"label": "ORG", "pattern": [{"LOWER": "engineer"}]},
-                {"label": "ORG", "pattern": [{"LOWER": "consultant"}]},
-            ]
-            ruler.add_patterns(patterns)
-            
+            self.nlp = _load_nlp(self.model_name)
             logger.info("spaCy model loaded successfully")
         except Exception as e:
             logger.error(f"Failed to load spaCy model: {e}")
             # Try to download
             try:
                 spacy.cli.download(self.model_name)
-                self.nlp = spacy.load(self.model_name)
+                self.nlp = _load_nlp(self.model_name)
             except Exception as e2:
                 logger.error(f"Failed to download spaCy model: {e2}")
     
+    def _get_executor(self, n_process: int) -> ProcessPoolExecutor:
+        """Worker pool with one model per process, started on first batch."""
+        if self._executor is not None and self._executor_workers != n_process:
+            self.close()
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=n_process,
+                initializer=_init_ner_worker,
+                initargs=(self.model_name,)
+            )
+            self._executor_workers = n_process
+        return self._executor
+    
+    def close(self) -> None:
+        """Shut down the batch worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
     async def extract_entities(self, text: str) -> ExtractionResult:
         """
         Extract named entities from text.
@@ -157,34 +262,13 @@ class SpacyNERExtractor:
         import time
         start_time = time.time()
         
-        entities = []
-        
         try:
             # Extract spaCy entities
+            entities = []
             if self.nlp:
-                spacy_entities = await self._extract_spacy_entities(text)
-                entities.extend(spacy_entities)
-            
-            # Extract custom entities
-            custom_entities = await self._extract_custom_entities(text)
-            entities.extend(custom_entities)
+                entities = await self._extract_spacy_entities(text)
             
-            # Remove duplicates and overlaps
-            entities = self._deduplicate_entities(entities)
-            
-            # Calculate counts
-            entity_counts = {}
-            for entity in entities:
-                type_name = entity.entity_type.value
-                entity_counts[type_name] = entity_counts.get(type_name, 0) + 1
-            
-            processing_time = time.time() - start_time
-            
-            return ExtractionResult(
-                entities=entities,
-                entity_counts=entity_counts,
-                processing_time=processing_time
-            )
+            return await self._build_result(text, entities, start_time)
             
         except Exception as e:
             logger.error(f"Entity extraction failed: {e}")
@@ -194,47 +278,206 @@ class SpacyNERExtractor:
                 processing_time=time.time() - start_time
             )
     
+    async def extract_entities_batch(
+        self,
+        texts: List[str],
+        batch_size: int = 32,
+        n_process: Optional[int] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> List[ExtractionResult]:
+        """
+        Extract named entities from many texts.
+        
+        Texts are cut into sentence-aligned windows and streamed through
+        nlp.pipe on a pool of n_process worker processes, each holding
+        its own model; with n_process=1 the model runs in a thread.
+        Custom patterns and dedup run per text once all its windows are
+        back. A text whose model batch fails keeps only its custom
+        pattern entities; a pool broken by a dying worker is replaced
+        for the batches that follow.
+        
+        Args:
+            texts: Input texts
+            batch_size: Windows per nlp.pipe batch (and per pool task)
+            n_process: Worker processes (defaults to max_workers)
+            progress_callback: Optional callback (texts done, total)
+        
+        Returns:
+            ExtractionResult per text, in input order
+        """
+        import time
+        start_time = time.time()
+        n_process = n_process or self.max_workers
+        
+        results: List[Optional[ExtractionResult]] = [None] * len(texts)
+        spacy_entities: List[List[Entity]] = [[] for _ in texts]
+        failed = [False] * len(texts)
+        remaining = [0] * len(texts)
+        done_count = 0
+        
+        windows: List[Tuple[int, int, str]] = []
+        if self.nlp:
+            for index, text in enumerate(texts):
+                for offset, window in split_windows(text, self.window_chars):
+                    windows.append((index, offset, window))
+                    remaining[index] += 1
+        
+        async def finish(index: int) -> None:
+            nonlocal done_count
+            # A failed text keeps its custom pattern entities
+            entities = [] if failed[index] else sorted(spacy_entities[index], key=lambda e: e.start_char)
+            results[index] = await self._build_result(texts[index], entities, start_time)
+            done_count += 1
+            if progress_callback:
+                progress_callback(done_count, len(texts))
+        
+        for index in range(len(texts)):
+            if remaining[index] == 0:
+                await finish(index)
+        
+        if not windows:
+            return results
+        
+        loop = asyncio.get_running_loop()
+        max_in_flight = 2 * n_process if n_process > 1 else 1
+        
+        batches = [windows[i:i + batch_size] for i in range(0, len(windows), batch_size)]
+        batch_of: Dict[asyncio.Future, Tuple[List[Tuple[int, int, str]], Optional[ProcessPoolExecutor]]] = {}
+        pending = set()
+        next_batch = 0
+        
+        try:
+            while next_batch < len(batches) or pending:
+                while next_batch < len(batches) and len(pending) < max_in_flight:
+                    batch = batches[next_batch]
+                    texts_in_batch = [window for _, _, window in batch]
+                    if n_process > 1:
+                        try:
+                            executor = self._get_executor(n_process)
+                            future = loop.run_in_executor(executor, _ner_windows, texts_in_batch, batch_size)
+                        except BrokenExecutor:
+                            self.close()
+                            executor = self._get_executor(n_process)
+                            future = loop.run_in_executor(executor, _ner_windows, texts_in_batch, batch_size)
+                    else:
+                        executor = None
+                        future = loop.run_in_executor(None, _pipe_entities, self.nlp, texts_in_batch, batch_size)
+                    batch_of[future] = (batch, executor)
+                    pending.add(future)
+                    next_batch += 1
+                
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    batch, executor = batch_of.pop(future)
+                    try:
+                        spans = future.result()
+                    except Exception as e:
+                        logger.error(f"Entity extraction batch failed: {e}")
+                        if isinstance(e, BrokenExecutor) and self._executor is executor:
+                            # A worker died; later batches get a fresh pool
+                            self.close()
+                        spans = [[] for _ in batch]
+                        for index, _, _ in batch:
+                            failed[index] = True
+                    
+                    for (index, offset, _), window_spans in zip(batch, spans):
+                        spacy_entities[index].extend(
+                            entity for entity in (
+                                self._make_spacy_entity(label, start + offset, end + offset, text)
+                                for label, start, end, text in window_spans
+                            ) if entity
+                        )
+                        remaining[index] -= 1
+                        if remaining[index] == 0:
+                            await finish(index)
+        
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+        
+        return results
+    
+    async def _build_result(
+        self,
+        text: str,
+        spacy_entities: List[Entity],
+        start_time: float
+    ) -> ExtractionResult:
+        """Add custom entities, resolve overlaps and count by type."""
+        import time
+        
+        entities = list(spacy_entities)
+        
+        # Extract custom entities
+        custom_entities = await self._extract_custom_entities(text)
+        entities.extend(custom_entities)
+        
+        # Remove duplicates and overlaps
+        entities = self._deduplicate_entities(entities)
+        
+        # Calculate counts
+        entity_counts = {}
+        for entity in entities:
+            type_name = entity.entity_type.value
+            entity_counts[type_name] = entity_counts.get(type_name, 0) + 1
+        
+        return ExtractionResult(
+            entities=entities,
+            entity_counts=entity_counts,
+            processing_time=time.time() - start_time
+        )
+    
     async def _extract_spacy_entities(self, text: str) -> List[Entity]:
-        """Extract entities using spaCy."""
-        entities = []
+        """Extract entities using spaCy, off the event loop."""
+        windows = split_windows(text, self.window_chars)
         
-        doc = self.nlp(text)
+        loop = asyncio.get_running_loop()
+        async with self._nlp_lock:
+            spans = await loop.run_in_executor(
+                None, _pipe_entities, self.nlp, [window for _, window in windows], 32
+            )
         
-        for ent in doc.ents:
-            # Map spaCy entity types to our types
-            entity_type = self._map_entity_type(ent.label_)
-            
-            if entity_type:
-                entity = Entity(
-                    text=ent.text,
-                    entity_type=entity_type,
-                    start_char=ent.start_char,
-                    end_char=ent.end_char,
-                    confidence=0.9,
-                    normalized_value=self._normalize_entity(ent.text, entity_type)
-                )
-                entities.append(entity)
+        entities = []
+        for (offset, _), window_spans in zip(windows, spans):
+            for label, start, end, span_text in window_spans:
+                entity = self._make_spacy_entity(label, start + offset, end + offset, span_text)
+                if entity:
+                    entities.append(entity)
         
         return entities
     
+    def _make_spacy_entity(self, label: str, start: int, end: int, text: str) -> Optional[Entity]:
+        """Entity for a spaCy span, or None for unmapped labels."""
+        # Map spaCy entity types to our types
+        entity_type = self._map_entity_type(label)
+        if not entity_type:
+            return None
+        
+        return Entity(
+            text=text,
+            entity_type=entity_type,
+            start_char=start,
+            end_char=end,
+            confidence=0.9,
+            normalized_value=self._normalize_entity(text, entity_type)
+        )
+    
     async def _extract_custom_entities(self, text: str) -> List[Entity]:
         """Extract custom entities using regex patterns."""
         entities = []
         
-        for entity_type, patterns in self.CUSTOM_PATTERNS.items():
-            for pattern in patterns:
-                matches = re.finditer(pattern, text, re.IGNORECASE)
-                
-                for match in matches:
-                    entity = Entity(
-                        text=match.group(0),
-                        entity_type=entity_type,
-                        start_char=match.start(),
-                        end_char=match.end(),
-                        confidence=0.85,
-                        normalized_value=match.group(1) if match.groups() else match.group(0)
-                    )
-                    entities.append(entity)
+        for entity_type, regex in self.COMPILED_PATTERNS:
+            for match in regex.finditer(text):
+                entity = Entity(
+                    text=match.group(0),
+                    entity_type=entity_type,
+                    start_char=match.start(),
+                    end_char=match.end(),
+                    confidence=0.85,
+                    normalized_value=match.group(1) if regex.groups else match.group(0)
+                )
+                entities.append(entity)
         
         return entities
     
@@ -289,19 +532,17 @@ class SpacyNERExtractor:
         sorted_entities = sorted(entities, key=lambda e: e.confidence, reverse=True)
         
         result = []
-        covered_ranges: Set[Tuple[int, int]] = set()
+        # Kept ranges never overlap, so sorted by start their ends are sorted
+        # too and only the last range starting before an entity ends can hit it
+        covered_ranges: List[Tuple[int, int]] = []
         
         for entity in sorted_entities:
-            # Check for overlap
-            overlaps = False
-            for start, end in covered_ranges:
-                if not (entity.end_char <= start or entity.start_char >= end):
-                    overlaps = True
-                    break
+            index = bisect.bisect_left(covered_ranges, (entity.end_char,))
+            if index and covered_ranges[index - 1][1] > entity.start_char:
+                continue
             
-            if not overlaps:
-                result.append(entity)
-                covered_ranges.add((entity.start_char, entity.end_char))
+            result.append(entity)
+            bisect.insort(covered_ranges, (entity.start_char, entity.end_char))
         
         # Sort by position
         result.sort(key=lambda e: e.start_char)
@@ -401,7 +642,9 @@ class EntityExtractorPipeline:
     async def batch_process(
         self,
         documents: List[Tuple[str, str]],
-        progress_callback: Optional[callable] = None
+        progress_callback: Optional[callable] = None,
+        batch_size: int = 32,
+        n_process: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Process multiple documents.
@@ -409,20 +652,26 @@ class EntityExtractorPipeline:
         Args:
             documents: List of (doc_id, text) tuples
             progress_callback: Optional progress callback
+            batch_size: Windows per nlp.pipe batch
+            n_process: Worker processes (defaults to one per core)
         
         Returns:
             Dictionary mapping doc_id to results
         """
-        results = {}
+        extraction = await self.ner.extract_entities_batch(
+            [text for _, text in documents],
+            batch_size=batch_size,
+            n_process=n_process,
+            progress_callback=progress_callback
+        )
         
-        for i, (doc_id, text) in enumerate(documents):
-            result = await self.process_document(text)
-            results[doc_id] = result
-            
-            if progress_callback:
-                progress_callback(i + 1, len(documents))
-        
-        return results
+        return {
+            doc_id: {"entities": entity_result.to_dict()}
+            for (doc_id, _), entity_result in zip(documents, extraction)
+        }
+    
+    def close(self) -> None:
+        self.ner.close()
 
 
 # Convenience function
@@ -5,11 +5,14 @@ Extracts text from images and PDFs using Tesseract OCR.
 """
 
 import io
+import os
 import re
-from typing import Optional, Dict, List, Any, Tuple, BinaryIO
-from dataclasses import dataclass, field
+import time
+from typing import Optional, Dict, List, Any, Tuple, BinaryIO, Callable
+from dataclasses import dataclass, field, replace
 from enum import Enum
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 import tempfile
 import asyncio
 
@@ -26,6 +29,12 @@ try:
 except ImportError:
     PDF2IMAGE_AVAILABLE = False
 
+try:
+    from PyPDF2 import PdfReader
+    PYPDF2_AVAILABLE = True
+except ImportError:
+    PYPDF2_AVAILABLE = False
+
 try:
     import cv2
     import numpy as np
@@ -34,8 +43,15 @@ except ImportError:
     CV2_AVAILABLE = False
 
 from app.core.logging import get_logger
+from app.core.result_cache import ResultCache
 from app.core.config import settings
 
+try:
+    from app.monitoring.infrastructure import infrastructure_metrics
+    METRICS_AVAILABLE = True
+except ImportError:
+    METRICS_AVAILABLE = False
+
 logger = get_logger(__name__)
 
 
@@ -118,6 +134,111 @@ class OCRResult:
         }
 
 
+def _preprocess(image: "Image.Image") -> "Image.Image":
+    """Grayscale, denoise and binarize an image for OCR."""
+    if not CV2_AVAILABLE:
+        return image
+    
+    try:
+        # Convert PIL to OpenCV format
+        img_array = np.array(image)
+        
+        # Convert to grayscale if needed
+        if len(img_array.shape) == 3:
+            gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+        else:
+            gray = img_array
+        
+        # Denoise
+        denoised = cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
+        
+        # Adaptive thresholding
+        binary = cv2.adaptiveThreshold(
+            denoised, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+            cv2.THRESH_BINARY, 11, 2
+        )
+        
+        # Convert back to PIL
+        return Image.fromarray(binary)
+        
+    except Exception as e:
+        logger.warning(f"Image preprocessing failed: {e}")
+        return image
+
+
+def _ocr_image(
+    image: "Image.Image",
+    language: str,
+    config: str,
+    preprocess: bool
+) -> Tuple[List["OCRBlock"], float]:
+    """
+    Run Tesseract on a PIL image (blocking).
+    
+    Returns:
+        Recognized word blocks and their average confidence
+    """
+    if preprocess:
+        image = _preprocess(image)
+    
+    data = pytesseract.image_to_data(
+        image,
+        lang=language,
+        config=config,
+        output_type=pytesseract.Output.DICT
+    )
+    
+    blocks = []
+    confidences = []
+    
+    n_boxes = len(data['text'])
+    for i in range(n_boxes):
+        if int(data['conf'][i]) > 0:  # Filter low confidence
+            text = data['text'][i].strip()
+            if text:
+                confidence = float(data['conf'][i])
+                blocks.append(OCRBlock(
+                    text=text,
+                    confidence=confidence,
+                    x=data['left'][i],
+                    y=data['top'][i],
+                    width=data['width'][i],
+                    height=data['height'][i],
+                    block_num=data['block_num'][i],
+                    par_num=data['par_num'][i],
+                    line_num=data['line_num'][i],
+                    word_num=data['word_num'][i]
+                ))
+                confidences.append(confidence)
+    
+    avg_confidence = sum(confidences) / len(confidences) if confidences else 0
+    return blocks, avg_confidence
+
+
+def _init_ocr_worker(tesseract_cmd: Optional[str] = None) -> None:
+    """Process pool initializer: one Tesseract thread per worker process."""
+    os.environ['OMP_THREAD_LIMIT'] = '1'
+    if tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+
+def _ocr_pdf_page(
+    pdf_path: str,
+    page_number: int,
+    dpi: int,
+    language: str,
+    config: str,
+    preprocess: bool
+) -> Tuple[List["OCRBlock"], float]:
+    """Process pool entry point: rasterize and OCR a single PDF page."""
+    images = pdf2image.convert_from_path(
+        pdf_path, dpi=dpi, first_page=page_number, last_page=page_number
+    )
+    if not images:
+        return [], 0
+    return _ocr_image(images[0], language, config, preprocess)
+
+
 class TesseractOCR:
     """
     Tesseract OCR processor with advanced features.
@@ -133,13 +254,33 @@ class TesseractOCR:
         OCRMode.HANDWRITING: '--psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvw'
     }
     
-    def __init__(self):
+    def __init__(self, max_workers: Optional[int] = None):
         if not TESSERACT_AVAILABLE:
             raise ImportError("Tesseract and pytesseract are required for OCR")
         
         # Set tesseract path if configured
-        if hasattr(settings, 'TESSERACT_CMD'):
-            pytesseract.pytesseract.tesseract_cmd = settings.TESSERACT_CMD
+        self.tesseract_cmd = getattr(settings, 'TESSERACT_CMD', None)
+        if self.tesseract_cmd:
+            pytesseract.pytesseract.tesseract_cmd = self.tesseract_cmd
+        
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor: Optional[ProcessPoolExecutor] = None
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Page worker pool, started on first PDF."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_ocr_worker,
+                initargs=(self.tesseract_cmd,)
+            )
+        return self._executor
+    
+    def close(self) -> None:
+        """Shut down the page worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
     
     async def process_image(
         self,
@@ -167,51 +308,15 @@ class TesseractOCR:
             # Load image
             image = Image.open(io.BytesIO(image_data))
             
-            # Preprocess if requested
-            if preprocess:
-                image = await self._preprocess_image(image)
-            
             # Get OCR config
             config = self.CONFIGS.get(mode, self.CONFIGS[OCRMode.STANDARD])
             
-            # Perform OCR with detailed output
-            data = pytesseract.image_to_data(
-                image,
-                lang=language.value,
-                config=config,
-                output_type=pytesseract.Output.DICT
+            # Tesseract blocks; keep it off the event loop
+            loop = asyncio.get_running_loop()
+            blocks, avg_confidence = await loop.run_in_executor(
+                None, _ocr_image, image, language.value, config, preprocess
             )
             
-            # Parse results
-            blocks = []
-            full_text_parts = []
-            confidences = []
-            
-            n_boxes = len(data['text'])
-            for i in range(n_boxes):
-                if int(data['conf'][i]) > 0:  # Filter low confidence
-                    text = data['text'][i].strip()
-                    if text:
-                        confidence = float(data['conf'][i])
-                        block = OCRBlock(
-                            text=text,
-                            confidence=confidence,
-                            x=data['left'][i],
-                            y=data['top'][i],
-                            width=data['width'][i],
-                            height=data['height'][i],
-                            block_num=data['block_num'][i],
-                            par_num=data['par_num'][i],
-                            line_num=data['line_num'][i],
-                            word_num=data['word_num'][i]
-                        )
-                        blocks.append(block)
-                        full_text_parts.append(text)
-                        confidences.append(confidence)
-            
-            # Calculate overall confidence
-            avg_confidence = sum(confidences) / len(confidences) if confidences else 0
-            
             # Join text with proper spacing
             full_text = self._reconstruct_text(blocks)
             
@@ -235,16 +340,24 @@ class TesseractOCR:
         pdf_data: bytes,
         language: OCRLanguage = OCRLanguage.ENGLISH,
         mode: OCRMode = OCRMode.STANDARD,
-        dpi: int = 300
+        dpi: int = 300,
+        preprocess: bool = True,
+        progress_callback: Optional[Callable[[int, int], None]] = None
     ) -> OCRResult:
         """
         Process a PDF with OCR.
         
+        Pages are rasterized and recognized one at a time in worker
+        processes, at most two pages per worker in flight, so neither
+        the event loop nor memory scale with the page count.
+        
         Args:
             pdf_data: Raw PDF bytes
             language: OCR language
             mode: Processing mode
             dpi: Resolution for PDF to image conversion
+            preprocess: Whether to apply image preprocessing
+            progress_callback: Optional callback(pages_done, page_count)
         
         Returns:
             OCRResult with combined text from all pages
@@ -256,28 +369,29 @@ class TesseractOCR:
         start_time = time.time()
         
         try:
-            # Convert PDF to images
-            images = pdf2image.convert_from_bytes(pdf_data, dpi=dpi)
+            config = self.CONFIGS.get(mode, self.CONFIGS[OCRMode.STANDARD])
+            loop = asyncio.get_running_loop()
+            
+            # Workers rasterize their own page from a shared temp file
+            with tempfile.NamedTemporaryFile(suffix='.pdf') as pdf_file:
+                pdf_file.write(pdf_data)
+                pdf_file.flush()
+                
+                info = await loop.run_in_executor(None, pdf2image.pdfinfo_from_path, pdf_file.name)
+                page_count = int(info['Pages'])
+                
+                pages = await self._ocr_pages(
+                    pdf_file.name, page_count, dpi, language.value, config, preprocess, progress_callback
+                )
             
             all_blocks = []
             all_texts = []
             all_confidences = []
             
-            # Process each page
-            for page_num, image in enumerate(images):
-                logger.info(f"Processing page {page_num + 1}/{len(images)}")
-                
-                # Convert PIL to bytes
-                img_buffer = io.BytesIO()
-                image.save(img_buffer, format='PNG')
-                img_data = img_buffer.getvalue()
-                
-                # Process page
-                result = await self.process_image(img_data, language, mode)
-                
-                all_blocks.extend(result.blocks)
-                all_texts.append(result.text)
-                all_confidences.append(result.confidence)
+            for blocks, confidence in pages:
+                all_blocks.extend(blocks)
+                all_texts.append(self._reconstruct_text(blocks))
+                all_confidences.append(confidence)
             
             # Combine results
             full_text = '\n\n'.join(all_texts)
@@ -291,7 +405,7 @@ class TesseractOCR:
                 confidence=avg_confidence,
                 language=language.value,
                 processing_time=processing_time,
-                page_count=len(images),
+                page_count=page_count,
                 word_count=len(full_text.split())
             )
             
@@ -299,6 +413,50 @@ class TesseractOCR:
             logger.error(f"PDF OCR processing failed: {e}")
             raise
     
+    async def _ocr_pages(
+        self,
+        pdf_path: str,
+        page_count: int,
+        dpi: int,
+        language: str,
+        config: str,
+        preprocess: bool,
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> List[Tuple[List[OCRBlock], float]]:
+        """OCR pages on the worker pool; results in page order."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        max_in_flight = 2 * self.max_workers
+        
+        results: Dict[int, Tuple[List[OCRBlock], float]] = {}
+        page_of: Dict[asyncio.Future, int] = {}
+        pending = set()
+        next_page = 1
+        
+        try:
+            while next_page <= page_count or pending:
+                while next_page <= page_count and len(pending) < max_in_flight:
+                    future = loop.run_in_executor(
+                        executor, _ocr_pdf_page, pdf_path, next_page, dpi, language, config, preprocess
+                    )
+                    page_of[future] = next_page
+                    pending.add(future)
+                    next_page += 1
+                
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    results[page_of.pop(future)] = future.result()
+                    logger.info(f"Processed page {len(results)}/{page_count}")
+                    if progress_callback:
+                        progress_callback(len(results), page_count)
+        
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+        
+        return [results[page] for page in range(1, page_count + 1)]
+    
     async def _preprocess_image(self, image: Image.Image) -> Image.Image:
         """
         Preprocess image for better OCR results.
@@ -309,34 +467,7 @@ class TesseractOCR:
         Returns:
             Preprocessed image
         """
-        if not CV2_AVAILABLE:
-            return image
-        
-        try:
-            # Convert PIL to OpenCV format
-            img_array = np.array(image)
-            
-            # Convert to grayscale if needed
-            if len(img_array.shape) == 3:
-                gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-            else:
-                gray = img_array
-            
-            # Denoise
-            denoised = cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
-            
-            # Adaptive thresholding
-            binary = cv2.adaptiveThreshold(
-                denoised, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                cv2.THRESH_BINARY, 11, 2
-            )
-            
-            # Convert back to PIL
-            return Image.fromarray(binary)
-            
-        except Exception as e:
-            logger.warning(f"Image preprocessing failed: {e}")
-            return image
+        return _preprocess(image)
     
     def _reconstruct_text(self, blocks: List[OCRBlock]) -> str:
         """
@@ -422,11 +553,49 @@ class TesseractOCR:
             return []
 
 
+def _extract_text_layer(pdf_data: bytes, min_chars: int) -> Optional[List[str]]:
+    """
+    Page texts of a PDF that already has a text layer (blocking).
+    
+    Returns None unless every page carries at least min_chars of text.
+    """
+    if not PYPDF2_AVAILABLE:
+        return None
+    
+    try:
+        reader = PdfReader(io.BytesIO(pdf_data))
+        texts = []
+        for page in reader.pages:
+            text = page.extract_text() or ''
+            if len(text.strip()) < min_chars:
+                return None
+            texts.append(text.strip())
+        return texts or None
+    except Exception as e:
+        logger.warning(f"Text layer extraction failed: {e}")
+        return None
+
+
 class OCRPipeline:
     """Pipeline for batch OCR processing."""
     
-    def __init__(self):
-        self.ocr = TesseractOCR()
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        cache: Optional[ResultCache] = None,
+        text_layer_min_chars: int = 20
+    ):
+        """
+        Args:
+            max_workers: Files processed concurrently and OCR worker processes
+            cache: Result cache (default: a new 256 MB cache)
+            text_layer_min_chars: Per-page text needed to skip OCR of a PDF
+        """
+        self.ocr = TesseractOCR(max_workers)
+        self.max_workers = self.ocr.max_workers
+        self.cache = cache if cache is not None else ResultCache(max_bytes=256 * 1024 * 1024)
+        self.text_layer_min_chars = text_layer_min_chars
+        self._in_flight: Dict[str, asyncio.Future] = {}
     
     async def process_batch(
         self,
@@ -438,6 +607,10 @@ class OCRPipeline:
         """
         Process multiple files with OCR.
         
+        Up to max_workers files run concurrently. Identical contents are
+        recognized once (cached by content hash, shared while in flight)
+        and PDFs with a text layer are read instead of OCR'd.
+        
         Args:
             files: List of (filename, data) tuples
             language: OCR language
@@ -447,33 +620,133 @@ class OCRPipeline:
         Returns:
             Dictionary mapping filenames to OCR results
         """
-        results = {}
-        
-        for i, (filename, data) in enumerate(files):
-            try:
-                # Determine file type
-                if filename.lower().endswith('.pdf'):
-                    result = await self.ocr.process_pdf(data, language, mode)
-                else:
-                    result = await self.ocr.process_image(data, language, mode)
-                
-                results[filename] = result
-                
-                if progress_callback:
-                    progress_callback(i + 1, len(files))
-                    
-            except Exception as e:
-                logger.error(f"Failed to process {filename}: {e}")
-                results[filename] = OCRResult(
-                    text="",
-                    blocks=[],
-                    confidence=0,
-                    language=language.value,
-                    processing_time=0,
-                    metadata={"error": str(e)}
-                )
+        semaphore = asyncio.Semaphore(self.max_workers)
+        done = 0
         
-        return results
+        async def run(filename: str, data: bytes) -> OCRResult:
+            nonlocal done
+            async with semaphore:
+                try:
+                    result = await self.process_file(filename, data, language, mode)
+                except Exception as e:
+                    logger.error(f"Failed to process {filename}: {e}")
+                    result = OCRResult(
+                        text="",
+                        blocks=[],
+                        confidence=0,
+                        language=language.value,
+                        processing_time=0,
+                        metadata={"error": str(e)}
+                    )
+            
+            done += 1
+            if progress_callback:
+                progress_callback(done, len(files))
+            return result
+        
+        results = await asyncio.gather(*(run(filename, data) for filename, data in files))
+        return dict(zip((filename for filename, _ in files), results))
+    
+    async def process_file(
+        self,
+        filename: str,
+        data: bytes,
+        language: OCRLanguage = OCRLanguage.ENGLISH,
+        mode: OCRMode = OCRMode.STANDARD
+    ) -> OCRResult:
+        """
+        OCR a single file through the cache.
+        
+        Args:
+            filename: File name, used to detect PDFs
+            data: Raw file bytes
+            language: OCR language
+            mode: Processing mode
+        
+        Returns:
+            OCRResult; metadata["source"] is "cache", "text_layer" or "ocr"
+        """
+        is_pdf = filename.lower().endswith('.pdf')
+        key = ResultCache.make_key(data, 'pdf' if is_pdf else 'image', language.value, mode.value)
+        start_time = time.time()
+        
+        if key in self._in_flight:
+            # Same contents already being processed; share that result
+            self.cache.hits += 1
+            cached = await asyncio.shield(self._in_flight[key])
+        else:
+            cached = self.cache.get(key)
+        self._record_cache(cached is not None)
+        
+        if cached is not None:
+            self._record_document('cache', time.time() - start_time, cached.page_count)
+            return replace(cached, metadata={**cached.metadata, "source": "cache"})
+        
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await self._process_uncached(is_pdf, data, language, mode)
+            self.cache.put(key, result)
+            future.set_result(result)
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else is waiting
+            self._record_document('ocr', time.time() - start_time, 0, success=False)
+            raise
+        finally:
+            del self._in_flight[key]
+        
+        self._record_document(result.metadata["source"], time.time() - start_time, result.page_count)
+        return result
+    
+    async def _process_uncached(
+        self,
+        is_pdf: bool,
+        data: bytes,
+        language: OCRLanguage,
+        mode: OCRMode
+    ) -> OCRResult:
+        if not is_pdf:
+            result = await self.ocr.process_image(data, language, mode)
+            result.metadata["source"] = "ocr"
+            return result
+        
+        start_time = time.time()
+        loop = asyncio.get_running_loop()
+        texts = await loop.run_in_executor(
+            None, _extract_text_layer, data, self.text_layer_min_chars
+        )
+        
+        if texts is not None:
+            full_text = '\n\n'.join(texts)
+            return OCRResult(
+                text=full_text,
+                blocks=[],
+                confidence=100.0,
+                language=language.value,
+                processing_time=time.time() - start_time,
+                page_count=len(texts),
+                word_count=len(full_text.split()),
+                metadata={"source": "text_layer"}
+            )
+        
+        result = await self.ocr.process_pdf(data, language, mode)
+        result.metadata["source"] = "ocr"
+        return result
+    
+    def _record_cache(self, hit: bool) -> None:
+        if not METRICS_AVAILABLE:
+            return
+        infrastructure_metrics.record_cache_operation('ocr', 'get', hit)
+        infrastructure_metrics.update_cache_hit_ratio('ocr', self.cache.hits, self.cache.misses)
+    
+    def _record_document(self, source: str, duration: float, pages: int, success: bool = True) -> None:
+        if METRICS_AVAILABLE:
+            infrastructure_metrics.record_ocr_document(source, duration, pages, success)
+    
+    def close(self) -> None:
+        """Shut down the OCR worker pool."""
+        self.ocr.close()
 
 
 # Convenience function
@@ -4,9 +4,9 @@ Transcribes audio/video files to text with speaker identification.
 """
 
 import os
-import io
 import json
-from typing import Optional, Dict, List, Any, Tuple, BinaryIO
+from bisect import bisect_right
+from typing import Optional, Dict, List, Any, Tuple, BinaryIO, AsyncIterator, Callable
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
@@ -20,6 +20,7 @@ except ImportError:
     OPENAI_AVAILABLE = False
 
 from app.core.logging import get_logger
+from app.core.result_cache import ResultCache
 from app.core.config import settings
 
 logger = get_logger(__name__)
@@ -176,7 +177,12 @@ class WhisperTranscriber:
             raise
     
     def _parse_verbose_response(self, response: Dict[str, Any]) -> TranscriptionResult:
-        """Parse verbose JSON response from Whisper."""
+        """
+        Parse verbose JSON response from Whisper.
+        
+        With word timestamps requested, Whisper returns the words as one
+        top-level list; each word is attached to the segment it falls in.
+        """
         segments = []
         
         for i, seg_data in enumerate(response.get('segments', [])):
@@ -186,10 +192,17 @@ class WhisperTranscriber:
                 end=seg_data.get('end', 0),
                 text=seg_data.get('text', '').strip(),
                 confidence=seg_data.get('avg_logprob', 0),
-                words=seg_data.get('words', [])
+                words=list(seg_data.get('words', []))
             )
             segments.append(segment)
         
+        if segments and response.get('words'):
+            starts = [segment.start for segment in segments]
+            for word in response['words']:
+                middle = (word.get('start', 0) + word.get('end', 0)) / 2
+                index = max(bisect_right(starts, middle) - 1, 0)
+                segments[index].words.append(word)
+        
         return TranscriptionResult(
             text=response.get('text', ''),
             segments=segments,
@@ -297,8 +310,9 @@ class WhisperTranscriber:
 class AudioChunker:
     """Chunks audio files for parallel processing."""
     
-    def __init__(self, chunk_duration: int = 600):  # 10 minutes default
+    def __init__(self, chunk_duration: int = 600, overlap: int = 0):  # 10 minutes default
         self.chunk_duration = chunk_duration
+        self.overlap = overlap
     
     async def chunk_audio(
         self,
@@ -315,48 +329,191 @@ class AudioChunker:
         Returns:
             List of (chunk_index, chunk_data) tuples
         """
+        return [(index, data) async for index, data, _, _ in self.stream_chunks(audio_data, filename)]
+    
+    async def stream_chunks(
+        self,
+        audio_data: bytes,
+        filename: str
+    ) -> AsyncIterator[Tuple[int, bytes, float, Optional[float]]]:
+        """
+        Yield chunks as soon as they are decoded and encoded.
+        
+        Falls back to the whole file as a single chunk if chunking is
+        unavailable or fails before the first chunk.
+        
+        Args:
+            audio_data: Raw audio bytes
+            filename: Original filename
+        
+        Yields:
+            (chunk_index, chunk_data, start_time, end_time) tuples in index
+            order; end_time is None for the single-chunk fallback
+        """
+        yielded = False
         try:
-            from pydub import AudioSegment
-            
-            # Load audio
-            suffix = Path(filename).suffix
-            audio = AudioSegment.from_file(io.BytesIO(audio_data), format=suffix.lstrip('.'))
-            
-            chunks = []
-            chunk_length = self.chunk_duration * 1000  # Convert to milliseconds
+            from app.pipelines.audio_chunking import AudioChunker as StreamingChunker
             
-            for i in range(0, len(audio), chunk_length):
-                chunk = audio[i:i + chunk_length]
-                
-                # Export chunk to bytes
-                chunk_buffer = io.BytesIO()
-                chunk.export(chunk_buffer, format='mp3')
-                chunks.append((i // chunk_length, chunk_buffer.getvalue()))
-            
-            return chunks
+            chunker = StreamingChunker(chunk_duration=self.chunk_duration, overlap=self.overlap)
+            async for chunk in chunker.stream_by_duration(audio_data, filename):
+                yielded = True
+                yield chunk.index, chunk.data, chunk.start_time, chunk.end_time
             
         except ImportError:
             logger.warning("pydub not available, returning single chunk")
-            return [(0, audio_data)]
+            yield 0, audio_data, 0.0, None
         except Exception as e:
+            if yielded:
+                raise
             logger.error(f"Audio chunking failed: {e}")
-            return [(0, audio_data)]
+            yield 0, audio_data, 0.0, None
+
+
+class TranscriptMerger:
+    """
+    Merges chunk transcriptions in index order as they complete.
+    
+    Timestamps are shifted by each chunk's start offset. Where two
+    windows overlap, the seam sits at the middle of the overlap: words
+    starting before it come from the earlier chunk, the rest from the
+    later one, so speech cut at a chunk edge is taken from the chunk
+    that heard it whole. A chunk is merged once its result and the
+    next window (or the end of the stream) are known.
+    """
+    
+    def __init__(self):
+        self.segments: List[TranscriptSegment] = []
+        self.language: Optional[str] = None
+        self.duration = 0.0
+        self._windows: Dict[int, Tuple[float, Optional[float]]] = {}
+        self._results: Dict[int, TranscriptionResult] = {}
+        self._texts: List[str] = []
+        self._next = 0
+        self._closed = False
+    
+    def add_window(self, index: int, start: float, end: Optional[float]) -> List[TranscriptSegment]:
+        """Register a chunk's time window; returns newly merged segments."""
+        self._windows[index] = (start, end)
+        return self._drain()
+    
+    def add_result(self, index: int, result: TranscriptionResult) -> List[TranscriptSegment]:
+        """Add a chunk's transcription; returns newly merged segments."""
+        self._results[index] = result
+        return self._drain()
+    
+    def close(self) -> List[TranscriptSegment]:
+        """Mark the last window as registered; returns newly merged segments."""
+        self._closed = True
+        return self._drain()
+    
+    def result(self) -> TranscriptionResult:
+        text = ' '.join(self._texts)
+        return TranscriptionResult(
+            text=text,
+            segments=self.segments,
+            language=self.language or 'unknown',
+            duration=self.duration,
+            processing_time=0,
+            word_count=len(text.split())
+        )
+    
+    def _seam(self, index: int) -> float:
+        """Boundary between chunk index and index + 1."""
+        _, end = self._windows[index]
+        next_start, _ = self._windows[index + 1]
+        if end is None or next_start >= end:
+            return next_start
+        return (next_start + end) / 2
+    
+    def _drain(self) -> List[TranscriptSegment]:
+        merged = []
+        while self._next in self._results and (self._next + 1 in self._windows or self._closed):
+            index = self._next
+            merged.extend(self._merge(index, self._results.pop(index)))
+            self._next += 1
+        return merged
+    
+    def _merge(self, index: int, result: TranscriptionResult) -> List[TranscriptSegment]:
+        offset, end = self._windows.get(index, (0.0, None))
+        lower = self._seam(index - 1) if index > 0 else float('-inf')
+        upper = self._seam(index) if index + 1 in self._windows else float('inf')
+        
+        if self.language is None and result.language != 'unknown':
+            self.language = result.language
+        self.duration = max(self.duration, end if end is not None else offset + result.duration)
+        
+        if not result.segments:
+            # Plain-text response: no timing to dedup with
+            if result.text:
+                self._texts.append(result.text.strip())
+            return []
+        
+        merged = []
+        for segment in result.segments:
+            start = segment.start + offset
+            stop = segment.end + offset
+            words = [
+                {**w, 'start': w.get('start', 0) + offset, 'end': w.get('end', 0) + offset}
+                for w in segment.words
+            ]
+            text = segment.text
+            
+            if words:
+                kept = [w for w in words if lower <= w['start'] < upper]
+                if not kept:
+                    continue
+                if len(kept) < len(words):
+                    words = kept
+                    start, stop = kept[0]['start'], kept[-1]['end']
+                    text = ' '.join(w.get('word', '').strip() for w in kept)
+            elif not lower <= (start + stop) / 2 < upper:
+                continue
+            
+            merged.append(TranscriptSegment(
+                id=len(self.segments),
+                start=start,
+                end=stop,
+                text=text,
+                confidence=segment.confidence,
+                speaker=segment.speaker,
+                words=words
+            ))
+            self.segments.append(merged[-1])
+            self._texts.append(text.strip())
+        
+        return merged
 
 
 class ParallelTranscriber:
-    """Transcribe audio in parallel chunks."""
+    """
+    Transcribe audio in parallel chunks.
     
-    def __init__(self, max_workers: int = 4):
+    Chunks are sent to Whisper as the chunker produces them and merged
+    in index order as results return. Results are cached by chunk
+    content, so re-running a failed job only re-sends the chunks that
+    did not complete.
+    """
+    
+    def __init__(
+        self,
+        max_workers: int = 4,
+        chunk_duration: int = 600,
+        overlap: int = 5,
+        cache: Optional[ResultCache] = None,
+        transcriber: Optional[WhisperTranscriber] = None
+    ):
         self.max_workers = max_workers
-        self.chunker = AudioChunker()
-        self.transcriber = WhisperTranscriber()
+        self.chunker = AudioChunker(chunk_duration=chunk_duration, overlap=overlap)
+        self.transcriber = transcriber or WhisperTranscriber()
+        self.cache = cache if cache is not None else ResultCache()
     
     async def transcribe_large_file(
         self,
         audio_data: bytes,
         filename: str,
         language: Optional[str] = None,
-        progress_callback: Optional[callable] = None
+        progress_callback: Optional[callable] = None,
+        segment_callback: Optional[Callable[[List[TranscriptSegment]], None]] = None
     ) -> TranscriptionResult:
         """
         Transcribe large audio file in parallel chunks.
@@ -365,7 +522,9 @@ class ParallelTranscriber:
             audio_data: Raw audio bytes
             filename: Original filename
             language: Optional language code
-            progress_callback: Optional progress callback
+            progress_callback: Optional progress callback (done, chunks so far)
+            segment_callback: Optional callback receiving merged segments
+                as soon as they are final
         
         Returns:
             Combined TranscriptionResult
@@ -373,70 +532,121 @@ class ParallelTranscriber:
         import time
         start_time = time.time()
         
-        # Chunk audio
-        chunks = await self.chunker.chunk_audio(audio_data, filename)
-        logger.info(f"Split audio into {len(chunks)} chunks")
+        merger = await self._transcribe_chunks(
+            audio_data, filename, language, progress_callback, segment_callback
+        )
         
-        # Transcribe chunks in parallel
-        semaphore = asyncio.Semaphore(self.max_workers)
+        merged = merger.result()
+        merged.processing_time = time.time() - start_time
         
-        async def transcribe_chunk(index: int, chunk_data: bytes) -> TranscriptionResult:
-            async with semaphore:
-                result = await self.transcriber.transcribe(
-                    chunk_data,
-                    f"chunk_{index}.mp3",
-                    language
-                )
-                
-                if progress_callback:
-                    progress_callback(index + 1, len(chunks))
-                
-                return result
+        return merged
+    
+    async def stream_transcript(
+        self,
+        audio_data: bytes,
+        filename: str,
+        language: Optional[str] = None
+    ) -> AsyncIterator[TranscriptSegment]:
+        """
+        Yield merged transcript segments in order as chunks complete.
         
-        # Run all transcriptions
-        tasks = [transcribe_chunk(idx, data) for idx, data in chunks]
-        results = await asyncio.gather(*tasks)
+        Args:
+            audio_data: Raw audio bytes
+            filename: Original filename
+            language: Optional language code
         
-        # Merge results
-        merged = self._merge_results(results)
-        merged.processing_time = time.time() - start_time
+        Yields:
+            TranscriptSegment with absolute timestamps
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        job = asyncio.ensure_future(self._transcribe_chunks(
+            audio_data, filename, language, segment_callback=queue.put_nowait
+        ))
+        job.add_done_callback(lambda _: queue.put_nowait(None))
         
-        return merged
+        try:
+            while True:
+                segments = await queue.get()
+                if segments is None:
+                    break
+                for segment in segments:
+                    yield segment
+            await job
+        finally:
+            job.cancel()
     
-    def _merge_results(self, results: List[TranscriptionResult]) -> TranscriptionResult:
-        """Merge multiple transcription results."""
-        all_texts = []
-        all_segments = []
-        total_duration = 0
-        
-        for result in results:
-            # Adjust segment timestamps
-            for segment in result.segments:
-                adjusted_segment = TranscriptSegment(
-                    id=len(all_segments),
-                    start=segment.start + total_duration,
-                    end=segment.end + total_duration,
-                    text=segment.text,
-                    confidence=segment.confidence,
-                    speaker=segment.speaker,
-                    words=[
-                        {**w, 'start': w.get('start', 0) + total_duration, 'end': w.get('end', 0) + total_duration}
-                        for w in segment.words
-                    ]
-                )
-                all_segments.append(adjusted_segment)
+    async def _transcribe_chunks(
+        self,
+        audio_data: bytes,
+        filename: str,
+        language: Optional[str],
+        progress_callback: Optional[callable] = None,
+        segment_callback: Optional[Callable[[List[TranscriptSegment]], None]] = None
+    ) -> TranscriptMerger:
+        merger = TranscriptMerger()
+        semaphore = asyncio.Semaphore(self.max_workers)
+        chunk_count = 0
+        completed = 0
+        
+        def emit(segments: List[TranscriptSegment]) -> None:
+            if segments and segment_callback:
+                segment_callback(segments)
+        
+        async def transcribe_chunk(index: int, chunk_data: bytes) -> None:
+            nonlocal completed
+            key = self.cache.make_key(chunk_data, language)
+            result = self.cache.get(key)
+            
+            if result is None:
+                async with semaphore:
+                    result = await self.transcriber.transcribe(
+                        chunk_data,
+                        f"chunk_{index}.mp3",
+                        language,
+                        timestamp_granularities=["word", "segment"]
+                    )
+                self.cache.put(key, result)
             
-            all_texts.append(result.text)
-            total_duration += result.duration
+            completed += 1
+            if progress_callback:
+                progress_callback(completed, chunk_count)
+            
+            emit(merger.add_result(index, result))
         
-        return TranscriptionResult(
-            text=' '.join(all_texts),
-            segments=all_segments,
-            language=results[0].language if results else 'unknown',
-            duration=total_duration,
-            processing_time=0,
-            word_count=len(' '.join(all_texts).split())
-        )
+        tasks = []
+        chunks = self.chunker.stream_chunks(audio_data, filename)
+        try:
+            try:
+                async for idx, data, start, end in chunks:
+                    # Stop feeding new chunks once one has failed
+                    if any(t.done() and t.exception() for t in tasks):
+                        break
+                    chunk_count += 1
+                    emit(merger.add_window(idx, start, end))
+                    tasks.append(asyncio.ensure_future(transcribe_chunk(idx, data)))
+                else:
+                    emit(merger.close())
+            finally:
+                # Stops the ffmpeg reader when the loop exits early
+                await chunks.aclose()
+            logger.info(f"Split audio into {chunk_count} chunks")
+            
+            # Let in-flight chunks finish so their results are cached for a retry
+            outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        
+        errors = [o for o in outcomes if isinstance(o, BaseException)]
+        if errors:
+            logger.error(
+                f"{len(errors)} chunk transcriptions failed, "
+                f"{len(self.cache)} chunk results cached for retry"
+            )
+            raise errors[0]
+        
+        return merger
 
 
 class TranscriptionPipeline:
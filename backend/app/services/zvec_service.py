@@ -1,20 +1,28 @@
 """
-ZVec Service - Pure Python vector DB (no native dependencies)
+ZVec Service - Local vector DB on NumPy (no native vector libraries)
 Works on all platforms without AVX/SIGILL issues
 """
 import os
 import json
 import math
 import hashlib
-from typing import List, Dict, Any, Optional
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Iterator
 import logging
 
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, compaction is skipped
+    fcntl = None
+
 logger = logging.getLogger(__name__)
 
 
 class ZVecService:
     """
-    ZVec vector database service - Pure Python implementation.
+    ZVec vector database service - local NumPy implementation.
     Uses cosine similarity for semantic search.
     """
     
@@ -23,13 +31,13 @@ class ZVecService:
         self.db_path = db_path
         self.dimension = 384
         self._index = None
-        self.is_available = True  # Always available in pure Python
+        self.is_available = True  # No native vector library required
         
         # Ensure data directory exists
         os.makedirs(db_path, exist_ok=True)
         
-        self._index = PurePythonZVecDB(db_path)
-        logger.info(f"✅ ZVec (pure Python) initialized at {db_path}")
+        self._index = NumpyZVecDB(db_path, self.dimension)
+        logger.info(f"✅ ZVec (numpy) initialized at {db_path}")
     
     def is_ready(self) -> bool:
         """Check if service is ready."""
@@ -109,7 +117,7 @@ class ZVecService:
                 "status": "active",
                 "count": count,
                 "ready": True,
-                "mode": "pure_python"
+                "mode": "numpy"
             }
         except Exception as e:
             return {"status": "error", "error": str(e), "count": 0}
@@ -119,69 +127,313 @@ class ZVecService:
         return self.get_stats_sync()
 
 
-class PurePythonZVecDB:
-    """Pure Python vector database - no native dependencies."""
+class NumpyZVecDB:
+    """
+    Vector database on contiguous float32 matrices.
+    
+    Rows are normalized on insert so cosine similarity is a single
+    matrix-vector product. Data lives in append-only segments: a raw
+    ``.f32`` row file memory-mapped on load and a ``.jsonl`` file with one
+    id/metadata record per row. Re-adding an id supersedes its older row;
+    stale rows are dropped when segments are compacted on load.
+    
+    Several processes may share a store. Appends hold a shared lock on
+    ``store.lock`` and compaction an exclusive one, so segments are never
+    rewritten under an append. A writer whose segment was compacted away
+    starts a new one.
+    """
+    
+    SEGMENT_ROWS = 65536
+    MAX_SEGMENTS = 8
     
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, dimension: int = 384):
         self.db_path = db_path
-        self.store: Dict[str, Dict] = {}
+        self.dimension = dimension
         self.metadata_path = os.path.join(db_path, "documents.json")
+        self.lock_path = os.path.join(db_path, "store.lock")
+        
+        self._segments: List[np.ndarray] = []
+        self._buffer = np.empty((0, dimension), dtype=np.float32)
+        self._buffer_rows = 0
+        self._ids: List[str] = []
+        self._metadata: List[str] = []
+        self._live = np.empty(0, dtype=bool)  # first len(_ids) flags are in use
+        self._rows: Dict[str, int] = {}
+        self._segment_id = 0
+        self._segment_rows = 0
+        self._vector_file = None
+        self._record_file = None
+        
         self._load()
     
+    def _segment_paths(self, segment_id: int):
+        base = os.path.join(self.db_path, f"segment-{segment_id:05d}")
+        return base + ".f32", base + ".jsonl"
+    
+    def _existing_segments(self) -> List[int]:
+        ids = []
+        for name in os.listdir(self.db_path):
+            if name.startswith("segment-") and name.endswith(".jsonl"):
+                ids.append(int(name[len("segment-"):-len(".jsonl")]))
+        return sorted(ids)
+    
     def _load(self):
-        """Load documents from disk."""
-        if os.path.exists(self.metadata_path):
-            try:
-                with open(self.metadata_path, 'r') as f:
-                    data = json.load(f)
-                    self.store = data.get('documents', {})
-            except Exception as e:
-                logger.warning(f"Failed to load ZVec DB: {e}")
-                self.store = {}
-    
-    def _save(self):
-        """Save documents to disk."""
+        """Map existing segments, migrating a legacy documents.json first."""
         try:
-            with open(self.metadata_path, 'w') as f:
-                json.dump({'documents': self.store}, f)
+            segment_ids = self._existing_segments()
+            if not segment_ids and os.path.exists(self.metadata_path):
+                self._migrate_json()
+                segment_ids = self._existing_segments()
+            
+            if len(segment_ids) > self.MAX_SEGMENTS:
+                segment_ids = self._try_compact(segment_ids)
+            
+            for segment_id in segment_ids:
+                self._load_segment(segment_id)
         except Exception as e:
-            logger.error(f"Failed to save ZVec DB: {e}")
+            logger.warning(f"Failed to load ZVec DB: {e}")
+            self._segments, self._ids, self._metadata, self._rows = [], [], [], {}
+            self._live = np.empty(0, dtype=bool)
+    
+    @contextmanager
+    def _lock(self, exclusive: bool = False) -> Iterator[bool]:
+        """Hold the store lock; yields False if an exclusive lock is busy.
+        
+        Shared locks block until granted. Exclusive locks never wait, so a
+        process that cannot compact right away just skips it.
+        """
+        if fcntl is None:
+            yield not exclusive
+            return
+        with open(self.lock_path, 'a') as f:
+            mode = fcntl.LOCK_EX | fcntl.LOCK_NB if exclusive else fcntl.LOCK_SH
+            try:
+                fcntl.flock(f, mode)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+    
+    def _try_compact(self, segment_ids: List[int]) -> List[int]:
+        """Compact unless another process is appending to the store."""
+        with self._lock(exclusive=True) as locked:
+            if not locked:
+                logger.info("ZVec store busy, skipping compaction")
+                return segment_ids
+            # Re-list under the lock; another process may have compacted
+            segment_ids = self._existing_segments()
+            if len(segment_ids) > self.MAX_SEGMENTS:
+                segment_ids = self._compact(segment_ids)
+            return segment_ids
+    
+    def _load_segment(self, segment_id: int):
+        vector_path, record_path = self._segment_paths(segment_id)
+        records = []
+        with open(record_path, 'r') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break  # torn write at the tail
+        
+        # Vectors are written before their record, so rows beyond the
+        # last complete record belong to an interrupted add
+        row_bytes = self.dimension * 4
+        rows = min(len(records), os.path.getsize(vector_path) // row_bytes)
+        if rows == 0:
+            return
+        
+        matrix = np.memmap(vector_path, dtype=np.float32, mode='r', shape=(rows, self.dimension))
+        self._append_rows(matrix, records[:rows])
+    
+    def _append_rows(self, matrix: np.ndarray, records: List[Dict]):
+        offset = len(self._ids)
+        self._segments.append(matrix)
+        self._extend_live(len(records))
+        for i, record in enumerate(records):
+            self._supersede(record['id'], offset + i)
+            self._ids.append(record['id'])
+            self._metadata.append(record['metadata'])
+    
+    def _extend_live(self, count: int):
+        """Flag count new rows live, growing the flags geometrically."""
+        rows = len(self._ids)
+        needed = rows + count
+        if needed > len(self._live):
+            grown = np.zeros(max(needed, 2 * len(self._live), 1024), dtype=bool)
+            grown[:rows] = self._live[:rows]
+            self._live = grown
+        self._live[rows:needed] = True
+    
+    def _supersede(self, doc_id: str, row: int):
+        previous = self._rows.get(doc_id)
+        if previous is not None:
+            self._live[previous] = False
+        self._rows[doc_id] = row
+    
+    def _migrate_json(self):
+        """Convert the JSON store written by earlier versions."""
+        with open(self.metadata_path, 'r') as f:
+            documents = json.load(f).get('documents', {})
+        
+        if documents:
+            ids = list(documents)
+            matrix = self._normalize(np.array(
+                [documents[doc_id]['vector'] for doc_id in ids], dtype=np.float32
+            ))
+            records = [{'id': doc_id, 'metadata': documents[doc_id]['metadata']} for doc_id in ids]
+            self._write_segment(0, matrix, records)
+        
+        os.replace(self.metadata_path, self.metadata_path + ".migrated")
+        logger.info(f"Migrated {len(documents)} ZVec documents to segments")
+    
+    def _compact(self, segment_ids: List[int]) -> List[int]:
+        """Merge all segments into one, keeping only the latest row per id."""
+        for segment_id in segment_ids:
+            self._load_segment(segment_id)
+        
+        keep = np.flatnonzero(self._live[:len(self._ids)])
+        matrix = self._matrix()[keep] if len(keep) else np.empty((0, self.dimension), np.float32)
+        records = [{'id': self._ids[i], 'metadata': self._metadata[i]} for i in keep]
+        
+        target = segment_ids[-1] + 1
+        self._write_segment(target, matrix, records)
+        for segment_id in segment_ids:
+            for path in self._segment_paths(segment_id):
+                os.remove(path)
+        
+        self._segments, self._ids, self._metadata, self._rows = [], [], [], {}
+        self._live = np.empty(0, dtype=bool)
+        logger.info(f"Compacted {len(segment_ids)} ZVec segments ({len(records)} documents)")
+        return [target]
+    
+    def _write_segment(self, segment_id: int, matrix: np.ndarray, records: List[Dict]):
+        vector_path, record_path = self._segment_paths(segment_id)
+        with open(vector_path + ".tmp", 'wb') as f:
+            f.write(np.ascontiguousarray(matrix, dtype=np.float32).tobytes())
+        with open(record_path + ".tmp", 'w') as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+        os.replace(vector_path + ".tmp", vector_path)
+        os.replace(record_path + ".tmp", record_path)
+    
+    def _open_segment(self):
+        """Open a fresh segment for appends, rolling over when full.
+        
+        Called with the store lock held. A segment that was compacted away
+        by another process is replaced, and the new id is claimed by
+        exclusive creation so concurrent writers never share a segment.
+        """
+        if (self._vector_file is not None and self._segment_rows < self.SEGMENT_ROWS
+                and os.fstat(self._record_file.fileno()).st_nlink > 0):
+            return
+        self.close()
+        segment_id = max(self._existing_segments(), default=-1) + 1
+        while True:
+            vector_path, record_path = self._segment_paths(segment_id)
+            try:
+                # Held open across appends and closed by close()
+                self._record_file = open(record_path, 'x')  # noqa: SIM115
+                break
+            except FileExistsError:
+                segment_id += 1
+        self._segment_id = segment_id
+        self._segment_rows = 0
+        self._vector_file = open(vector_path, 'wb')  # noqa: SIM115
+    
+    def close(self):
+        """Close the open segment files."""
+        for f in (self._vector_file, self._record_file):
+            if f is not None:
+                f.close()
+        self._vector_file = None
+        self._record_file = None
+    
+    def _normalize(self, matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (matrix / norms).astype(np.float32)
+    
+    def _parts(self) -> List[np.ndarray]:
+        """Row blocks in row order: mapped segments, then the in-memory tail."""
+        parts = self._segments + [self._buffer[:self._buffer_rows]]
+        return [p for p in parts if len(p)]
+    
+    def _matrix(self) -> np.ndarray:
+        parts = self._parts()
+        if not parts:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        return np.concatenate(parts)
     
     def count(self) -> int:
-        return len(self.store)
+        return len(self._rows)
     
     def add(self, id: str, vector: List[float], metadata: str):
-        self.store[id] = {
-            'vector': vector,
-            'metadata': metadata
-        }
-        self._save()
-    
-    def _cosine_similarity(self, a: List[float], b: List[float]) -> float:
-        """Calculate cosine similarity between two vectors."""
-        dot = sum(x * y for x, y in zip(a, b))
-        norm_a = math.sqrt(sum(x * x for x in a))
-        norm_b = math.sqrt(sum(x * x for x in b))
-        if norm_a == 0 or norm_b == 0:
-            return 0
-        return dot / (norm_a * norm_b)
+        self.add_many([id], [vector], [metadata])
+    
+    def add_many(self, ids: List[str], vectors: List[List[float]], metadata: List[str]):
+        """Append documents; one write per file instead of per document."""
+        if not ids:
+            return
+        matrix = self._normalize(np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dimension))
+        records = [{'id': doc_id, 'metadata': meta} for doc_id, meta in zip(ids, metadata)]
+        
+        written = 0
+        with self._lock():
+            while written < len(ids):
+                self._open_segment()
+                take = min(len(ids) - written, self.SEGMENT_ROWS - self._segment_rows)
+                self._vector_file.write(matrix[written:written + take].tobytes())
+                self._vector_file.flush()
+                self._record_file.write(''.join(json.dumps(r) + "\n" for r in records[written:written + take]))
+                self._record_file.flush()
+                self._segment_rows += take
+                written += take
+        
+        # Grow the in-memory tail geometrically
+        needed = self._buffer_rows + len(ids)
+        if needed > len(self._buffer):
+            grown = np.empty((max(needed, 2 * len(self._buffer), 1024), self.dimension), dtype=np.float32)
+            grown[:self._buffer_rows] = self._buffer[:self._buffer_rows]
+            self._buffer = grown
+        self._buffer[self._buffer_rows:needed] = matrix
+        self._buffer_rows = needed
+        
+        offset = len(self._ids)
+        self._extend_live(len(ids))
+        for i, record in enumerate(records):
+            self._supersede(record['id'], offset + i)
+            self._ids.append(record['id'])
+            self._metadata.append(record['metadata'])
     
     def search(self, vector: List[float], top_k: int = 5):
         """Search by cosine similarity."""
-        if not self.store:
+        if not self._rows or top_k <= 0:
             return []
         
-        scored = []
-        for doc_id, doc in self.store.items():
-            score = self._cosine_similarity(vector, doc['vector'])
-            scored.append({
-                'id': doc_id,
-                'score': score,
-                'metadata': doc['metadata']
-            })
-        
-        scored.sort(key=lambda x: x['score'], reverse=True)
-        return scored[:top_k]
+        query = self._normalize(np.asarray(vector, dtype=np.float32).reshape(1, -1))[0]
+        scores = np.concatenate([part @ query for part in self._parts()])
+        scores[~self._live[:len(scores)]] = -np.inf
+        
+        k = min(top_k, len(self._rows))
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind='stable')]
+        
+        return [
+            {
+                'id': self._ids[i],
+                'score': float(scores[i]),
+                'metadata': self._metadata[i]
+            }
+            for i in top.tolist()
+        ]
+
+
+# Backward compatibility
+PurePythonZVecDB = NumpyZVecDB
 
 
 # Global singleton
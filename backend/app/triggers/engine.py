@@ -6,11 +6,15 @@ All events flow through this hub, and triggers are registered to respond to spec
 """
 
 import asyncio
+import bisect
+import heapq
+import itertools
 import os
+import time
 import uuid
 from datetime import datetime
 from enum import Enum, auto
-from typing import Any, Callable, Coroutine, Dict, List, Optional, Set
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass, field
 from collections import defaultdict
 import traceback
@@ -108,6 +112,53 @@ class Event:
 # Type alias for event handlers
 EventHandler = Callable[[Event], Coroutine[Any, Any, None]]
 
+# Priorities applied by create_event when none is given (1 = highest)
+DEFAULT_EVENT_PRIORITIES: Dict[EventType, int] = {
+    EventType.SAFETY_VIOLATION_DETECTED: 1,
+    EventType.SAFETY_ALERT_CREATED: 1,
+    EventType.SYSTEM_ERROR: 2,
+    EventType.SAFETY_INSPECTION_REQUIRED: 3,
+    EventType.PERMISSION_CHANGED: 3,
+    EventType.COST_OVERRUN_DETECTED: 3,
+    EventType.INTEGRATION_ERROR: 3,
+    EventType.FILE_UPLOADED: 7,
+    EventType.BIM_MODEL_UPLOADED: 7,
+    EventType.DATA_ACCESSED: 8,
+}
+
+# Bulk event types may use at most this share of the consumers at once
+BULK_EVENT_TYPES = (EventType.FILE_UPLOADED, EventType.BIM_MODEL_UPLOADED)
+
+LATENCY_BUCKETS = [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+DEPTH_BUCKETS = [0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000]
+
+
+class Histogram:
+    """Cumulative bucket histogram (Prometheus "le" semantics)."""
+    
+    def __init__(self, buckets: List[float]):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        
+    def to_dict(self) -> Dict[str, Any]:
+        cumulative = list(itertools.accumulate(self.counts))
+        return {
+            "buckets": {str(le): n for le, n in zip(self.buckets, cumulative)},
+            "count": self.count,
+            "sum": self.sum,
+        }
+
+
+# Queue entry: (priority, sequence, enqueued at, event)
+QueuedEvent = Tuple[int, int, float, Event]
+
 
 class TriggerEngine:
     """
@@ -115,16 +166,48 @@ class TriggerEngine:
     
     All events flow through this engine, and triggers are registered
     to respond to specific event types.
+    
+    Locally queued events are served lowest priority value first (FIFO
+    within a priority) by num_workers concurrent consumers. An event
+    type at its concurrency limit is parked until one of its running
+    events finishes, so it never ties up a consumer. emit() waits once
+    max_queue_size events are queued or running.
     """
     
-    def __init__(self):
-        """Initialize the trigger engine."""
+    def __init__(
+        self,
+        num_workers: int = 4,
+        max_queue_size: int = 10000,
+        type_limits: Optional[Dict[EventType, int]] = None,
+    ):
+        """
+        Initialize the trigger engine.
+        
+        Args:
+            num_workers: Concurrent event consumers
+            max_queue_size: Events queued or running before emit() waits
+            type_limits: Maximum concurrently running events per type;
+                bulk upload types default to half the consumers
+        """
         self._handlers: Dict[EventType, List[EventHandler]] = defaultdict(list)
         self._all_handlers: List[EventHandler] = []
         self._running = False
-        self._event_queue: asyncio.Queue = asyncio.Queue()
-        self._task: Optional[asyncio.Task] = None
+        self.num_workers = num_workers
+        self.max_queue_size = max_queue_size
+        self._event_queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._capacity = asyncio.Semaphore(max_queue_size)
+        self._sequence = itertools.count()
+        self._tasks: List[asyncio.Task] = []
+        self._type_limits: Dict[EventType, int] = {
+            event_type: max(1, num_workers // 2) for event_type in BULK_EVENT_TYPES
+        }
+        self._type_limits.update(type_limits or {})
+        self._active: Dict[EventType, int] = defaultdict(int)
+        self._deferred: Dict[EventType, List[QueuedEvent]] = defaultdict(list)
         self._metrics: Dict[str, int] = defaultdict(int)
+        self._queue_depth = Histogram(DEPTH_BUCKETS)
+        self._wait_time = Histogram(LATENCY_BUCKETS)
+        self._handler_latency = Histogram(LATENCY_BUCKETS)
         self._error_handlers: List[Callable[[Event, Exception], Coroutine]] = []
         
     def register(
@@ -211,7 +294,16 @@ class TriggerEngine:
                 # Fall through to local processing
         
         # Local asyncio processing (dev/test or fallback)
-        await self._event_queue.put(event)
+        depth = self.queue_depth
+        self._queue_depth.observe(depth)
+        
+        # Backpressure: wait for room once the queue is full
+        if self._capacity.locked():
+            self._metrics["emit_backpressure_waits"] += 1
+            logger.warning(f"Event queue full ({depth}), emit waiting", event_id=event.event_id)
+        await self._capacity.acquire()
+        
+        self._event_queue.put_nowait((event.priority, next(self._sequence), time.monotonic(), event))
         self._metrics["events_emitted"] += 1
         logger.debug(f"Event emitted (local): {event.type.name}", event_id=event.event_id)
         
@@ -243,6 +335,7 @@ class TriggerEngine:
         Returns:
             Created event
         """
+        kwargs.setdefault("priority", DEFAULT_EVENT_PRIORITIES.get(event_type, 5))
         return Event(
             type=event_type,
             source=source,
@@ -250,14 +343,34 @@ class TriggerEngine:
             **kwargs,
         )
         
+    def set_type_limit(self, event_type: EventType, limit: Optional[int]) -> None:
+        """
+        Set the maximum concurrently running events of a type.
+        
+        Args:
+            event_type: Type of event
+            limit: Maximum running events, or None for no limit
+        """
+        if limit is None:
+            self._type_limits.pop(event_type, None)
+        else:
+            self._type_limits[event_type] = limit
+            
+    @property
+    def queue_depth(self) -> int:
+        """Events waiting to run, including those parked by type limits."""
+        return self._event_queue.qsize() + sum(len(d) for d in self._deferred.values())
+        
     async def start(self) -> None:
-        """Start the trigger engine event loop."""
+        """Start the trigger engine event consumers."""
         if self._running:
             return
             
         self._running = True
-        self._task = asyncio.create_task(self._event_loop())
-        logger.info("Trigger engine started")
+        self._tasks = [
+            asyncio.create_task(self._event_loop()) for _ in range(self.num_workers)
+        ]
+        logger.info(f"Trigger engine started with {self.num_workers} consumers")
         
     async def stop(self) -> None:
         """Stop the trigger engine."""
@@ -269,26 +382,43 @@ class TriggerEngine:
         # Wait for queue to empty
         await self._event_queue.join()
         
-        if self._task:
-            self._task.cancel()
-            try:
-                await self._task
-            except asyncio.CancelledError:
-                pass
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
                 
         logger.info("Trigger engine stopped")
         
     async def _event_loop(self) -> None:
-        """Main event processing loop."""
-        while self._running:
+        """Event consumer: takes the highest-priority runnable event."""
+        while True:
             try:
-                event = await self._event_queue.get()
-                await self._process_event(event)
+                item = await self._event_queue.get()
+            except asyncio.CancelledError:
+                break
+                
+            event = item[-1]
+            limit = self._type_limits.get(event.type)
+            if limit is not None and self._active[event.type] >= limit:
+                # Park it; re-queued when a running event of this type ends
+                heapq.heappush(self._deferred[event.type], item)
                 self._event_queue.task_done()
+                continue
+                
+            self._active[event.type] += 1
+            try:
+                self._wait_time.observe(time.monotonic() - item[2])
+                await self._process_event(event)
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error("Error in event loop", error=str(e))
+            finally:
+                self._active[event.type] -= 1
+                if self._deferred[event.type]:
+                    self._event_queue.put_nowait(heapq.heappop(self._deferred[event.type]))
+                self._event_queue.task_done()
+                self._capacity.release()
                 
     async def _process_event(self, event: Event) -> None:
         """
@@ -331,6 +461,7 @@ class TriggerEngine:
             handler: Handler to execute
             event: Event to process
         """
+        start = time.perf_counter()
         try:
             await handler(event)
         except Exception as e:
@@ -347,10 +478,21 @@ class TriggerEngine:
                     await error_handler(event, e)
                 except Exception as eh_error:
                     logger.error("Error handler failed", error=str(eh_error))
+        finally:
+            self._handler_latency.observe(time.perf_counter() - start)
                     
-    def get_metrics(self) -> Dict[str, int]:
-        """Get engine metrics."""
-        return dict(self._metrics)
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get engine counters, current queue state and histograms."""
+        return {
+            **self._metrics,
+            "queue_depth": self.queue_depth,
+            "active_events": sum(self._active.values()),
+            "histograms": {
+                "queue_depth": self._queue_depth.to_dict(),
+                "wait_time_seconds": self._wait_time.to_dict(),
+                "handler_latency_seconds": self._handler_latency.to_dict(),
+            },
+        }
         
     def get_handler_count(self) -> Dict[str, int]:
         """Get count of handlers per event type."""
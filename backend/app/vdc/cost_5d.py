@@ -2,7 +2,8 @@
 5D BIM - Cost Integration with Heatmaps
 Links 3D model elements to cost data for 5D cost visualization.
 """
-from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple, ClassVar, Iterator
 from dataclasses import dataclass, field
 from datetime import datetime, date
 from enum import Enum
@@ -10,7 +11,9 @@ import uuid
 import json
 import logging
 
-from .federated_models import ModelElement, FederatedModel, BoundingBox, Point3D
+from .federated_models import (
+    ModelElement, FederatedModel, Point3D, TrackedList, IndexedRecord, pack_bounds
+)
 
 logger = logging.getLogger(__name__)
 
@@ -38,7 +41,7 @@ class CostStatus(str, Enum):
 
 
 @dataclass
-class CostItem:
+class CostItem(IndexedRecord):
     """Represents a cost item linked to model elements."""
     id: str
     name: str
@@ -57,9 +60,21 @@ class CostItem:
     wbs_code: str = ""
     notes: str = ""
     
+    # Fields Cost5D indexes on; editing one invalidates the owners' indexes
+    _INDEXED_FIELDS: ClassVar[frozenset] = frozenset(
+        {'id', 'category', 'element_ids', 'unit_cost', 'quantity', 'total_cost', 'trade'}
+    )
+    _INDEXED_LISTS: ClassVar[frozenset] = frozenset({'element_ids'})
+    
     def __post_init__(self):
         self.total_cost = self.unit_cost * self.quantity
         self.variance = self.actual_amount - self.budget_amount
+        self.__dict__['_initialized'] = True
+    
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in ('unit_cost', 'quantity') and self.__dict__.get('_initialized'):
+            super().__setattr__('total_cost', self.unit_cost * self.quantity)
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -92,6 +107,39 @@ class Cost5D:
     updated_at: datetime = field(default_factory=datetime.utcnow)
     currency: str = "USD"
     base_date: date = field(default_factory=date.today)
+    # Indexes over cost_items, updated by add/remove_cost_item
+    _items_by_id: Dict[str, CostItem] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _element_costs: Dict[str, float] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _element_shares: Dict[str, float] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _element_refs: Dict[str, int] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _share_refs: Dict[str, int] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _items_by_trade: Dict[Optional[str], List[CostItem]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _items_by_category: Dict[CostCategory, List[CostItem]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _index_signature: Optional[Tuple] = field(default=None, init=False, repr=False, compare=False)
+    # Items this model is attached to for edit notifications
+    _attached: List[CostItem] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+    
+    def __setattr__(self, name, value):
+        # Keep cost_items tracked so the indexes see direct edits
+        if name == 'cost_items' and not isinstance(value, TrackedList):
+            value = TrackedList(value)
+        super().__setattr__(name, value)
     
     @property
     def total_budget(self) -> float:
@@ -135,29 +183,142 @@ class Cost5D:
             by_trade[trade]['actual'] += item.actual_amount
         return by_trade
     
+    def add_cost_item(self, item: CostItem):
+        """Add a cost item and update the indexes."""
+        self._ensure_index()
+        self.cost_items.append(item)
+        self._index_item(item, 1)
+        item._attach(self)
+        self._attached.append(item)
+        self._index_signature = self._index_state()
+        self.updated_at = datetime.utcnow()
+    
+    def remove_cost_item(self, item_id: str) -> bool:
+        """Remove a cost item by ID and update the indexes."""
+        self._ensure_index()
+        item = self._items_by_id.get(item_id)
+        if not item:
+            return False
+        
+        del self.cost_items[self._position(self.cost_items, item)]
+        self._index_item(item, -1)
+        del self._attached[self._position(self._attached, item)]
+        if not any(other is item for other in self._attached):
+            item._detach(self)
+        self._index_signature = self._index_state()
+        self.updated_at = datetime.utcnow()
+        return True
+    
+    def get_cost_item(self, item_id: str) -> Optional[CostItem]:
+        """Get a cost item by ID."""
+        self._ensure_index()
+        return self._items_by_id.get(item_id)
+    
+    def get_items_by_trade(self, trade: Optional[str]) -> List[CostItem]:
+        """Get cost items for a trade."""
+        self._ensure_index()
+        return list(self._items_by_trade.get(trade, []))
+    
+    def get_items_by_category(self, category: CostCategory) -> List[CostItem]:
+        """Get cost items for a category."""
+        self._ensure_index()
+        return list(self._items_by_category.get(category, []))
+    
     def get_cost_for_element(self, element_id: str) -> float:
         """Get total cost for a specific element."""
-        return sum(
-            item.total_cost 
-            for item in self.cost_items 
-            if element_id in item.element_ids
-        )
+        self._ensure_index()
+        return self._element_costs.get(element_id, 0.0)
+    
+    def get_element_costs(self) -> Dict[str, float]:
+        """Get total cost for every costed element."""
+        self._ensure_index()
+        return dict(self._element_costs)
     
     def get_elements_by_cost_range(self, min_cost: float, 
                                    max_cost: float) -> List[str]:
         """Get element IDs within a cost range."""
-        element_costs = {}
-        for item in self.cost_items:
-            for elem_id in item.element_ids:
-                if elem_id not in element_costs:
-                    element_costs[elem_id] = 0
-                element_costs[elem_id] += item.unit_cost * (item.quantity / len(item.element_ids))
-        
+        self._ensure_index()
         return [
-            elem_id for elem_id, cost in element_costs.items()
+            elem_id for elem_id, cost in self._element_shares.items()
             if min_cost <= cost <= max_cost
         ]
     
+    def reindex(self):
+        """Rebuild the indexes from cost_items."""
+        for item in self._attached:
+            item._detach(self)
+        self._attached = list(self.cost_items)
+        for item in self._attached:
+            item._attach(self)
+        
+        self._items_by_id = {}
+        self._element_costs = {}
+        self._element_shares = {}
+        self._element_refs = {}
+        self._share_refs = {}
+        self._items_by_trade = {}
+        self._items_by_category = {}
+        for item in self.cost_items:
+            self._index_item(item, 1)
+        self._index_signature = self._index_state()
+    
+    def _index_state(self) -> Tuple:
+        """Cheap fingerprint of cost_items; item edits reset the signature."""
+        return (id(self.cost_items), self.cost_items.revision)
+    
+    def _item_changed(self):
+        """Called by an attached item when an indexed field changes."""
+        self._index_signature = None
+    
+    def _ensure_index(self):
+        """Rebuild the indexes if cost_items or an item was changed directly."""
+        if self._index_signature != self._index_state():
+            self.reindex()
+    
+    def _index_item(self, item: CostItem, sign: int):
+        """Add (sign=1) or remove (sign=-1) an item's index entries."""
+        if sign > 0:
+            self._items_by_id[item.id] = item
+            self._items_by_trade.setdefault(item.trade, []).append(item)
+            self._items_by_category.setdefault(item.category, []).append(item)
+        else:
+            self._items_by_id.pop(item.id, None)
+            self._unlist(self._items_by_trade, item.trade, item)
+            self._unlist(self._items_by_category, item.category, item)
+        
+        # An element's cost counts each item once; its share of the
+        # item's quantity counts every listing
+        for elem_id in set(item.element_ids):
+            self._adjust(self._element_costs, self._element_refs, elem_id,
+                         sign, item.total_cost)
+        for elem_id in item.element_ids:
+            self._adjust(self._element_shares, self._share_refs, elem_id, sign,
+                         item.unit_cost * (item.quantity / len(item.element_ids)))
+    
+    @staticmethod
+    def _adjust(totals: Dict[str, float], refs: Dict[str, int], key: str,
+                sign: int, amount: float):
+        """Add or subtract an amount, dropping the key with its last reference."""
+        count = refs.get(key, 0) + sign
+        if count <= 0:
+            refs.pop(key, None)
+            totals.pop(key, None)
+        else:
+            refs[key] = count
+            totals[key] = totals.get(key, 0.0) + sign * amount
+    
+    @classmethod
+    def _unlist(cls, index: Dict[Any, List[CostItem]], key: Any, item: CostItem):
+        items = index[key]
+        del items[cls._position(items, item)]
+        if not items:
+            del index[key]
+    
+    @staticmethod
+    def _position(items: List[CostItem], item: CostItem) -> int:
+        """Position of this exact item; equal copies are left alone."""
+        return next(i for i, candidate in enumerate(items) if candidate is item)
+    
     def to_dict(self) -> Dict[str, Any]:
         return {
             'id': self.id,
@@ -183,6 +344,45 @@ class CostHeatmapPoint:
     total_cost: float
     element_count: int
     color_value: float  # 0-1 for color mapping
+    size: Optional[float] = None  # cell edge length, set for adaptive heatmaps
+
+
+@dataclass
+class HeatmapGrid:
+    """Sparse voxel grid of element costs.
+    
+    Only non-empty cells are stored, in ascending (i, j, k) order.
+    """
+    origin: Point3D
+    resolution: float
+    shape: Tuple[int, int, int]
+    cells: np.ndarray          # (M, 3) integer cell indices
+    total_cost: np.ndarray     # (M,) summed element cost per cell
+    element_count: np.ndarray  # (M,) elements intersecting each cell
+    
+    @property
+    def cell_volume(self) -> float:
+        return self.resolution ** 3
+    
+    @property
+    def cost_density(self) -> np.ndarray:
+        return self.total_cost / self.cell_volume if self.cell_volume > 0 else np.zeros_like(self.total_cost)
+    
+    @property
+    def flat_ids(self) -> np.ndarray:
+        _, ny, nz = self.shape
+        return (self.cells[:, 0] * ny + self.cells[:, 1]) * nz + self.cells[:, 2]
+    
+    def centers(self) -> np.ndarray:
+        """Cell centers as an (M, 3) array."""
+        origin = np.array([self.origin.x, self.origin.y, self.origin.z])
+        return origin + (self.cells + 0.5) * self.resolution
+    
+    def to_dense(self) -> np.ndarray:
+        """Total cost as a dense (nx, ny, nz) array."""
+        dense = np.zeros(self.shape, dtype=np.float64)
+        dense[tuple(self.cells.T)] = self.total_cost
+        return dense
 
 
 class CostHeatmapGenerator:
@@ -192,80 +392,227 @@ class CostHeatmapGenerator:
         self.cost_model = cost_model
         self.federated_model = federated_model
     
+    # Same slack as BoundingBox.intersects
+    CELL_TOLERANCE = 0.001
+    
     def generate_heatmap(self, 
                         resolution: float = 1.0,
                         cost_type: str = "total") -> List[CostHeatmapPoint]:
         """Generate cost heatmap data."""
-        heatmap_points = []
+        grid = self.generate_heatmap_grid(resolution)
+        if grid is None:
+            return []
+        
+        heatmap_points = [
+            CostHeatmapPoint(
+                position=Point3D(*center),
+                cost_density=density,
+                total_cost=total,
+                element_count=count,
+                color_value=0.0  # Will be calculated
+            )
+            for center, density, total, count in zip(
+                grid.centers().tolist(), grid.cost_density.tolist(),
+                grid.total_cost.tolist(), grid.element_count.tolist()
+            )
+        ]
         
-        # Get overall bounding box
+        self._normalize_density(heatmap_points)
+        return heatmap_points
+    
+    def generate_heatmap_grid(self, resolution: float = 1.0) -> Optional[HeatmapGrid]:
+        """Bin elements into the voxel grid once and return the sparse result.
+        
+        The grid has the same origin and cell count as ``generate_heatmap``
+        and an element counts towards every cell its box intersects.
+        """
         bbox = self.federated_model.overall_bounding_box
         if not bbox:
-            return heatmap_points
+            return None
         
-        # Create grid
         dims = bbox.dimensions
-        nx = max(1, int(dims[0] / resolution))
-        ny = max(1, int(dims[1] / resolution))
-        nz = max(1, int(dims[2] / resolution))
-        
-        for i in range(nx):
-            for j in range(ny):
-                for k in range(nz):
-                    # Calculate grid cell center
-                    x = bbox.min_point.x + (i + 0.5) * resolution
-                    y = bbox.min_point.y + (j + 0.5) * resolution
-                    z = bbox.min_point.z + (k + 0.5) * resolution
-                    center = Point3D(x, y, z)
-                    
-                    # Find elements in this cell
-                    cell_bbox = BoundingBox(
-                        Point3D(x - resolution/2, y - resolution/2, z - resolution/2),
-                        Point3D(x + resolution/2, y + resolution/2, z + resolution/2)
-                    )
-                    
-                    elements_in_cell = self._get_elements_in_cell(cell_bbox)
-                    
-                    if elements_in_cell:
-                        total_cost = sum(
-                            self.cost_model.get_cost_for_element(e.id)
-                            for e in elements_in_cell
-                        )
-                        cell_volume = resolution ** 3
-                        cost_density = total_cost / cell_volume if cell_volume > 0 else 0
-                        
-                        heatmap_points.append(CostHeatmapPoint(
-                            position=center,
-                            cost_density=cost_density,
-                            total_cost=total_cost,
-                            element_count=len(elements_in_cell),
-                            color_value=0.0  # Will be calculated
-                        ))
-        
-        # Normalize color values
+        shape = tuple(max(1, int(d / resolution)) for d in dims)
+        mins, maxs, costs = self._element_arrays()
+        return self._bin_elements(bbox.min_point, resolution, shape, mins, maxs, costs)
+    
+    def generate_adaptive_heatmap(self, resolution: float = 4.0,
+                                  max_depth: int = 3,
+                                  max_elements_per_cell: int = 8) -> List[CostHeatmapPoint]:
+        """Generate an octree heatmap that refines only busy cells.
+        
+        Cells start at ``resolution`` and are split in eight while they hold
+        more than ``max_elements_per_cell`` elements, down to
+        ``resolution / 2 ** max_depth``. Each point carries its cell ``size``.
+        """
+        bbox = self.federated_model.overall_bounding_box
+        if not bbox:
+            return []
+        
+        mins, maxs, costs = self._element_arrays()
+        base_shape = np.maximum(1, np.ceil(np.array(bbox.dimensions) / resolution)).astype(np.int64)
+        
+        heatmap_points = []
+        refined: Optional[np.ndarray] = None
+        parent_shape = None
+        # Only elements touching a refined parent can reach its children
+        candidates = np.arange(len(costs))
+        
+        for level in range(max_depth + 1):
+            cell_size = resolution / 2 ** level
+            shape = tuple((base_shape * 2 ** level).tolist())
+            grid = self._bin_elements(
+                bbox.min_point, cell_size, shape,
+                mins[candidates], maxs[candidates], costs[candidates]
+            )
+            
+            keep = np.ones(len(grid.cells), dtype=bool)
+            if refined is not None:
+                parents = grid.cells // 2
+                parent_ids = (parents[:, 0] * parent_shape[1] + parents[:, 1]) * parent_shape[2] + parents[:, 2]
+                keep = np.isin(parent_ids, refined)
+            
+            split = keep & (grid.element_count > max_elements_per_cell) & (level < max_depth)
+            emit = keep & ~split
+            
+            for center, density, total, count in zip(
+                grid.centers()[emit].tolist(), grid.cost_density[emit].tolist(),
+                grid.total_cost[emit].tolist(), grid.element_count[emit].tolist()
+            ):
+                heatmap_points.append(CostHeatmapPoint(
+                    position=Point3D(*center),
+                    cost_density=density,
+                    total_cost=total,
+                    element_count=count,
+                    color_value=0.0,
+                    size=cell_size
+                ))
+            
+            refined = grid.flat_ids[split]
+            parent_shape = shape
+            if not len(refined):
+                break
+            candidates = candidates[self._elements_touching(
+                bbox.min_point, cell_size, shape,
+                mins[candidates], maxs[candidates], refined
+            )]
+        
+        self._normalize_density(heatmap_points)
+        return heatmap_points
+    
+    def _normalize_density(self, heatmap_points: List[CostHeatmapPoint]):
+        """Normalize color values"""
         if heatmap_points:
             max_density = max(p.cost_density for p in heatmap_points)
             for point in heatmap_points:
                 point.color_value = point.cost_density / max_density if max_density > 0 else 0
+    
+    def _element_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Element bounds and per-element cost as dense arrays."""
+        elements = self.federated_model.get_all_elements()
+        mins, maxs = pack_bounds(elements)
         
-        return heatmap_points
+        element_costs = self.cost_model.get_element_costs()
+        costs = np.fromiter(
+            (element_costs.get(e.id, 0.0) for e in elements),
+            dtype=np.float64, count=len(elements)
+        )
+        return mins, maxs, costs
     
-    def _get_elements_in_cell(self, cell_bbox: BoundingBox) -> List[ModelElement]:
-        """Get elements that intersect with a grid cell."""
-        elements = []
-        for element in self.federated_model.get_all_elements():
-            if element.bounding_box.intersects(cell_bbox):
-                elements.append(element)
-        return elements
+    def _covered_cells(self, origin: Point3D, resolution: float,
+                       shape: Tuple[int, int, int], mins: np.ndarray,
+                       maxs: np.ndarray, batch_cells: int = 2_000_000
+                       ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Yield (element index, flat cell id) pairs for every cell each box touches.
+        
+        Elements are expanded to their covered cells in batches of at most
+        ``batch_cells`` (element, cell) entries, so memory stays bounded for
+        fine resolutions.
+        """
+        nx, ny, nz = shape
+        upper = np.array(shape) - 1
+        base = np.array([origin.x, origin.y, origin.z])
+        tol = self.CELL_TOLERANCE
+        
+        # Cell i spans [base + i*res, base + (i+1)*res]
+        lo = np.ceil((mins - tol - base) / resolution - 1).astype(np.int64)
+        hi = np.floor((maxs + tol - base) / resolution).astype(np.int64)
+        lo = np.maximum(lo, 0)
+        hi = np.minimum(hi, upper)
+        spans = np.maximum(hi - lo + 1, 0)
+        per_element = spans.prod(axis=1)
+        
+        nonempty = np.flatnonzero(per_element)
+        cumulative = np.cumsum(per_element[nonempty])
+        
+        start = 0
+        while start < len(nonempty):
+            offset = cumulative[start - 1] if start else 0
+            end = int(np.searchsorted(cumulative, offset + batch_cells, side='right'))
+            end = max(end, start + 1)
+            batch = nonempty[start:end]
+            
+            owner = np.repeat(batch, per_element[batch])
+            group_start = np.repeat(np.cumsum(per_element[batch]) - per_element[batch], per_element[batch])
+            local = np.arange(len(owner)) - group_start
+            
+            # Decompose the running offset into (di, dj, dk) within each box
+            span_y, span_z = spans[owner, 1], spans[owner, 2]
+            di, rem = np.divmod(local, span_y * span_z)
+            dj, dk = np.divmod(rem, span_z)
+            flat = ((lo[owner, 0] + di) * ny + lo[owner, 1] + dj) * nz + lo[owner, 2] + dk
+            yield owner, flat
+            start = end
+    
+    def _bin_elements(self, origin: Point3D, resolution: float,
+                      shape: Tuple[int, int, int], mins: np.ndarray,
+                      maxs: np.ndarray, costs: np.ndarray,
+                      batch_cells: int = 2_000_000) -> HeatmapGrid:
+        """Accumulate element cost and count into every cell each box touches."""
+        nx, ny, nz = shape
+        cell_parts, cost_parts, count_parts = [], [], []
+        for owner, flat in self._covered_cells(origin, resolution, shape, mins, maxs, batch_cells):
+            cells, inverse = np.unique(flat, return_inverse=True)
+            cell_parts.append(cells)
+            cost_parts.append(np.bincount(inverse, weights=costs[owner]))
+            count_parts.append(np.bincount(inverse))
+        
+        if cell_parts:
+            cells, inverse = np.unique(np.concatenate(cell_parts), return_inverse=True)
+            total_cost = np.bincount(inverse, weights=np.concatenate(cost_parts))
+            element_count = np.bincount(inverse, weights=np.concatenate(count_parts)).astype(np.int64)
+        else:
+            cells = np.empty(0, dtype=np.int64)
+            total_cost = np.empty(0, dtype=np.float64)
+            element_count = np.empty(0, dtype=np.int64)
+        
+        i, rem = np.divmod(cells, ny * nz)
+        j, k = np.divmod(rem, nz)
+        return HeatmapGrid(
+            origin=origin,
+            resolution=resolution,
+            shape=(nx, ny, nz),
+            cells=np.stack([i, j, k], axis=1),
+            total_cost=total_cost,
+            element_count=element_count
+        )
+    
+    def _elements_touching(self, origin: Point3D, resolution: float,
+                           shape: Tuple[int, int, int], mins: np.ndarray,
+                           maxs: np.ndarray, cell_ids: np.ndarray) -> np.ndarray:
+        """Indices of the boxes that touch any of the given flat cell ids."""
+        hits = [
+            owner[np.isin(flat, cell_ids)]
+            for owner, flat in self._covered_cells(origin, resolution, shape, mins, maxs)
+        ]
+        if not hits:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(hits))
     
     def generate_trade_heatmap(self, trade: str,
                               resolution: float = 1.0) -> List[CostHeatmapPoint]:
         """Generate heatmap for a specific trade."""
         # Filter cost items by trade
-        trade_items = [
-            item for item in self.cost_model.cost_items
-            if item.trade == trade
-        ]
+        trade_items = self.cost_model.get_items_by_trade(trade)
         
         # Generate heatmap using only trade items
         heatmap_points = []
@@ -293,10 +640,7 @@ class CostHeatmapGenerator:
     
     def _get_element_by_id(self, element_id: str) -> Optional[ModelElement]:
         """Get element by ID."""
-        for element in self.federated_model.get_all_elements():
-            if element.id == element_id:
-                return element
-        return None
+        return self.federated_model.get_element(element_id)
     
     def get_color_for_value(self, value: float, 
                            color_scheme: str = "red_green") -> str:
@@ -351,8 +695,7 @@ class Cost5DEngine:
         if not cost_model:
             return False
         
-        cost_model.cost_items.append(cost_item)
-        cost_model.updated_at = datetime.utcnow()
+        cost_model.add_cost_item(cost_item)
         return True
     
     def update_actual_cost(self, cost_model_id: str, cost_item_id: str,
@@ -362,15 +705,15 @@ class Cost5DEngine:
         if not cost_model:
             return False
         
-        for item in cost_model.cost_items:
-            if item.id == cost_item_id:
-                item.actual_amount = actual_amount
-                item.variance = actual_amount - item.budget_amount
-                item.status = CostStatus.PAID if actual_amount > 0 else item.status
-                cost_model.updated_at = datetime.utcnow()
-                return True
-        
-        return False
+        item = cost_model.get_cost_item(cost_item_id)
+        if not item:
+            return False
+        
+        item.actual_amount = actual_amount
+        item.variance = actual_amount - item.budget_amount
+        item.status = CostStatus.PAID if actual_amount > 0 else item.status
+        cost_model.updated_at = datetime.utcnow()
+        return True
     
     def generate_budget_report(self, cost_model_id: str) -> Dict[str, Any]:
         """Generate budget vs actual report."""
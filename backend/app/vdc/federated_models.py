@@ -3,13 +3,14 @@ Federated Models - Multi-discipline IFC Model Merging
 Combines architectural, structural, and MEP models into unified federated model.
 """
 import numpy as np
-from typing import List, Dict, Any, Optional, Tuple, Set
+from typing import List, Dict, Any, Optional, Tuple, Set, ClassVar
 from dataclasses import dataclass, field
 from enum import Enum
 from datetime import datetime
 import uuid
 import json
 import logging
+import weakref
 
 logger = logging.getLogger(__name__)
 
@@ -97,6 +98,22 @@ class BoundingBox:
             self.max_point.z >= other.min_point.z - tolerance
         )
     
+    def expanded(self, margin: float) -> 'BoundingBox':
+        """Return a copy grown by margin on every side."""
+        return BoundingBox(
+            Point3D(self.min_point.x - margin, self.min_point.y - margin, self.min_point.z - margin),
+            Point3D(self.max_point.x + margin, self.max_point.y + margin, self.max_point.z + margin)
+        )
+    
+    def distance_to(self, other: 'BoundingBox') -> float:
+        """Minimum distance between two boxes, 0 if they touch or overlap."""
+        gaps = (
+            max(0.0, other.min_point.x - self.max_point.x, self.min_point.x - other.max_point.x),
+            max(0.0, other.min_point.y - self.max_point.y, self.min_point.y - other.max_point.y),
+            max(0.0, other.min_point.z - self.max_point.z, self.min_point.z - other.max_point.z)
+        )
+        return float(np.sqrt(sum(g * g for g in gaps)))
+    
     def contains_point(self, point: Point3D) -> bool:
         """Check if point is inside bounding box."""
         return (
@@ -142,6 +159,120 @@ class ModelElement:
         return colors.get(self.discipline, "#CCCCCC")
 
 
+def pack_bounds(elements: List[ModelElement]) -> Tuple[np.ndarray, np.ndarray]:
+    """Pack element bounding boxes into contiguous (N, 3) min/max arrays."""
+    count = len(elements)
+    mins = np.empty((count, 3), dtype=np.float64)
+    maxs = np.empty((count, 3), dtype=np.float64)
+    for i, e in enumerate(elements):
+        bmin = e.bounding_box.min_point
+        bmax = e.bounding_box.max_point
+        mins[i] = (bmin.x, bmin.y, bmin.z)
+        maxs[i] = (bmax.x, bmax.y, bmax.z)
+    return mins, maxs
+
+
+class TrackedList(list):
+    """List that counts its in-place changes in ``revision``.
+
+    Indexes built over the list compare ``revision`` with the value they
+    were built at to notice direct edits. ``on_change`` is called after
+    every change.
+    """
+    
+    def __init__(self, iterable=(), on_change=None):
+        super().__init__(iterable)
+        self.revision = 0
+        self.on_change = on_change
+    
+    def _changed(self):
+        self.revision += 1
+        if self.on_change is not None:
+            self.on_change()
+    
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._changed()
+    
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._changed()
+    
+    def __iadd__(self, other):
+        result = super().__iadd__(other)
+        self._changed()
+        return result
+    
+    def __imul__(self, n):
+        result = super().__imul__(n)
+        self._changed()
+        return result
+    
+    def append(self, value):
+        super().append(value)
+        self._changed()
+    
+    def extend(self, values):
+        super().extend(values)
+        self._changed()
+    
+    def insert(self, index, value):
+        super().insert(index, value)
+        self._changed()
+    
+    def remove(self, value):
+        super().remove(value)
+        self._changed()
+    
+    def pop(self, index=-1):
+        value = super().pop(index)
+        self._changed()
+        return value
+    
+    def clear(self):
+        super().clear()
+        self._changed()
+    
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._changed()
+    
+    def reverse(self):
+        super().reverse()
+        self._changed()
+
+
+class IndexedRecord:
+    """Mixin for dataclasses that other objects keep indexes over.
+    
+    Owners register with ``_attach`` and have ``_item_changed`` called
+    whenever a field in ``_INDEXED_FIELDS`` is set or a list field in
+    ``_INDEXED_LISTS`` changes in place. Owners are held weakly.
+    """
+    
+    _INDEXED_FIELDS: ClassVar[frozenset] = frozenset()
+    _INDEXED_LISTS: ClassVar[frozenset] = frozenset()
+    
+    def __setattr__(self, name, value):
+        if name in self._INDEXED_LISTS and not isinstance(value, TrackedList):
+            value = TrackedList(value, on_change=self._touch)
+        super().__setattr__(name, value)
+        if name in self._INDEXED_FIELDS:
+            self._touch()
+    
+    def _attach(self, owner: Any):
+        self.__dict__.setdefault('_owners', {})[id(owner)] = weakref.ref(owner)
+    
+    def _detach(self, owner: Any):
+        self.__dict__.get('_owners', {}).pop(id(owner), None)
+    
+    def _touch(self):
+        for ref in list(self.__dict__.get('_owners', {}).values()):
+            owner = ref()
+            if owner is not None:
+                owner._item_changed()
+
+
 @dataclass
 class DisciplineModel:
     """Represents a single discipline's IFC model."""
@@ -157,6 +288,12 @@ class DisciplineModel:
     uploaded_by: Optional[str] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
     
+    def __setattr__(self, name, value):
+        # Keep elements tracked so federated indexes see direct edits
+        if name == 'elements' and not isinstance(value, TrackedList):
+            value = TrackedList(value)
+        super().__setattr__(name, value)
+    
     def __post_init__(self):
         if self.bounding_box is None and self.elements:
             self._calculate_bounding_box()
@@ -198,6 +335,17 @@ class FederatedModel:
     updated_at: datetime = field(default_factory=datetime.utcnow)
     created_by: Optional[str] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # Element indexes, kept in step with discipline_models
+    _elements_by_id: Dict[str, ModelElement] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _all_elements: Optional[List[ModelElement]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _index_signature: Tuple = field(default=(), init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self._rebuild_index()
     
     @property
     def total_elements(self) -> int:
@@ -228,21 +376,68 @@ class FederatedModel:
     
     def add_discipline_model(self, model: DisciplineModel):
         """Add a discipline model to the federation."""
+        self._ensure_index()
+        replaced = self.discipline_models.get(model.discipline)
+        if replaced:
+            self._unindex_elements(replaced.elements)
+        
         self.discipline_models[model.discipline] = model
+        for element in model.elements:
+            self._elements_by_id[element.id] = element
+        self._all_elements = None
+        self._index_signature = self._index_state()
         self.updated_at = datetime.utcnow()
     
     def remove_discipline_model(self, discipline: Discipline):
         """Remove a discipline model from the federation."""
         if discipline in self.discipline_models:
+            self._ensure_index()
+            self._unindex_elements(self.discipline_models[discipline].elements)
             del self.discipline_models[discipline]
+            self._all_elements = None
+            self._index_signature = self._index_state()
             self.updated_at = datetime.utcnow()
     
     def get_all_elements(self) -> List[ModelElement]:
-        """Get all elements from all disciplines."""
-        elements = []
-        for dm in self.discipline_models.values():
-            elements.extend(dm.elements)
-        return elements
+        """Get all elements from all disciplines.
+        
+        The list is cached between calls and must not be modified.
+        """
+        self._ensure_index()
+        if self._all_elements is None:
+            self._all_elements = [
+                e for dm in self.discipline_models.values() for e in dm.elements
+            ]
+        return self._all_elements
+    
+    def get_element(self, element_id: str) -> Optional[ModelElement]:
+        """Get an element by ID from any discipline."""
+        self._ensure_index()
+        return self._elements_by_id.get(element_id)
+    
+    def _index_state(self) -> Tuple:
+        """Cheap fingerprint of the discipline models and their edits."""
+        return tuple(
+            (d, id(m), id(m.elements), m.elements.revision)
+            for d, m in self.discipline_models.items()
+        )
+    
+    def _ensure_index(self):
+        """Rebuild the indexes if discipline models were changed in place."""
+        if self._index_signature != self._index_state():
+            self._rebuild_index()
+    
+    def _rebuild_index(self):
+        self._elements_by_id = {
+            e.id: e for dm in self.discipline_models.values() for e in dm.elements
+        }
+        self._all_elements = None
+        self._index_signature = self._index_state()
+    
+    def _unindex_elements(self, elements: List[ModelElement]):
+        for element in elements:
+            if self._elements_by_id.get(element.id) is element:
+                del self._elements_by_id[element.id]
     
     def get_elements_by_discipline(self, discipline: Discipline) -> List[ModelElement]:
         """Get elements from a specific discipline."""
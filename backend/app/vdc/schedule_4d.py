@@ -2,15 +2,18 @@
 4D BIM - Schedule Integration with Gantt Visualization
 Links 3D model elements to construction schedule for 4D simulation.
 """
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Set, Iterator, ClassVar
 from dataclasses import dataclass, field
 from datetime import datetime, date, timedelta
 from enum import Enum
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+import heapq
 import uuid
 import json
 import logging
 
-from .federated_models import ModelElement, FederatedModel
+from .federated_models import ModelElement, FederatedModel, TrackedList, IndexedRecord
 
 logger = logging.getLogger(__name__)
 
@@ -49,7 +52,7 @@ class TaskDependency:
 
 
 @dataclass
-class ConstructionTask:
+class ConstructionTask(IndexedRecord):
     """Represents a construction schedule task."""
     id: str
     name: str
@@ -73,6 +76,12 @@ class ConstructionTask:
     critical_path: bool = False
     float_days: float = 0.0
     
+    # Fields Schedule4D indexes on; editing one invalidates the owners' indexes
+    _INDEXED_FIELDS: ClassVar[frozenset] = frozenset(
+        {'id', 'start_date', 'end_date', 'duration_days', 'linked_element_ids'}
+    )
+    _INDEXED_LISTS: ClassVar[frozenset] = frozenset({'linked_element_ids'})
+    
     @property
     def is_on_critical_path(self) -> bool:
         return self.critical_path
@@ -107,6 +116,169 @@ class ConstructionTask:
         }
 
 
+class IntervalTree:
+    """Centered interval tree over closed [start, end] ranges with int payloads."""
+    
+    def __init__(self, intervals: List[Tuple[Any, Any, int]]):
+        self.center = None
+        self.by_start: List[Tuple[Any, Any, int]] = []
+        self.by_end: List[Tuple[Any, Any, int]] = []
+        self.left: Optional['IntervalTree'] = None
+        self.right: Optional['IntervalTree'] = None
+        if not intervals:
+            return
+        
+        endpoints = sorted(p for start, end, _ in intervals for p in (start, end))
+        self.center = endpoints[len(endpoints) // 2]
+        
+        left, right, here = [], [], []
+        for interval in intervals:
+            if interval[1] < self.center:
+                left.append(interval)
+            elif interval[0] > self.center:
+                right.append(interval)
+            else:
+                here.append(interval)
+        
+        self.by_start = sorted(here, key=lambda iv: iv[0])
+        self.by_end = sorted(here, key=lambda iv: iv[1], reverse=True)
+        self.left = IntervalTree(left) if left else None
+        self.right = IntervalTree(right) if right else None
+    
+    def query(self, point) -> List[int]:
+        """Payloads of all intervals containing point."""
+        results = []
+        node = self
+        while node is not None and node.center is not None:
+            if point < node.center:
+                for start, _, payload in node.by_start:
+                    if start > point:
+                        break
+                    results.append(payload)
+                node = node.left
+            else:
+                for _, end, payload in node.by_end:
+                    if end < point:
+                        break
+                    results.append(payload)
+                node = node.right
+        return results
+
+
+class ScheduleTimelineIndex:
+    """Date index over a schedule's tasks for 4D playback.
+    
+    Answers "which tasks are active on a day" through an interval tree,
+    project progress on a day through prefix sums, and walks a date range
+    with a sweep line that reports only what changed between steps.
+    Task ranges are closed, as in ``Schedule4D.get_tasks_by_date``.
+    """
+    
+    def __init__(self, tasks: List[ConstructionTask]):
+        self.tasks = list(tasks)
+        self.tree = IntervalTree([
+            (t.start_date, t.end_date, i) for i, t in enumerate(self.tasks)
+        ])
+        self.start_order = sorted(range(len(self.tasks)), key=lambda i: self.tasks[i].start_date)
+        self.end_order = sorted(range(len(self.tasks)), key=lambda i: self.tasks[i].end_date)
+        
+        # Prefix sums for progress: starts by start date, durations by end date
+        self.sorted_starts = [self.tasks[i].start_date.toordinal() for i in self.start_order]
+        self.sorted_ends = [self.tasks[i].end_date.toordinal() for i in self.end_order]
+        self.start_sums = [0] + list(accumulate(self.sorted_starts))
+        self.end_start_sums = [0] + list(accumulate(
+            self.tasks[i].start_date.toordinal() for i in self.end_order
+        ))
+        self.end_duration_sums = [0] + list(accumulate(
+            self.tasks[i].duration_days for i in self.end_order
+        ))
+        self.total_duration = self.end_duration_sums[-1]
+        
+        # Elements appear with their first task and complete after their last
+        first_start: Dict[str, date] = {}
+        last_end: Dict[str, date] = {}
+        for t in self.tasks:
+            for elem_id in t.linked_element_ids:
+                if elem_id not in first_start or t.start_date < first_start[elem_id]:
+                    first_start[elem_id] = t.start_date
+                if elem_id not in last_end or t.end_date > last_end[elem_id]:
+                    last_end[elem_id] = t.end_date
+        self.appear_events = sorted((d, e) for e, d in first_start.items())
+        self.complete_events = sorted((d + timedelta(days=1), e) for e, d in last_end.items())
+    
+    @property
+    def date_range(self) -> Tuple[Optional[date], Optional[date]]:
+        if not self.tasks:
+            return None, None
+        return self.tasks[self.start_order[0]].start_date, self.tasks[self.end_order[-1]].end_date
+    
+    def tasks_on(self, target_date: date) -> List[ConstructionTask]:
+        """Tasks active on a date, in schedule order."""
+        return [self.tasks[i] for i in sorted(self.tree.query(target_date))]
+    
+    def progress_on(self, target_date: date) -> float:
+        """Same measure as ``GanttChartGenerator._calculate_progress_on_date``."""
+        if self.total_duration == 0:
+            return 0.0
+        
+        day = target_date.toordinal()
+        finished = bisect_left(self.sorted_ends, day)    # end < day
+        started = bisect_right(self.sorted_starts, day)  # start <= day
+        
+        # Finished tasks count fully; active ones by days elapsed
+        completed = self.end_duration_sums[finished]
+        active = started - finished
+        elapsed = active * day - (self.start_sums[started] - self.end_start_sums[finished])
+        return (completed + elapsed) / self.total_duration * 100
+    
+    def sweep(self, start_date: date, end_date: date, step_days: int = 1,
+              close: bool = False) -> Iterator[Tuple[date, List[int], List[int], Set[int]]]:
+        """Walk the range, yielding (date, started, finished, active) per step.
+        
+        ``started`` and ``finished`` hold the task indices that became
+        active or stopped being active since the previous step; tasks that
+        started and finished between two steps appear in neither. With
+        ``close`` a last step lands on ``end_date`` when the stride misses it.
+        """
+        active: Set[int] = set()
+        ending: List[Tuple[date, int]] = []
+        next_start = 0
+        current = start_date
+        
+        while current <= end_date:
+            started = []
+            while next_start < len(self.start_order) and \
+                    self.tasks[self.start_order[next_start]].start_date <= current:
+                i = self.start_order[next_start]
+                next_start += 1
+                if self.tasks[i].end_date >= current:
+                    active.add(i)
+                    started.append(i)
+                    heapq.heappush(ending, (self.tasks[i].end_date, i))
+            
+            finished = []
+            while ending and ending[0][0] < current:
+                _, i = heapq.heappop(ending)
+                if i in active and i not in started:
+                    active.discard(i)
+                    finished.append(i)
+            
+            yield current, sorted(started), sorted(finished), active
+            if close and current < end_date < current + timedelta(days=step_days):
+                current = end_date
+            else:
+                current += timedelta(days=step_days)
+    
+    def element_changes(self, after: Optional[date],
+                        until: date) -> Tuple[List[str], List[str]]:
+        """Elements appearing and completing in the half-open range (after, until]."""
+        def between(events):
+            lo = 0 if after is None else bisect_right(events, (after, '\uffff'))
+            hi = bisect_right(events, (until, '\uffff'))
+            return [e for _, e in events[lo:hi]]
+        return between(self.appear_events), between(self.complete_events)
+
+
 @dataclass
 class Schedule4D:
     """4D schedule linked to BIM model."""
@@ -121,6 +293,27 @@ class Schedule4D:
     created_at: datetime = field(default_factory=datetime.utcnow)
     updated_at: datetime = field(default_factory=datetime.utcnow)
     baseline_date: Optional[date] = None
+    data_date: Optional[date] = None  # progress cut-off for rescheduling
+    _tasks_by_id: Dict[str, ConstructionTask] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _index_signature: Optional[Tuple] = field(default=None, init=False, repr=False, compare=False)
+    _timeline: Optional[ScheduleTimelineIndex] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _timeline_signature: Optional[Tuple] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # Tasks this schedule is attached to for edit notifications
+    _attached: List[ConstructionTask] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+    
+    def __setattr__(self, name, value):
+        # Keep tasks tracked so the indexes see direct edits
+        if name == 'tasks' and not isinstance(value, TrackedList):
+            value = TrackedList(value)
+        super().__setattr__(name, value)
     
     @property
     def total_tasks(self) -> int:
@@ -149,17 +342,45 @@ class Schedule4D:
     
     def get_task_by_id(self, task_id: str) -> Optional[ConstructionTask]:
         """Get task by ID."""
-        for task in self.tasks:
-            if task.id == task_id:
-                return task
-        return None
+        if self._index_signature != self._tasks_state():
+            self._attach_tasks()
+            self._tasks_by_id = {t.id: t for t in self.tasks}
+            self._index_signature = self._tasks_state()
+        return self._tasks_by_id.get(task_id)
+    
+    @property
+    def timeline(self) -> ScheduleTimelineIndex:
+        """Date index over the tasks, rebuilt after task or list edits."""
+        if self._timeline is None or self._timeline_signature != self._tasks_state():
+            self._attach_tasks()
+            self._timeline = ScheduleTimelineIndex(self.tasks)
+            self._timeline_signature = self._tasks_state()
+        return self._timeline
+    
+    def _tasks_state(self) -> Tuple:
+        """Cheap fingerprint of the task list; task edits reset the signatures."""
+        return (id(self.tasks), self.tasks.revision)
+    
+    def _attach_tasks(self):
+        """Get edit notifications from the tasks the indexes are built from."""
+        for task in self._attached:
+            task._detach(self)
+        self._attached = list(self.tasks)
+        for task in self._attached:
+            task._attach(self)
+    
+    def _item_changed(self):
+        """Called by an attached task when an indexed field changes."""
+        self._index_signature = None
+        self._timeline_signature = None
+    
+    def invalidate_timeline(self):
+        """Drop the date index after task dates or links change."""
+        self._timeline = None
     
     def get_tasks_by_date(self, target_date: date) -> List[ConstructionTask]:
         """Get tasks active on a specific date."""
-        return [
-            t for t in self.tasks
-            if t.start_date <= target_date <= t.end_date
-        ]
+        return self.timeline.tasks_on(target_date)
     
     def get_tasks_by_element(self, element_id: str) -> List[ConstructionTask]:
         """Get tasks linked to a specific element."""
@@ -178,12 +399,11 @@ class Schedule4D:
             if task.status in [TaskStatus.COMPLETED, TaskStatus.IN_PROGRESS]:
                 element_ids.update(task.linked_element_ids)
         
-        elements = []
-        for element in federated_model.get_all_elements():
-            if element.id in element_ids:
-                elements.append(element)
-        
-        return elements
+        # Keep federated model order so results are stable between calls
+        return [
+            element for element in federated_model.get_all_elements()
+            if element.id in element_ids
+        ]
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -200,6 +420,230 @@ class Schedule4D:
         }
 
 
+class CriticalPathCalculator:
+    """Forward/backward pass CPM over a schedule's dependency network.
+    
+    Dates are handled as day offsets from the project start, with a task
+    occupying ``[early_start, early_finish)`` so that an FS successor with
+    no lag starts on its predecessor's end date. Links come from
+    ``schedule.dependencies`` (FS, SS, FF, SF with lags) plus any
+    ``predecessor_ids`` without an explicit dependency, taken as FS.
+    
+    Completed tasks keep their recorded dates and in-progress tasks their
+    recorded start; with a data date, in-progress tasks finish their
+    remaining duration from it and unstarted tasks cannot start before
+    it. Unstarted tasks without predecessors keep their own start date
+    as an earliest start.
+    
+    ``calculate`` runs in O(tasks + links). ``update_task`` re-runs the
+    forward pass only over tasks downstream of a changed task, and the
+    backward pass only upstream of tasks whose duration or late dates
+    moved, unless the project finish itself changed.
+    """
+    
+    def __init__(self, schedule: Schedule4D):
+        self.schedule = schedule
+        self.tasks: Dict[str, ConstructionTask] = {}
+        self.successors: Dict[str, List[Tuple[str, str, int]]] = {}
+        self.predecessors: Dict[str, List[Tuple[str, str, int]]] = {}
+        self.topo_index: Dict[str, int] = {}
+        self.topo_order: List[str] = []
+        self.project_start: Optional[date] = None
+        self.project_finish = 0
+        self.early_start: Dict[str, int] = {}
+        self.early_finish: Dict[str, int] = {}
+        self.late_start: Dict[str, int] = {}
+        self.late_finish: Dict[str, int] = {}
+        self._earliest: Dict[str, int] = {}
+    
+    def build(self):
+        """Build the link lists and topological order."""
+        self.tasks = {t.id: t for t in self.schedule.tasks}
+        self.successors = {tid: [] for tid in self.tasks}
+        self.predecessors = {tid: [] for tid in self.tasks}
+        
+        linked: Set[Tuple[str, str]] = set()
+        for dep in self.schedule.dependencies:
+            self._add_link(dep.predecessor_id, dep.successor_id,
+                           dep.dependency_type.upper(), dep.lag_days)
+            linked.add((dep.predecessor_id, dep.successor_id))
+        for task in self.schedule.tasks:
+            for pred_id in task.predecessor_ids:
+                if (pred_id, task.id) not in linked:
+                    self._add_link(pred_id, task.id, "FS", 0)
+                    linked.add((pred_id, task.id))
+        
+        # Kahn's algorithm, keeping schedule order among ready tasks
+        in_degree = {tid: len(preds) for tid, preds in self.predecessors.items()}
+        ready = [(i, t.id) for i, t in enumerate(self.schedule.tasks) if not in_degree[t.id]]
+        position = {t.id: i for i, t in enumerate(self.schedule.tasks)}
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            _, tid = heapq.heappop(ready)
+            order.append(tid)
+            for succ_id, _, _ in self.successors[tid]:
+                in_degree[succ_id] -= 1
+                if not in_degree[succ_id]:
+                    heapq.heappush(ready, (position[succ_id], succ_id))
+        
+        if len(order) != len(self.tasks):
+            cyclic = sorted(tid for tid, degree in in_degree.items() if degree)
+            raise ValueError(f"Dependency cycle between tasks: {', '.join(cyclic[:10])}")
+        
+        self.topo_order = order
+        self.topo_index = {tid: i for i, tid in enumerate(order)}
+        self.project_start = min((t.start_date for t in self.schedule.tasks), default=None)
+    
+    def _add_link(self, pred_id: str, succ_id: str, link_type: str, lag: int):
+        if pred_id not in self.tasks or succ_id not in self.tasks:
+            logger.warning(f"Skipping dependency {pred_id} -> {succ_id}: unknown task")
+            return
+        if link_type not in ("FS", "SS", "FF", "SF"):
+            raise ValueError(f"Unknown dependency type: {link_type}")
+        self.successors[pred_id].append((succ_id, link_type, lag))
+        self.predecessors[succ_id].append((pred_id, link_type, lag))
+    
+    def calculate(self) -> List[str]:
+        """Full CPM run; returns critical task IDs in topological order."""
+        self.build()
+        if not self.tasks:
+            return []
+        
+        for tid in self.topo_order:
+            self._forward(tid)
+        self._backward_all()
+        self._apply(self.topo_order)
+        return self.critical_path()
+    
+    def update_task(self, task_id: str) -> List[str]:
+        """Reschedule after a change to one task's progress or duration."""
+        if task_id not in self.tasks:
+            return self.calculate()
+        
+        old_finish = self.project_finish
+        old_durations: Dict[str, int] = {}
+        changed = self._propagate(
+            [task_id], self.successors, self._forward, lambda tid: self.topo_index[tid],
+            old_durations
+        )
+        
+        self.project_finish = max(self.early_finish.values())
+        if self.project_finish != old_finish:
+            self._backward_all()
+            touched = self.topo_order
+        else:
+            seeds = [
+                tid for tid in changed
+                if self.early_finish[tid] - self.early_start[tid] != old_durations[tid]
+            ]
+            upstream = self._propagate(
+                seeds, self.predecessors, self._backward, lambda tid: -self.topo_index[tid]
+            )
+            touched = set(changed) | set(upstream)
+        
+        self._apply(touched)
+        return self.critical_path()
+    
+    def critical_path(self) -> List[str]:
+        return [tid for tid in self.topo_order if self.tasks[tid].critical_path]
+    
+    def _propagate(self, seeds: List[str], links: Dict[str, List[Tuple[str, str, int]]],
+                   step, priority, old_durations: Optional[Dict[str, int]] = None) -> List[str]:
+        """Re-run ``step`` from seeds, following links only where values moved."""
+        heap = [(priority(tid), tid) for tid in seeds]
+        heapq.heapify(heap)
+        queued = set(seeds)
+        visited = []
+        while heap:
+            _, tid = heapq.heappop(heap)
+            queued.discard(tid)
+            if old_durations is not None and tid not in old_durations:
+                old_durations[tid] = self.early_finish[tid] - self.early_start[tid]
+            visited.append(tid)
+            if step(tid) or tid in seeds:
+                for other, _, _ in links[tid]:
+                    if other not in queued:
+                        queued.add(other)
+                        heapq.heappush(heap, (priority(other), other))
+        return visited
+    
+    def _offset(self, day: date) -> int:
+        return (day - self.project_start).days
+    
+    def _forward(self, tid: str) -> bool:
+        """Compute early dates for one task; True if they changed."""
+        task = self.tasks[tid]
+        duration = task.duration_days
+        data_date = self.schedule.data_date
+        
+        if task.status == TaskStatus.COMPLETED:
+            es, ef = self._offset(task.start_date), self._offset(task.end_date)
+        elif task.status == TaskStatus.IN_PROGRESS:
+            es = self._offset(task.start_date)
+            if data_date:
+                ef = max(es, self._offset(data_date) + task.remaining_duration)
+            else:
+                ef = es + duration
+        else:
+            if tid not in self._earliest:
+                # Open-start tasks keep their planned start
+                self._earliest[tid] = 0 if self.predecessors[tid] else self._offset(task.start_date)
+            es = self._earliest[tid]
+            for pred_id, link_type, lag in self.predecessors[tid]:
+                if link_type == "FS":
+                    es = max(es, self.early_finish[pred_id] + lag)
+                elif link_type == "SS":
+                    es = max(es, self.early_start[pred_id] + lag)
+                elif link_type == "FF":
+                    es = max(es, self.early_finish[pred_id] + lag - duration)
+                else:  # SF
+                    es = max(es, self.early_start[pred_id] + lag - duration)
+            if data_date:
+                es = max(es, self._offset(data_date))
+            ef = es + duration
+        
+        changed = self.early_start.get(tid) != es or self.early_finish.get(tid) != ef
+        self.early_start[tid] = es
+        self.early_finish[tid] = ef
+        return changed
+    
+    def _backward_all(self):
+        self.project_finish = max(self.early_finish.values())
+        for tid in reversed(self.topo_order):
+            self._backward(tid)
+    
+    def _backward(self, tid: str) -> bool:
+        """Compute late dates for one task; True if they changed."""
+        duration = self.early_finish[tid] - self.early_start[tid]
+        lf = self.project_finish
+        for succ_id, link_type, lag in self.successors[tid]:
+            if link_type == "FS":
+                lf = min(lf, self.late_start[succ_id] - lag)
+            elif link_type == "SS":
+                lf = min(lf, self.late_start[succ_id] - lag + duration)
+            elif link_type == "FF":
+                lf = min(lf, self.late_finish[succ_id] - lag)
+            else:  # SF
+                lf = min(lf, self.late_finish[succ_id] - lag + duration)
+        ls = lf - duration
+        
+        changed = self.late_start.get(tid) != ls or self.late_finish.get(tid) != lf
+        self.late_start[tid] = ls
+        self.late_finish[tid] = lf
+        return changed
+    
+    def _apply(self, task_ids):
+        """Write early dates, float and critical flags back to tasks."""
+        for tid in task_ids:
+            task = self.tasks[tid]
+            if task.status == TaskStatus.NOT_STARTED:
+                task.start_date = self.project_start + timedelta(days=self.early_start[tid])
+                task.end_date = self.project_start + timedelta(days=self.early_finish[tid])
+            task.float_days = float(self.late_start[tid] - self.early_start[tid])
+            task.critical_path = task.float_days <= 0
+
+
 class GanttChartGenerator:
     """Generates Gantt chart data for schedule visualization."""
     
@@ -267,29 +711,60 @@ class GanttChartGenerator:
             end_date = max(t.end_date for t in self.schedule.tasks) if self.schedule.tasks else date.today()
         
         timeline = []
-        current_date = start_date
+        index = self.schedule.timeline
+        step = 7 if granularity == "weekly" else 1
         
-        delta = timedelta(days=7 if granularity == "weekly" else 1)
-        
-        while current_date <= end_date:
-            active_tasks = self.schedule.get_tasks_by_date(current_date)
+        for current_date, _, _, active in index.sweep(start_date, end_date, step):
+            active_tasks = [index.tasks[i] for i in sorted(active)]
             
             timeline.append({
                 'date': current_date.isoformat(),
                 'active_tasks': len(active_tasks),
                 'tasks': [t.name for t in active_tasks],
-                'progress': self._calculate_progress_on_date(current_date),
+                'progress': index.progress_on(current_date),
                 'completed_elements': sum(
                     len(t.linked_element_ids) 
                     for t in active_tasks 
                     if t.status == TaskStatus.COMPLETED
                 )
             })
-            
-            current_date += delta
         
         return timeline
     
+    def stream_timeline(self,
+                        start_date: Optional[date] = None,
+                        end_date: Optional[date] = None,
+                        granularity: str = "daily") -> Iterator[Dict[str, Any]]:
+        """Yield one frame per step with only what changed since the last.
+        
+        Elements appear with the first task linked to them and complete the
+        day after the last one ends; anything that appeared and has not
+        completed is in progress. The first frame covers everything up to
+        and including its date, and the last frame always lands on the end
+        date, which defaults to the day after the last task finishes.
+        """
+        index = self.schedule.timeline
+        first, last = index.date_range
+        start_date = start_date or first or date.today()
+        end_date = end_date or (last + timedelta(days=1) if last else date.today())
+        step = 7 if granularity == "weekly" else 1
+        
+        previous: Optional[date] = None
+        for current_date, started, finished, active in index.sweep(
+            start_date, end_date, step, close=True
+        ):
+            appearing, completed = index.element_changes(previous, current_date)
+            yield {
+                'date': current_date.isoformat(),
+                'active_tasks': len(active),
+                'started_tasks': [index.tasks[i].id for i in started],
+                'finished_tasks': [index.tasks[i].id for i in finished],
+                'appearing_elements': appearing,
+                'completed_elements': completed,
+                'progress': index.progress_on(current_date)
+            }
+            previous = current_date
+    
     def _calculate_progress_on_date(self, target_date: date) -> float:
         """Calculate project progress on a specific date."""
         total_duration = sum(t.duration_days for t in self.schedule.tasks)
@@ -333,6 +808,8 @@ class Schedule4DEngine:
     
     def __init__(self):
         self.schedules: Dict[str, Schedule4D] = {}
+        # CPM networks, dropped whenever tasks or links change
+        self.networks: Dict[str, CriticalPathCalculator] = {}
     
     def create_schedule(self, name: str, project_id: str,
                        federated_model_id: str) -> Schedule4D:
@@ -355,12 +832,36 @@ class Schedule4DEngine:
         
         schedule.tasks.append(task)
         schedule.updated_at = datetime.utcnow()
+        schedule.invalidate_timeline()
+        self.networks.pop(schedule_id, None)
         
         # Update schedule dates
-        self._update_schedule_dates(schedule)
+        schedule.start_date = min(schedule.start_date or task.start_date, task.start_date)
+        schedule.end_date = max(schedule.end_date or task.end_date, task.end_date)
         
         return True
     
+    def add_dependency(self, schedule_id: str, dependency: TaskDependency) -> bool:
+        """Add a dependency between two tasks of a schedule."""
+        schedule = self.schedules.get(schedule_id)
+        if not schedule:
+            return False
+        
+        predecessor = schedule.get_task_by_id(dependency.predecessor_id)
+        successor = schedule.get_task_by_id(dependency.successor_id)
+        if not predecessor or not successor:
+            return False
+        
+        schedule.dependencies.append(dependency)
+        if predecessor.id not in successor.predecessor_ids:
+            successor.predecessor_ids.append(predecessor.id)
+        if successor.id not in predecessor.successor_ids:
+            predecessor.successor_ids.append(successor.id)
+        
+        schedule.updated_at = datetime.utcnow()
+        self.networks.pop(schedule_id, None)
+        return True
+    
     def link_element_to_task(self, schedule_id: str, task_id: str,
                             element_id: str) -> bool:
         """Link a BIM element to a construction task."""
@@ -376,11 +877,18 @@ class Schedule4DEngine:
             task.linked_element_ids.append(element_id)
         
         schedule.updated_at = datetime.utcnow()
+        schedule.invalidate_timeline()
         return True
     
     def update_task_progress(self, schedule_id: str, task_id: str,
-                            percent_complete: float) -> bool:
-        """Update task completion percentage."""
+                            percent_complete: float,
+                            data_date: Optional[date] = None) -> bool:
+        """Update task completion percentage.
+        
+        If the critical path has been calculated, only the tasks affected
+        by this change are rescheduled. A data date changes every task's
+        constraints, so it forces a full recalculation.
+        """
         schedule = self.schedules.get(schedule_id)
         if not schedule:
             return False
@@ -398,6 +906,16 @@ class Schedule4DEngine:
             task.status = TaskStatus.IN_PROGRESS
         
         schedule.updated_at = datetime.utcnow()
+        
+        if data_date and data_date != schedule.data_date:
+            schedule.data_date = data_date
+            if schedule_id in self.networks:
+                self.calculate_critical_path(schedule_id)
+        elif schedule_id in self.networks:
+            self.networks[schedule_id].update_task(task_id)
+            self._update_schedule_dates(schedule)
+            schedule.invalidate_timeline()
+        
         return True
     
     def calculate_critical_path(self, schedule_id: str) -> List[str]:
@@ -406,19 +924,13 @@ class Schedule4DEngine:
         if not schedule:
             return []
         
-        # Simplified critical path calculation
-        # In production, use proper CPM algorithm
-        
-        # Reset critical path flags
-        for task in schedule.tasks:
-            task.critical_path = False
-        
-        # Find tasks with zero float (simplified)
-        for task in schedule.tasks:
-            if task.float_days == 0:
-                task.critical_path = True
+        network = CriticalPathCalculator(schedule)
+        critical = network.calculate()
+        self.networks[schedule_id] = network
+        self._update_schedule_dates(schedule)
+        schedule.invalidate_timeline()
         
-        return [t.id for t in schedule.tasks if t.critical_path]
+        return critical
     
     def simulate_construction(self, schedule_id: str,
                              start_date: Optional[date] = None,
@@ -437,9 +949,26 @@ class Schedule4DEngine:
             'critical_path': generator.generate_critical_path_data()
         }
     
+    def stream_construction(self, schedule_id: str,
+                            start_date: Optional[date] = None,
+                            end_date: Optional[date] = None,
+                            granularity: str = "daily") -> Iterator[Dict[str, Any]]:
+        """Stream per-step element state changes for the 4D viewer."""
+        schedule = self.schedules.get(schedule_id)
+        if not schedule:
+            return iter(())
+        
+        return GanttChartGenerator(schedule).stream_timeline(start_date, end_date, granularity)
+    
     def _update_schedule_dates(self, schedule: Schedule4D):
         """Update overall schedule dates based on tasks."""
-        if schedule.tasks:
+        network = self.networks.get(schedule.id)
+        if network and network.project_start:
+            schedule.start_date = network.project_start + timedelta(
+                days=min(network.early_start.values())
+            )
+            schedule.end_date = network.project_start + timedelta(days=network.project_finish)
+        elif schedule.tasks:
             schedule.start_date = min(t.start_date for t in schedule.tasks)
             schedule.end_date = max(t.end_date for t in schedule.tasks)
     
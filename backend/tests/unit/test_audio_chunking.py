@@ -0,0 +1,164 @@
+"""
+Unit Tests for Streaming Audio Chunking
+
+Tests run without Postgres/Redis dependencies.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pydub")
+from pydub import AudioSegment
+from pydub.silence import detect_nonsilent
+
+from app.pipelines.audio_chunking import (
+    AudioChunkStream,
+    PCMBuffer,
+    _DurationSegmenter,
+    _SilenceSegmenter,
+)
+
+
+RATE = 1000
+FRAME = 10
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+def tone(seconds):
+    """Loud square wave."""
+    n = round(seconds * RATE)
+    return np.where(np.arange(n) % 4 < 2, 8000, -8000).astype(np.int16)
+
+
+def silence(seconds):
+    return np.zeros(round(seconds * RATE), dtype=np.int16)
+
+
+async def blocks(samples, block_size):
+    for start in range(0, len(samples), block_size):
+        await asyncio.sleep(0)
+        yield samples[start:start + block_size]
+
+
+def collect(samples, segmenter, block_size=333):
+    async def run():
+        stream = AudioChunkStream(blocks(samples, block_size), segmenter, RATE, "wav", max_pending=2)
+        chunks = [chunk async for chunk in stream]
+        return chunks, stream.total_duration
+    return asyncio.run(run())
+
+
+def silence_segmenter(max_length=10.0):
+    return _SilenceSegmenter(
+        frame=FRAME,
+        min_silence=50,  # 500 ms
+        threshold=-40,
+        keep=100,  # 100 ms
+        min_length=int(0.5 * RATE),
+        max_length=int(max_length * RATE),
+    )
+
+
+def reference_bounds(samples, max_length):
+    """detect_nonsilent ranges padded, filtered and split as chunk_by_silence used to."""
+    audio = AudioSegment(samples.tobytes(), frame_rate=RATE, sample_width=2, channels=1)
+    bounds = []
+    ranges = detect_nonsilent(audio, min_silence_len=500, silence_thresh=-40, seek_step=FRAME)
+    for start, end in ranges:
+        start, end = max(0, start - 100), min(len(audio), end + 100)
+        if end - start < 500:
+            continue
+        if end - start > max_length:
+            bounds.extend((i, min(i + max_length, end)) for i in range(start, end, max_length))
+        else:
+            bounds.append((start, end))
+    return bounds
+
+
+# =============================================================================
+# PCM Buffer
+# =============================================================================
+
+class TestPCMBuffer:
+    """Tests for the absolute-position sample buffer."""
+
+    def test_views_survive_discard_and_growth(self):
+        samples = np.arange(20000, dtype=np.int16)
+        buffer = PCMBuffer(capacity=1000)
+        for start in range(0, len(samples), 700):
+            buffer.append(samples[start:start + 700])
+            buffer.discard_before(buffer.end - 900)
+            assert np.array_equal(buffer.view(buffer.start, buffer.end), samples[buffer.start:buffer.end])
+
+        assert buffer.end == len(samples)
+        assert buffer.end - buffer.start == 900
+
+
+# =============================================================================
+# Chunk Streams
+# =============================================================================
+
+class TestAudioChunkStream:
+    """Tests for segmentation and encoding of streamed PCM."""
+
+    def test_duration_chunks_overlap(self):
+        samples = tone(25)
+        chunks, total = collect(samples, _DurationSegmenter(10 * RATE, 2 * RATE))
+
+        assert total == pytest.approx(25.0)
+        assert [c.index for c in chunks] == [0, 1, 2]
+        assert [(c.start_time, c.end_time) for c in chunks] == [(0, 10), (8, 20), (18, 25)]
+        assert all(c.data[:4] == b"RIFF" for c in chunks)
+
+    def test_silence_chunks_follow_speech(self):
+        samples = np.concatenate([
+            silence(1), tone(2), silence(1.5), tone(0.2), silence(1), tone(3), silence(0.3),
+        ])
+        chunks, _ = collect(samples, silence_segmenter())
+
+        # The 200 ms burst is shorter than min_length and dropped
+        assert [(c.start_time, c.end_time) for c in chunks] == [
+            pytest.approx((0.9, 3.1)),
+            pytest.approx((5.6, 8.8)),
+        ]
+        assert [c.index for c in chunks] == [0, 1]
+
+    def test_long_speech_is_split(self):
+        chunks, _ = collect(np.concatenate([tone(7), silence(1)]), silence_segmenter(max_length=3.0))
+
+        bounds = [(c.start_time, c.end_time) for c in chunks]
+        assert bounds == [pytest.approx(b) for b in [(0, 3), (3, 6), (6, 7.1)]]
+
+    def test_result_does_not_depend_on_block_size(self):
+        samples = np.concatenate([tone(1.5), silence(0.7), tone(2), silence(0.8), tone(0.9)])
+
+        reference = None
+        for block_size in (17, 250, 4000):
+            chunks, _ = collect(samples, silence_segmenter(max_length=1.0), block_size)
+            bounds = [(c.start_time, c.end_time) for c in chunks]
+            assert reference is None or bounds == reference
+            reference = bounds
+
+    def test_matches_detect_nonsilent(self):
+        rng = np.random.default_rng(21)
+        for _ in range(200):
+            # Frame-aligned runs; edge silences are either absent or long
+            # enough to count, where detect_nonsilent keeps short ones
+            parts = [silence(rng.integers(50, 150) / 100)] if rng.random() < 0.5 else []
+            for i in range(int(rng.integers(1, 6))):
+                if i:
+                    parts.append(silence(rng.integers(1, 120) / 100))
+                parts.append(tone(rng.integers(1, 400) / 100))
+            if rng.random() < 0.5:
+                parts.append(silence(rng.integers(50, 150) / 100))
+            samples = np.concatenate(parts)
+            max_length = float(rng.integers(50, 300) / 100)
+
+            chunks, _ = collect(samples, silence_segmenter(max_length), int(rng.integers(50, 900)))
+            bounds = [(round(c.start_time * RATE), round(c.end_time * RATE)) for c in chunks]
+            assert bounds == reference_bounds(samples, int(max_length * RATE))
@@ -0,0 +1,283 @@
+"""
+Unit Tests for Clash Detection
+
+Tests run without Postgres/Redis dependencies.
+"""
+
+import copy
+import random
+
+import pytest
+
+from app.vdc.clash_detection import (
+    AABBTree,
+    BroadPhase,
+    ClashDetectionEngine,
+    ClashStatus,
+    ClashType,
+    ExecutionMode,
+    IncrementalClashDetector,
+    RuleMatcher,
+    SweepAndPruneIndex,
+)
+from app.vdc.federated_models import (
+    BoundingBox,
+    Discipline,
+    ElementType,
+    ModelElement,
+    Point3D,
+)
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+def make_element(element_id, element_type, discipline, origin, size):
+    """Build a model element with an axis-aligned box."""
+    x, y, z = origin
+    dx, dy, dz = size
+    return ModelElement(
+        id=element_id,
+        global_id=element_id,
+        element_type=element_type,
+        name=element_id,
+        description=None,
+        discipline=discipline,
+        bounding_box=BoundingBox(Point3D(x, y, z), Point3D(x + dx, y + dy, z + dz)),
+    )
+
+
+@pytest.fixture
+def random_elements():
+    """A few hundred randomly placed elements across disciplines."""
+    rng = random.Random(42)
+    types = [
+        (ElementType.WALL, Discipline.ARCHITECTURAL),
+        (ElementType.SLAB, Discipline.ARCHITECTURAL),
+        (ElementType.COLUMN, Discipline.STRUCTURAL),
+        (ElementType.BEAM, Discipline.STRUCTURAL),
+        (ElementType.DISTRIBUTION_ELEMENT, Discipline.MEP),
+    ]
+    elements = []
+    for i in range(400):
+        element_type, discipline = rng.choice(types)
+        origin = (rng.uniform(0, 20), rng.uniform(0, 20), rng.uniform(0, 6))
+        size = (rng.uniform(0.1, 2), rng.uniform(0.1, 2), rng.uniform(0.1, 1))
+        elements.append(make_element(f"e{i:04d}", element_type, discipline, origin, size))
+    return elements
+
+
+def clash_keys(result):
+    """Order-independent identity of the clashes in a result."""
+    return sorted(
+        (c.element_a_id, c.element_b_id, c.clash_type.value, round(c.intersection_volume, 9))
+        for c in result.clashes
+    )
+
+
+# =============================================================================
+# Broad Phase
+# =============================================================================
+
+class TestSweepAndPrune:
+    """Tests for the array-backed broad phase."""
+
+    def test_pairs_match_aabb_tree(self, random_elements):
+        engine = ClashDetectionEngine()
+        tree = engine.detect_clashes(random_elements, parallel=False)
+        sweep = engine.detect_clashes(
+            random_elements,
+            parallel=False,
+            broad_phase=BroadPhase.SWEEP_AND_PRUNE,
+            chunk_size=64,
+        )
+
+        assert sweep.total_pairs_checked == tree.total_pairs_checked
+        assert clash_keys(sweep) == clash_keys(tree)
+
+    def test_pairs_are_oriented_by_id(self, random_elements):
+        index = SweepAndPruneIndex(chunk_size=100)
+        index.build(random_elements)
+
+        for idx_a, idx_b in index.iter_candidate_pairs():
+            for a, b in zip(idx_a.tolist(), idx_b.tolist()):
+                assert random_elements[a].id < random_elements[b].id
+
+    def test_empty_and_single_element(self):
+        index = SweepAndPruneIndex()
+        index.build([])
+        assert list(index.iter_candidate_pairs()) == []
+
+        single = make_element("a", ElementType.WALL, Discipline.ARCHITECTURAL, (0, 0, 0), (1, 1, 1))
+        index.build([single])
+        assert list(index.iter_candidate_pairs()) == []
+
+
+# =============================================================================
+# Narrow Phase Execution
+# =============================================================================
+
+class TestExecutionModes:
+    """Tests for sequential, thread and process narrow phases."""
+
+    @pytest.mark.parametrize("broad_phase", [BroadPhase.AABB_TREE, BroadPhase.SWEEP_AND_PRUNE])
+    def test_modes_find_same_clashes(self, random_elements, broad_phase):
+        engine = ClashDetectionEngine()
+        baseline = engine.detect_clashes(random_elements, execution=ExecutionMode.SEQUENTIAL)
+
+        for mode in (ExecutionMode.THREAD, ExecutionMode.PROCESS):
+            result = engine.detect_clashes(
+                random_elements,
+                execution=mode,
+                broad_phase=broad_phase,
+                chunk_size=50,
+                max_workers=2,
+            )
+            assert result.total_pairs_checked == baseline.total_pairs_checked
+            assert clash_keys(result) == clash_keys(baseline)
+
+    def test_process_mode_is_deterministic_and_reports_progress(self, random_elements):
+        engine = ClashDetectionEngine()
+        progress = []
+        engine.set_progress_callback(lambda done, total: progress.append((done, total)))
+
+        first = engine.detect_clashes(
+            random_elements, execution=ExecutionMode.PROCESS, chunk_size=50, max_workers=2
+        )
+        second = engine.detect_clashes(
+            random_elements, execution=ExecutionMode.PROCESS, chunk_size=50, max_workers=2
+        )
+
+        order = [(c.element_a_id, c.element_b_id) for c in first.clashes]
+        assert order == [(c.element_a_id, c.element_b_id) for c in second.clashes]
+        assert progress[-1] == (first.total_pairs_checked, first.total_pairs_checked)
+
+
+# =============================================================================
+# Rule Matcher
+# =============================================================================
+
+class TestRuleMatcher:
+    """Tests for the compiled rule lookup."""
+
+    def test_lookup_agrees_with_rule_applies(self, random_elements):
+        engine = ClashDetectionEngine()
+        matcher = RuleMatcher(engine.rules)
+
+        for elem_a in random_elements[:40]:
+            for elem_b in random_elements[:40]:
+                expected = [r for r in engine.rules if engine._rule_applies(r, elem_a, elem_b)]
+                assert list(matcher.rules_for(elem_a, elem_b)) == expected
+
+    def test_unmatchable_pairs_are_pruned(self, random_elements):
+        rules = copy.deepcopy(ClashDetectionEngine.DEFAULT_RULES)
+        for rule in rules:
+            rule.enabled = rule.name == "MEP-MEP Hard Clash"
+        engine = ClashDetectionEngine(rules=rules)
+
+        for broad_phase in (BroadPhase.AABB_TREE, BroadPhase.SWEEP_AND_PRUNE):
+            result = engine.detect_clashes(
+                random_elements, parallel=False, broad_phase=broad_phase
+            )
+            assert result.total_pairs_checked > 0
+            assert result.clashes
+            for clash in result.clashes:
+                assert clash.element_a.discipline == Discipline.MEP
+                assert clash.element_b.discipline == Discipline.MEP
+
+    def test_disabled_rules_find_nothing(self, random_elements):
+        engine = ClashDetectionEngine()
+        engine.rules = []
+        result = engine.detect_clashes(random_elements, broad_phase=BroadPhase.SWEEP_AND_PRUNE)
+        assert result.total_pairs_checked == 0
+        assert result.clashes == []
+
+
+# =============================================================================
+# Incremental Detection
+# =============================================================================
+
+class TestIncrementalClashDetector:
+    """Tests for delta-based re-detection."""
+
+    def test_matches_full_run_after_changes(self, random_elements):
+        detector = IncrementalClashDetector()
+        engine = ClashDetectionEngine()
+        elements = list(random_elements)
+
+        first = detector.detect_elements("model", elements)
+        assert clash_keys(first) == clash_keys(engine.detect_clashes(elements, parallel=False))
+
+        # Move, delete and add a few elements
+        moved = elements[0]
+        elements[0] = make_element(
+            moved.id, moved.element_type, moved.discipline, (5, 5, 2), (3, 3, 1)
+        )
+        del elements[10:15]
+        elements.append(make_element("new-1", ElementType.WALL, Discipline.ARCHITECTURAL, (4, 4, 1), (4, 0.2, 3)))
+
+        second = detector.detect_elements("model", elements)
+        assert second.total_elements_checked == 2
+        assert clash_keys(second) == clash_keys(engine.detect_clashes(elements, parallel=False))
+
+    def test_status_carried_over_by_element_pair(self, random_elements):
+        detector = IncrementalClashDetector()
+        first = detector.detect_elements("model", random_elements)
+        ignored = first.clashes[0]
+        detector.engine.ignore_clash(ignored, "accepted by design")
+
+        # Nudge one element of the pair so the clash is re-detected
+        elements = list(random_elements)
+        index = next(i for i, e in enumerate(elements) if e.id == ignored.element_a_id)
+        original = elements[index]
+        bbox = original.bounding_box
+        elements[index] = make_element(
+            original.id, original.element_type, original.discipline,
+            (bbox.min_point.x, bbox.min_point.y, bbox.min_point.z + 0.0001),
+            bbox.dimensions,
+        )
+
+        second = detector.detect_elements("model", elements)
+        carried = next(
+            c for c in second.clashes
+            if (c.element_a_id, c.element_b_id) == (ignored.element_a_id, ignored.element_b_id)
+        )
+        assert carried.id == ignored.id
+        assert carried.status == ClashStatus.IGNORED
+
+
+# =============================================================================
+# Clearance
+# =============================================================================
+
+class TestClearance:
+    """Tests for clearance-aware queries and the distance narrow phase."""
+
+    @pytest.fixture
+    def duct_and_wall(self):
+        wall = make_element("wall", ElementType.WALL, Discipline.ARCHITECTURAL, (0, 0, 0), (5, 0.2, 3))
+        near = make_element("duct-near", ElementType.DISTRIBUTION_ELEMENT, Discipline.MEP, (1, 0.23, 1), (2, 0.3, 0.3))
+        far = make_element("duct-far", ElementType.DISTRIBUTION_ELEMENT, Discipline.MEP, (1, 0.28, 2), (2, 0.3, 0.3))
+        return [wall, near, far]
+
+    @pytest.mark.parametrize("broad_phase", [BroadPhase.AABB_TREE, BroadPhase.SWEEP_AND_PRUNE])
+    def test_near_miss_is_reported(self, duct_and_wall, broad_phase):
+        engine = ClashDetectionEngine()
+        result = engine.detect_clashes(duct_and_wall, parallel=False, broad_phase=broad_phase)
+
+        assert len(result.clashes) == 1
+        clash = result.clashes[0]
+        assert clash.clash_type == ClashType.CLEARANCE_VIOLATION
+        assert {clash.element_a_id, clash.element_b_id} == {"wall", "duct-near"}
+        assert clash.clearance_distance == pytest.approx(0.03)
+        assert clash.intersection_volume == 0.0
+
+    def test_distance_bounded_query(self, duct_and_wall):
+        tree = AABBTree()
+        tree.build(duct_and_wall[1:])
+        wall_box = duct_and_wall[0].bounding_box
+
+        assert tree.query_intersections(wall_box) == []
+        assert [e.id for e in tree.query_within_distance(wall_box, 0.05)] == ["duct-near"]
+        assert len(tree.query_within_distance(wall_box, 0.1)) == 2
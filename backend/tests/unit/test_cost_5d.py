@@ -0,0 +1,323 @@
+"""
+Unit Tests for 5D Cost Model
+
+Tests run without Postgres/Redis dependencies.
+"""
+
+import random
+
+import pytest
+
+from app.vdc.cost_5d import (
+    Cost5D,
+    CostCategory,
+    CostHeatmapGenerator,
+    CostItem,
+)
+from app.vdc.federated_models import (
+    BoundingBox,
+    Discipline,
+    DisciplineModel,
+    ElementType,
+    FederatedModel,
+    ModelElement,
+    Point3D,
+)
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+@pytest.fixture
+def federated_model():
+    """Federated model with randomly placed walls."""
+    rng = random.Random(7)
+    elements = []
+    for i in range(150):
+        x, y, z = rng.uniform(0, 20), rng.uniform(0, 10), rng.uniform(0, 6)
+        dx, dy, dz = rng.uniform(0.2, 4), rng.uniform(0.2, 2), rng.uniform(0.2, 2)
+        elements.append(ModelElement(
+            id=f"e{i}",
+            global_id=f"e{i}",
+            element_type=ElementType.WALL,
+            name=f"Wall {i}",
+            description=None,
+            discipline=Discipline.ARCHITECTURAL,
+            bounding_box=BoundingBox(Point3D(x, y, z), Point3D(x + dx, y + dy, z + dz)),
+        ))
+
+    model = FederatedModel(id="fed-1", name="Tower", project_id="p-1")
+    model.add_discipline_model(DisciplineModel(
+        id="arch",
+        name="Architecture",
+        discipline=Discipline.ARCHITECTURAL,
+        version="1",
+        file_path="arch.ifc",
+        file_size=0,
+        elements=elements,
+    ))
+    return model
+
+
+@pytest.fixture
+def cost_model():
+    """Cost model with items spread over the walls."""
+    rng = random.Random(11)
+    model = Cost5D(id="cost-1", name="Budget", project_id="p-1", federated_model_id="fed-1")
+    for i in range(60):
+        model.cost_items.append(CostItem(
+            id=f"item-{i}",
+            name=f"Item {i}",
+            category=CostCategory.MATERIALS,
+            element_ids=[f"e{rng.randrange(150)}" for _ in range(3)],
+            unit_cost=rng.uniform(10, 100),
+            quantity=rng.uniform(1, 20),
+            unit_of_measure="m2",
+            trade=rng.choice(["Drywall", "Concrete"]),
+        ))
+    return model
+
+
+def elements_in_cell(generator, cell):
+    """Reference lookup: every element whose box intersects the cell."""
+    return [
+        element for element in generator.federated_model.get_all_elements()
+        if element.bounding_box.intersects(cell)
+    ]
+
+
+def brute_force_cells(generator, resolution):
+    """Reference heatmap: scan every element for every cell."""
+    bbox = generator.federated_model.overall_bounding_box
+    nx, ny, nz = (max(1, int(d / resolution)) for d in bbox.dimensions)
+    cells = {}
+    for i in range(nx):
+        for j in range(ny):
+            for k in range(nz):
+                low = Point3D(
+                    bbox.min_point.x + i * resolution,
+                    bbox.min_point.y + j * resolution,
+                    bbox.min_point.z + k * resolution,
+                )
+                cell = BoundingBox(low, Point3D(low.x + resolution, low.y + resolution, low.z + resolution))
+                elements = elements_in_cell(generator, cell)
+                if elements:
+                    total = sum(generator.cost_model.get_cost_for_element(e.id) for e in elements)
+                    cells[(i, j, k)] = (pytest.approx(total), len(elements))
+    return cells
+
+
+# =============================================================================
+# Heatmaps
+# =============================================================================
+
+class TestCostHeatmap:
+    """Tests for the binned heatmap generator."""
+
+    @pytest.mark.parametrize("resolution", [1.0, 2.5])
+    def test_grid_matches_cell_scan(self, cost_model, federated_model, resolution):
+        generator = CostHeatmapGenerator(cost_model, federated_model)
+        grid = generator.generate_heatmap_grid(resolution)
+
+        binned = {
+            tuple(cell): (total, count)
+            for cell, total, count in zip(
+                grid.cells.tolist(), grid.total_cost.tolist(), grid.element_count.tolist()
+            )
+        }
+        assert binned == brute_force_cells(generator, resolution)
+
+    def test_points_are_normalized(self, cost_model, federated_model):
+        generator = CostHeatmapGenerator(cost_model, federated_model)
+        points = generator.generate_heatmap(2.0)
+
+        assert points
+        assert max(p.color_value for p in points) == pytest.approx(1.0)
+        assert all(0.0 <= p.color_value <= 1.0 for p in points)
+
+    def test_adaptive_heatmap_refines_busy_cells(self, cost_model, federated_model):
+        generator = CostHeatmapGenerator(cost_model, federated_model)
+        points = generator.generate_adaptive_heatmap(
+            resolution=8.0, max_depth=2, max_elements_per_cell=4
+        )
+
+        sizes = {p.size for p in points}
+        assert sizes <= {8.0, 4.0, 2.0}
+        assert 2.0 in sizes
+        assert all(p.element_count <= 4 for p in points if p.size > 2.0)
+
+    def test_adaptive_cells_count_every_touching_element(self, cost_model, federated_model):
+        generator = CostHeatmapGenerator(cost_model, federated_model)
+        points = generator.generate_adaptive_heatmap(
+            resolution=8.0, max_depth=3, max_elements_per_cell=4
+        )
+
+        for p in points:
+            half = p.size / 2
+            cell = BoundingBox(
+                Point3D(p.position.x - half, p.position.y - half, p.position.z - half),
+                Point3D(p.position.x + half, p.position.y + half, p.position.z + half),
+            )
+            elements = elements_in_cell(generator, cell)
+            assert p.element_count == len(elements)
+            assert p.total_cost == pytest.approx(
+                sum(cost_model.get_cost_for_element(e.id) for e in elements)
+            )
+
+
+# =============================================================================
+# Indexes
+# =============================================================================
+
+class TestCostIndexes:
+    """Tests for the maintained element and item indexes."""
+
+    def test_element_cost_matches_item_scan(self, cost_model):
+        for i in range(150):
+            expected = sum(
+                item.total_cost for item in cost_model.cost_items if f"e{i}" in item.element_ids
+            )
+            assert cost_model.get_cost_for_element(f"e{i}") == pytest.approx(expected)
+
+    def test_add_and_remove_update_indexes(self, cost_model):
+        before = cost_model.get_cost_for_element("e0")
+        item = CostItem(
+            id="extra",
+            name="Extra",
+            category=CostCategory.LABOR,
+            element_ids=["e0", "e0"],
+            unit_cost=10.0,
+            quantity=4.0,
+            unit_of_measure="hr",
+            trade="Painting",
+        )
+
+        cost_model.add_cost_item(item)
+        assert cost_model.get_cost_for_element("e0") == pytest.approx(before + 40.0)
+        assert cost_model.get_items_by_trade("Painting") == [item]
+        assert item in cost_model.get_items_by_category(CostCategory.LABOR)
+
+        assert cost_model.remove_cost_item("extra")
+        assert cost_model.get_cost_for_element("e0") == pytest.approx(before)
+        assert cost_model.get_items_by_trade("Painting") == []
+        assert cost_model.get_cost_item("extra") is None
+
+    def test_direct_list_changes_are_picked_up(self, cost_model):
+        cost_model.get_cost_for_element("e1")
+        cost_model.cost_items.append(CostItem(
+            id="direct",
+            name="Direct",
+            category=CostCategory.MATERIALS,
+            element_ids=["new-element"],
+            unit_cost=5.0,
+            quantity=2.0,
+            unit_of_measure="ea",
+        ))
+        assert cost_model.get_cost_for_element("new-element") == pytest.approx(10.0)
+
+    def test_removed_elements_leave_the_indexes(self):
+        model = Cost5D(id="cost-2", name="Budget", project_id="p-1", federated_model_id="fed-1")
+        model.add_cost_item(CostItem(
+            id="only",
+            name="Only",
+            category=CostCategory.MATERIALS,
+            element_ids=["e1", "e2", "e3"],
+            unit_cost=0.1,
+            quantity=3.0,
+            unit_of_measure="m2",
+        ))
+
+        assert model.remove_cost_item("only")
+        assert model.get_elements_by_cost_range(0, 100) == []
+        assert model.get_element_costs() == {}
+
+    def test_replaced_item_is_picked_up(self, cost_model):
+        cost_model.get_cost_for_element("e7")
+        old = cost_model.cost_items[0]
+        cost_model.cost_items[0] = CostItem(
+            id="swapped",
+            name="Swapped",
+            category=CostCategory.MATERIALS,
+            element_ids=["e7-only"],
+            unit_cost=5.0,
+            quantity=1.0,
+            unit_of_measure="ea",
+        )
+
+        assert cost_model.get_cost_for_element("e7-only") == pytest.approx(5.0)
+        assert cost_model.get_cost_item(old.id) is None
+
+    def test_in_place_item_edits_are_picked_up(self, cost_model):
+        item = cost_model.cost_items[0]
+        element_id = item.element_ids[0]
+        before = cost_model.get_cost_for_element(element_id)
+
+        item.quantity *= 2
+        item.trade = "Roofing"
+        item.element_ids.append("extra-element")
+
+        assert cost_model.get_cost_for_element(element_id) == pytest.approx(before + item.total_cost / 2)
+        assert cost_model.get_cost_for_element("extra-element") == pytest.approx(item.total_cost)
+        assert cost_model.get_items_by_trade("Roofing") == [item]
+        assert cost_model.remove_cost_item(item.id)
+        assert cost_model.get_items_by_trade("Roofing") == []
+
+    def test_item_edits_only_invalidate_owning_models(self, cost_model):
+        other = Cost5D(id="cost-3", name="Other", project_id="p-1", federated_model_id="fed-1")
+        other.add_cost_item(CostItem(
+            id="other-item",
+            name="Other item",
+            category=CostCategory.LABOR,
+            element_ids=["e1"],
+            unit_cost=2.0,
+            quantity=3.0,
+            unit_of_measure="h",
+        ))
+        signature = other._index_signature
+
+        cost_model.cost_items[0].quantity += 1
+        cost_model.cost_items[1].element_ids.append("extra-element")
+
+        assert other._index_signature == signature
+        assert cost_model._index_signature is None
+        other.cost_items[0].quantity = 4.0
+        assert other._index_signature is None
+        assert other.get_cost_for_element("e1") == pytest.approx(8.0)
+
+    def test_federated_element_index(self, federated_model):
+        assert federated_model.get_element("e5").id == "e5"
+        assert len(federated_model.get_all_elements()) == 150
+
+        replacement = DisciplineModel(
+            id="arch-2",
+            name="Architecture v2",
+            discipline=Discipline.ARCHITECTURAL,
+            version="2",
+            file_path="arch.ifc",
+            file_size=0,
+            elements=federated_model.get_all_elements()[:10],
+        )
+        federated_model.add_discipline_model(replacement)
+
+        assert len(federated_model.get_all_elements()) == 10
+        assert federated_model.get_element("e5") is not None
+        assert federated_model.get_element("e50") is None
+
+    def test_federated_index_follows_replaced_elements(self, federated_model):
+        elements = federated_model.discipline_models[Discipline.ARCHITECTURAL].elements
+        assert federated_model.get_element("e0") is elements[0]
+
+        elements[0] = ModelElement(
+            id="swapped",
+            global_id="swapped",
+            element_type=ElementType.WALL,
+            name="Swapped",
+            description=None,
+            discipline=Discipline.ARCHITECTURAL,
+            bounding_box=BoundingBox(Point3D(0, 0, 0), Point3D(1, 1, 1)),
+        )
+
+        assert federated_model.get_element("e0") is None
+        assert federated_model.get_element("swapped") is elements[0]
+        assert federated_model.get_all_elements()[0].id == "swapped"
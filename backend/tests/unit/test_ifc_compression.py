@@ -0,0 +1,197 @@
+"""
+Unit Tests for IFC Geometry Compression
+
+Tests run without Postgres/Redis dependencies.
+"""
+
+import json
+import logging
+import zipfile
+
+import numpy as np
+import pytest
+
+from app.pipelines import ifc_compression
+from app.pipelines.ifc_compression import BatchCompressor, DracoCompressor
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+@pytest.fixture
+def meshes():
+    """Random meshes, a few with normals."""
+    rng = np.random.default_rng(8)
+    meshes = []
+    for i in range(25):
+        count = int(rng.integers(8, 200))
+        mesh = {
+            "id": f"mesh-{i}",
+            "vertices": rng.uniform(-5, 5, size=(count, 3)),
+            "faces": rng.integers(0, count, size=(count * 2, 3)),
+        }
+        if i % 3 == 0:
+            normals = rng.normal(size=(count, 3))
+            mesh["normals"] = normals / np.linalg.norm(normals, axis=1, keepdims=True)
+        meshes.append(mesh)
+    return meshes
+
+
+def decoded(compressor, compressed):
+    return {
+        mesh.mesh_id: compressor.decompress_mesh(mesh)
+        for mesh in compressed
+    }
+
+
+def assert_same_meshes(actual, expected):
+    assert actual.keys() == expected.keys()
+    for mesh_id, arrays in expected.items():
+        assert actual[mesh_id].keys() == arrays.keys()
+        for name, array in arrays.items():
+            np.testing.assert_array_equal(actual[mesh_id][name], array)
+
+
+# =============================================================================
+# Streaming
+# =============================================================================
+
+class TestCompressStream:
+    """Tests for inline and pooled streaming compression."""
+
+    def test_pool_matches_inline(self, meshes):
+        compressor = BatchCompressor()
+        inline = list(compressor.compress_stream(meshes))
+        pooled = list(compressor.compress_stream(meshes, max_workers=2))
+
+        assert [m.mesh_id for m in inline] == [m["id"] for m in meshes]
+        assert_same_meshes(
+            decoded(compressor.compressor, pooled), decoded(compressor.compressor, inline)
+        )
+
+    def test_workers_use_configured_quantization(self, meshes):
+        compressor = BatchCompressor()
+        compressor.compressor = DracoCompressor(quantization_bits=6)
+        pooled = decoded(compressor.compressor, compressor.compress_stream(meshes, max_workers=2))
+
+        assert len(pooled) == len(meshes)
+        assert all(arrays["vertices"].max() <= 63 for arrays in pooled.values())
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_failures_are_recorded(self, meshes, max_workers):
+        broken = dict(meshes[4])
+        del broken["faces"]
+        stats = BatchCompressor()._empty_stats()
+
+        compressed = list(BatchCompressor().compress_stream(
+            meshes[:4] + [broken] + meshes[5:], stats, max_workers=max_workers
+        ))
+
+        assert len(compressed) == len(meshes) - 1
+        assert stats.total_meshes == len(meshes)
+        assert stats.total_compressed == len(meshes) - 1
+        assert len(stats.errors) == 1 and "mesh 4" in stats.errors[0]
+        assert stats.total_compressed_size == sum(m.compressed_size for m in compressed)
+        assert stats.average_ratio == pytest.approx(
+            np.mean([m.compression_ratio for m in compressed])
+        )
+
+    def test_in_flight_meshes_are_bounded(self, meshes):
+        pulled = []
+
+        def source():
+            for mesh in meshes:
+                pulled.append(mesh["id"])
+                yield mesh
+
+        stream = BatchCompressor().compress_stream(source(), max_workers=2, max_in_flight=3)
+        for done, _ in enumerate(stream, 1):
+            assert len(pulled) - done <= 3
+
+    def test_missing_draco_warns_once(self, meshes, caplog, monkeypatch):
+        monkeypatch.setattr(DracoCompressor, "_fallback_warned", False)
+        with caplog.at_level(logging.WARNING, logger="app.pipelines.ifc_compression"):
+            BatchCompressor().compress_batch(meshes)
+            BatchCompressor().compress_batch(meshes)
+
+        warnings = [r for r in caplog.records if "Draco" in r.getMessage()]
+        assert len(warnings) == (0 if ifc_compression.DRACO_AVAILABLE else 1)
+
+
+# =============================================================================
+# Archives
+# =============================================================================
+
+class TestCompressToArchive:
+    """Tests for the streamed archive and its manifest."""
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_archive_and_manifest(self, meshes, tmp_path, max_workers):
+        compressor = BatchCompressor()
+        output = str(tmp_path / "model.zip")
+        progress = []
+
+        stats = compressor.compress_to_archive(
+            iter(meshes), output,
+            progress_callback=lambda done, total: progress.append((done, total)),
+            max_workers=max_workers
+        )
+
+        assert not stats.errors
+        assert stats.total_compressed == len(meshes)
+        assert progress[-1] == (len(meshes), None)
+
+        with zipfile.ZipFile(output) as archive:
+            manifest = json.loads(archive.read("manifest.json"))
+            payloads = [n for n in archive.namelist() if n.startswith("meshes/")]
+            assert sorted(payloads) == sorted(f"meshes/{m['id']}.drc" for m in meshes)
+            assert all(archive.getinfo(n).compress_type == zipfile.ZIP_STORED for n in payloads)
+
+            entries = {e["mesh_id"]: e for e in manifest["meshes"]}
+            assert entries.keys() == {m["id"] for m in meshes}
+            assert manifest["total_size"] == stats.total_compressed_size
+            for name in payloads:
+                mesh_id = name[len("meshes/"):-len(".drc")]
+                assert archive.getinfo(name).file_size == entries[mesh_id]["compressed_size"]
+            assert entries["mesh-0"]["has_normals"] and not entries["mesh-1"]["has_normals"]
+
+    def test_archive_matches_batch(self, meshes, tmp_path):
+        compressor = BatchCompressor()
+        output = str(tmp_path / "model.zip")
+        compressor.compress_to_archive(meshes, output, max_workers=2)
+
+        compressed, _ = compressor.compress_batch(meshes)
+        with zipfile.ZipFile(output) as archive:
+            for mesh in compressed:
+                mesh.compressed_data = archive.read(f"meshes/{mesh.mesh_id}.drc")
+        expected, _ = compressor.compress_batch(meshes)
+
+        assert_same_meshes(
+            decoded(compressor.compressor, compressed), decoded(compressor.compressor, expected)
+        )
+
+    def test_failed_source_is_reported(self, meshes, tmp_path):
+        def failing():
+            yield from meshes[:3]
+            raise RuntimeError("tessellation failed")
+
+        stats = BatchCompressor().compress_to_archive(failing(), str(tmp_path / "model.zip"))
+
+        assert stats.total_compressed == 3
+        assert stats.errors == ["tessellation failed"]
+        assert list(tmp_path.iterdir()) == []
+
+    def test_failed_source_keeps_previous_archive(self, meshes, tmp_path):
+        output = str(tmp_path / "model.zip")
+        BatchCompressor().compress_to_archive(meshes[:2], output)
+
+        def failing():
+            yield from meshes
+            raise RuntimeError("tessellation failed")
+
+        BatchCompressor().compress_to_archive(failing(), output, max_workers=2)
+
+        with zipfile.ZipFile(output) as archive:
+            assert len(json.loads(archive.read("manifest.json"))["meshes"]) == 2
+        assert [p.name for p in tmp_path.iterdir()] == ["model.zip"]
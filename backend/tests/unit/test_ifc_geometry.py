@@ -0,0 +1,260 @@
+"""
+Unit Tests for IFC Geometry Extraction
+
+Tests run without Postgres/Redis dependencies.
+"""
+
+import asyncio
+import json
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+pytest.importorskip("ifcopenshell")
+import ifcopenshell.api.context
+import ifcopenshell.api.geometry
+import ifcopenshell.api.root
+import ifcopenshell.api.unit
+import ifcopenshell.geom
+
+from app.pipelines.ifc_geometry import GeometryCache, IFCGeometryExtractor
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+@pytest.fixture
+def ifc_path(tmp_path):
+    """Walls of varying length with extruded body representations."""
+    f = ifcopenshell.file(schema="IFC4")
+    ifcopenshell.api.root.create_entity(f, ifc_class="IfcProject", name="Tower")
+    ifcopenshell.api.unit.assign_unit(f)
+    model = ifcopenshell.api.context.add_context(f, context_type="Model")
+    body = ifcopenshell.api.context.add_context(
+        f, context_type="Model", context_identifier="Body", target_view="MODEL_VIEW", parent=model
+    )
+
+    for i in range(24):
+        wall = ifcopenshell.api.root.create_entity(f, ifc_class="IfcWall", name=f"Wall {i}")
+        matrix = np.eye(4)
+        matrix[:3, 3] = (i * 2.0, i % 3, 0.0)
+        ifcopenshell.api.geometry.edit_object_placement(f, product=wall, matrix=matrix)
+        representation = ifcopenshell.api.geometry.add_wall_representation(
+            f, context=body, length=1.0 + i * 0.25, height=3.0, thickness=0.2
+        )
+        ifcopenshell.api.geometry.assign_representation(f, product=wall, representation=representation)
+
+    # Elements without a representation are skipped
+    ifcopenshell.api.root.create_entity(f, ifc_class="IfcWall", name="Placeholder")
+
+    path = str(tmp_path / "walls.ifc")
+    f.write(path)
+    return path
+
+
+@pytest.fixture
+def extractor(ifc_path):
+    extractor = IFCGeometryExtractor(ifc_path)
+    assert extractor.open_file()
+    settings = ifcopenshell.geom.settings()
+    settings.set(settings.USE_WORLD_COORDS, True)
+    extractor._settings = settings
+    return extractor
+
+
+def by_guid(geometries):
+    return {g.global_id: g for g in geometries}
+
+
+def assert_same_geometry(actual, expected):
+    assert actual.keys() == expected.keys()
+    for guid, geom in expected.items():
+        other = actual[guid]
+        assert other.element_id == geom.element_id
+        assert other.name == geom.name
+        np.testing.assert_allclose(other.vertices, geom.vertices)
+        np.testing.assert_array_equal(other.faces, geom.faces)
+        np.testing.assert_allclose(other.transformation, geom.transformation)
+        assert other.bounds == pytest.approx(geom.bounds)
+
+
+# =============================================================================
+# Extraction
+# =============================================================================
+
+class TestGeometryExtraction:
+    """Tests for the single-pass iterator against per-element extraction."""
+
+    @pytest.mark.parametrize("num_threads", [1, 4])
+    def test_single_pass_matches_per_element(self, extractor, num_threads):
+        per_element = asyncio.run(extractor.extract_all_geometry(single_pass=False))
+        single_pass = asyncio.run(extractor.extract_all_geometry(num_threads=num_threads))
+
+        assert per_element.success and single_pass.success
+        assert len(per_element.geometries) == 24
+        assert_same_geometry(by_guid(single_pass.geometries), by_guid(per_element.geometries))
+        assert single_pass.element_count == per_element.element_count == 25
+        assert single_pass.total_vertices == per_element.total_vertices
+        assert single_pass.total_faces == per_element.total_faces
+
+    def test_iter_geometry_skips_elements_without_representation(self, extractor):
+        walls = extractor._get_elements(["IfcWall"])
+        geometries = list(extractor.iter_geometry(walls, num_threads=2))
+
+        assert len(geometries) == 24
+        assert "Placeholder" not in {g.name for g in geometries}
+        assert list(extractor.iter_geometry([w for w in walls if w.Name == "Placeholder"])) == []
+
+    def test_stream_matches_iterator(self, extractor):
+        async def collect(**kwargs):
+            return [g async for g in extractor.stream_geometry(["IfcWall"], **kwargs)]
+
+        streamed = asyncio.run(collect(num_threads=2, max_pending=1))
+        iterated = list(extractor.iter_geometry(extractor._get_elements(["IfcWall"]), num_threads=2))
+
+        assert_same_geometry(by_guid(streamed), by_guid(iterated))
+
+    def test_stream_stops_when_consumer_leaves(self, extractor):
+        async def first_two():
+            seen = []
+            async for geom in extractor.stream_geometry(num_threads=2, max_pending=1):
+                seen.append(geom)
+                if len(seen) == 2:
+                    break
+            return seen
+
+        assert len(asyncio.run(asyncio.wait_for(first_two(), timeout=30))) == 2
+
+    def test_single_pass_reports_failed_elements(self, extractor, monkeypatch):
+        convert = extractor._shape_to_geometry
+
+        def failing(shape, element):
+            if element.Name == "Wall 3":
+                raise ValueError("degenerate mesh")
+            return convert(shape, element)
+
+        monkeypatch.setattr(extractor, "_shape_to_geometry", failing)
+        result = asyncio.run(extractor.extract_all_geometry(num_threads=2))
+
+        assert result.success and len(result.geometries) == 23
+        assert len(result.warnings) == 1 and "degenerate mesh" in result.warnings[0]
+
+    def test_progress_reaches_total(self, extractor):
+        progress = []
+        asyncio.run(extractor.extract_all_geometry(
+            progress_callback=lambda done, total: progress.append((done, total))
+        ))
+
+        assert progress[-1] == (25, 25)
+        assert all(total == 25 for _, total in progress)
+
+
+# =============================================================================
+# Geometry Cache
+# =============================================================================
+
+class TestGeometryCache:
+    """Tests for the memory-mapped binary cache."""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return GeometryCache(str(tmp_path / "cache"))
+
+    @pytest.fixture
+    def extracted(self, extractor):
+        return asyncio.run(extractor.extract_all_geometry())
+
+    def test_file_layout(self, cache, extracted, ifc_path):
+        key = cache.get_cache_key(ifc_path, {"types": None})
+        assert cache.cache_geometry(key, extracted)
+
+        with open(cache._cache_path(key), "rb") as f:
+            raw = f.read()
+        assert raw[:8] == GeometryCache.MAGIC
+        header_len = int(np.frombuffer(raw[8:16], dtype=np.uint64)[0])
+        header = json.loads(raw[16:16 + header_len])
+
+        assert header["data_start"] % GeometryCache.ALIGNMENT == 0
+        assert header["data_start"] >= 16 + header_len
+        assert header["elements"]["global_id"] == [g.global_id for g in extracted.geometries]
+        for offset, _ in header["sections"].values():
+            assert offset % GeometryCache.ALIGNMENT == 0
+
+        offset, nbytes = header["sections"]["table"]
+        start = header["data_start"] + offset
+        table = np.frombuffer(raw[start:start + nbytes], dtype=np.int64).reshape(-1, 8)
+        vertex_counts = [len(g.vertices) for g in extracted.geometries]
+        assert table[:, 1].tolist() == vertex_counts
+        assert table[:, 0].tolist() == (np.cumsum(vertex_counts) - vertex_counts).tolist()
+        assert table[:, 3].tolist() == [len(g.faces) for g in extracted.geometries]
+
+    def test_round_trip_returns_read_only_views(self, cache, extracted, ifc_path):
+        key = cache.get_cache_key(ifc_path, {})
+        cache.cache_geometry(key, extracted)
+
+        cached = cache.get_cached_geometry(key)
+        assert cached.success
+        assert cached.element_count == extracted.element_count
+        assert cached.total_vertices == extracted.total_vertices
+        assert cached.total_faces == extracted.total_faces
+
+        for original, loaded in zip(extracted.geometries, cached.geometries):
+            assert original.vertices.dtype == np.float64
+            assert loaded.vertices.dtype == np.float32
+            assert loaded.faces.dtype == np.uint32
+            np.testing.assert_allclose(loaded.vertices, original.vertices, rtol=1e-6)
+            np.testing.assert_array_equal(loaded.faces, original.faces)
+            np.testing.assert_array_equal(loaded.transformation, original.transformation)
+            assert (loaded.global_id, loaded.name, loaded.bounds) == (
+                original.global_id, original.name, original.bounds
+            )
+            assert not loaded.vertices.flags.writeable
+            with pytest.raises(ValueError):
+                loaded.vertices[0] = 1.0
+
+    def test_key_follows_file_contents(self, cache, ifc_path, tmp_path):
+        copy = str(tmp_path / "copy.ifc")
+        shutil.copy2(ifc_path, copy)
+        key = cache.get_cache_key(ifc_path, {"lod": 0})
+
+        assert cache.get_cache_key(copy, {"lod": 0}) == key
+        assert cache.get_cache_key(ifc_path, {"lod": 1}) != key
+
+        stat = os.stat(copy)
+        with open(copy, "a") as f:
+            f.write("/* edited */\n")
+        os.utime(copy, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert cache.get_cache_key(copy, {"lod": 0}) != key
+
+    def test_rewrite_replaces_open_entry(self, cache, extracted, ifc_path):
+        key = cache.get_cache_key(ifc_path, {})
+        cache.cache_geometry(key, extracted)
+        assert len(cache.get_cached_geometry(key).geometries) == 24
+
+        extracted.geometries = extracted.geometries[:3]
+        cache.cache_geometry(key, extracted)
+        assert len(cache.get_cached_geometry(key).geometries) == 3
+        assert cache.get_cached_geometry("missing") is None
+
+    def test_get_cached_element(self, cache, extracted, ifc_path):
+        key = cache.get_cache_key(ifc_path, {})
+        cache.cache_geometry(key, extracted)
+        target = extracted.geometries[7]
+
+        element = GeometryCache(cache.cache_dir).get_cached_element(key, target.global_id)
+        assert element.global_id == target.global_id
+        assert element.element_type == "IfcWall"
+        np.testing.assert_allclose(element.vertices, target.vertices, rtol=1e-6)
+        np.testing.assert_array_equal(element.faces, target.faces)
+
+        assert cache.get_cached_element(key, "not-a-guid") is None
+        assert cache.get_cached_element("missing", target.global_id) is None
+
+    def test_foreign_file_is_rejected(self, cache):
+        with open(cache._cache_path("bogus"), "wb") as f:
+            f.write(b"NOTGEOM!" + b"\0" * 64)
+
+        assert cache.get_cached_geometry("bogus") is None
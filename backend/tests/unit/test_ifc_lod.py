@@ -0,0 +1,234 @@
+"""
+Unit Tests for IFC Level of Detail Generation
+
+Tests run without Postgres/Redis dependencies.
+"""
+
+import os
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from app.pipelines import ifc_lod
+from app.pipelines.ifc_lod import LODGenerator, LODLevel, _generate_lod_chunk
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+def uv_sphere(rings=16, segments=32, radius=2.0):
+    """Closed, outward-facing triangulated sphere."""
+    vertices = [(0.0, 0.0, radius)]
+    for i in range(1, rings):
+        theta = np.pi * i / rings
+        for j in range(segments):
+            phi = 2 * np.pi * j / segments
+            vertices.append((
+                radius * np.sin(theta) * np.cos(phi),
+                radius * np.sin(theta) * np.sin(phi),
+                radius * np.cos(theta),
+            ))
+    vertices.append((0.0, 0.0, -radius))
+    south = len(vertices) - 1
+
+    def ring(i, j):
+        return 1 + (i - 1) * segments + j % segments
+
+    faces = [(0, ring(1, j), ring(1, j + 1)) for j in range(segments)]
+    for i in range(1, rings - 1):
+        for j in range(segments):
+            a, b = ring(i, j), ring(i, j + 1)
+            c, d = ring(i + 1, j), ring(i + 1, j + 1)
+            faces += [(a, c, b), (b, c, d)]
+    faces += [(south, ring(rings - 1, j + 1), ring(rings - 1, j)) for j in range(segments)]
+    return np.array(vertices), np.array(faces)
+
+
+def crash_worker_chunk(meshes, target_lods, generator=None):
+    """LOD chunk task that kills pool workers; the inline fallback runs normally."""
+    if generator is None:
+        os._exit(1)
+    return _generate_lod_chunk(meshes, target_lods, generator)
+
+
+def edge_uses(faces):
+    return Counter(
+        tuple(sorted(edge))
+        for a, b, c in faces.tolist()
+        for edge in ((a, b), (b, c), (a, c))
+    )
+
+
+def face_normals(vertices, faces):
+    tri = vertices[faces]
+    return np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0]), tri.mean(axis=1)
+
+
+def reference_clustering(vertices, faces, target_ratio):
+    """The original per-vertex loop, kept as a reference."""
+    grid_size = max(2, int((1 / target_ratio) ** (1 / 3)))
+    min_bounds = vertices.min(axis=0)
+    ranges = vertices.max(axis=0) - min_bounds
+    ranges[ranges == 0] = 1
+    grid_coords = np.clip(
+        ((vertices - min_bounds) / ranges * (grid_size - 1)).astype(int), 0, grid_size - 1
+    )
+
+    cell_map, new_vertices = {}, []
+    for coord in grid_coords:
+        key = tuple(coord)
+        if key not in cell_map:
+            cell_map[key] = len(new_vertices)
+            new_vertices.append(vertices[(grid_coords == coord).all(axis=1)].mean(axis=0))
+
+    new_faces = []
+    for face in faces:
+        new_face = [cell_map[tuple(grid_coords[v])] for v in face]
+        if len(set(new_face)) == 3:
+            new_faces.append(new_face)
+    return np.array(new_vertices), np.array(new_faces)
+
+
+# =============================================================================
+# Simplification
+# =============================================================================
+
+class TestSimplification:
+    """Tests for quadric decimation and vertex clustering."""
+
+    @pytest.mark.parametrize("target", [400, 100, 40])
+    def test_quadric_decimation_keeps_closed_manifold(self, target):
+        vertices, faces = uv_sphere()
+        new_vertices, new_faces = LODGenerator()._quadric_decimation(vertices, faces, target)
+
+        assert len(new_faces) == target
+        assert new_faces.min() >= 0 and new_faces.max() < len(new_vertices)
+        assert len(np.unique(new_faces)) == len(new_vertices)
+
+        # Closed 2-manifold of genus 0: every edge has two faces, V - E + F = 2
+        uses = edge_uses(new_faces)
+        assert set(uses.values()) == {2}
+        assert len(new_vertices) - len(uses) + len(new_faces) == 2
+
+        normals, centers = face_normals(new_vertices, new_faces)
+        assert ((normals * centers).sum(axis=1) > 0).all()
+
+        extent = vertices.max(axis=0) - vertices.min(axis=0)
+        assert (new_vertices >= vertices.min(axis=0) - 0.05 * extent).all()
+        assert (new_vertices <= vertices.max(axis=0) + 0.05 * extent).all()
+
+    def test_decimate_mesh_reports_method_and_ratio(self):
+        vertices, faces = uv_sphere()
+        generator = LODGenerator()
+
+        lod = generator._decimate_mesh(vertices, faces, None, None, 0.25, LODLevel.LOD_300)
+        assert lod.generation_method == "quadric_decimation"
+        assert lod.face_count == 240
+        assert lod.simplification_ratio == pytest.approx(0.25)
+
+        generator.QUADRIC_MAX_FACES = 100
+        lod = generator._decimate_mesh(vertices, faces, None, None, 0.25, LODLevel.LOD_300)
+        assert lod.generation_method == "vertex_clustering"
+
+    @pytest.mark.parametrize("target_ratio", [0.5, 0.05, 0.002])
+    def test_vertex_clustering_matches_reference(self, target_ratio):
+        rng = np.random.default_rng(3)
+        vertices, faces = uv_sphere(rings=24, segments=40)
+        vertices = vertices + rng.normal(scale=0.01, size=vertices.shape)
+
+        expected_vertices, expected_faces = reference_clustering(vertices, faces, target_ratio)
+        new_vertices, new_faces = LODGenerator()._vertex_clustering(vertices, faces, target_ratio)
+
+        np.testing.assert_allclose(new_vertices, expected_vertices)
+        np.testing.assert_array_equal(new_faces.reshape(-1, 3), expected_faces.reshape(-1, 3))
+
+    def test_generate_lod_representations_levels(self):
+        vertices, faces = uv_sphere()
+        representations = LODGenerator().generate_lod_representations(
+            vertices, faces, target_lods=[LODLevel.LOD_300, LODLevel.LOD_350, LODLevel.LOD_500]
+        )
+
+        assert representations[LODLevel.LOD_300].face_count == 240
+        assert representations[LODLevel.LOD_350].face_count == 480
+        assert representations[LODLevel.LOD_500].face_count == len(faces)
+
+
+# =============================================================================
+# Model LODs
+# =============================================================================
+
+class TestModelLODs:
+    """Tests for pooled LOD generation over an IFC model."""
+
+    @pytest.fixture
+    def lod_generator(self, tmp_path, monkeypatch):
+        pytest.importorskip("ifcopenshell")
+        import ifcopenshell.api.context
+        import ifcopenshell.api.geometry
+        import ifcopenshell.api.root
+        import ifcopenshell.api.unit
+        import ifcopenshell.geom
+
+        from app.pipelines.ifc_geometry import IFCGeometryExtractor
+        from app.pipelines.ifc_lod import IFCLODGenerator
+
+        f = ifcopenshell.file(schema="IFC4")
+        ifcopenshell.api.root.create_entity(f, ifc_class="IfcProject", name="Tower")
+        ifcopenshell.api.unit.assign_unit(f)
+        model = ifcopenshell.api.context.add_context(f, context_type="Model")
+        body = ifcopenshell.api.context.add_context(
+            f, context_type="Model", context_identifier="Body", target_view="MODEL_VIEW", parent=model
+        )
+        for i in range(30):
+            wall = ifcopenshell.api.root.create_entity(f, ifc_class="IfcWall", name=f"Wall {i}")
+            matrix = np.eye(4)
+            matrix[:3, 3] = (i * 2.0, 0.0, 0.0)
+            ifcopenshell.api.geometry.edit_object_placement(f, product=wall, matrix=matrix)
+            representation = ifcopenshell.api.geometry.add_wall_representation(
+                f, context=body, length=1.0 + i * 0.1, height=3.0, thickness=0.2
+            )
+            ifcopenshell.api.geometry.assign_representation(f, product=wall, representation=representation)
+        path = str(tmp_path / "walls.ifc")
+        f.write(path)
+
+        # Only world coordinates matter here; not every IfcOpenShell
+        # release accepts the extractor's full settings list
+        def world_coords(self, **kwargs):
+            self._settings = ifcopenshell.geom.settings()
+            self._settings.set(self._settings.USE_WORLD_COORDS, True)
+
+        monkeypatch.setattr(IFCGeometryExtractor, "initialize_settings", world_coords)
+        return IFCLODGenerator(path)
+
+    def test_pool_matches_inline(self, lod_generator):
+        target_lods = [LODLevel.LOD_100, LODLevel.LOD_300, LODLevel.LOD_500]
+        inline = lod_generator.generate_model_lods(target_lods=target_lods, max_workers=1)
+        progress = []
+        pooled = lod_generator.generate_model_lods(
+            target_lods=target_lods, max_workers=2, chunk_size=4,
+            progress_callback=lambda done, total: progress.append(done)
+        )
+
+        assert len(inline) == 30
+        assert [e.to_dict() for e in pooled] == [e.to_dict() for e in inline]
+        for a, b in zip(pooled, inline):
+            for level in target_lods:
+                np.testing.assert_allclose(a.get_lod(level).vertices, b.get_lod(level).vertices)
+                np.testing.assert_array_equal(a.get_lod(level).faces, b.get_lod(level).faces)
+        assert progress[-1] == 30
+        assert progress == sorted(progress)
+
+    def test_broken_pool_falls_back_inline(self, lod_generator, monkeypatch):
+        target_lods = [LODLevel.LOD_100, LODLevel.LOD_300]
+        inline = lod_generator.generate_model_lods(target_lods=target_lods, max_workers=1)
+        monkeypatch.setattr(ifc_lod, "_generate_lod_chunk", crash_worker_chunk)
+        progress = []
+        pooled = lod_generator.generate_model_lods(
+            target_lods=target_lods, max_workers=2, chunk_size=4,
+            progress_callback=lambda done, total: progress.append(done)
+        )
+
+        assert [e.to_dict() for e in pooled] == [e.to_dict() for e in inline]
+        assert progress[-1] == 30
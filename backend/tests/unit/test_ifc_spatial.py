@@ -0,0 +1,164 @@
+"""
+Unit Tests for IFC Spatial Index
+
+Tests run without Postgres/Redis dependencies.
+"""
+
+import random
+
+import pytest
+
+pytest.importorskip("rtree")
+
+from app.pipelines.ifc_spatial import BoundingBox, RTreeSpatialIndex, SpatialObject
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+def make_object(global_id, origin, size, element_type="IfcWall"):
+    x, y, z = origin
+    dx, dy, dz = size
+    return SpatialObject(
+        id=global_id,
+        global_id=global_id,
+        element_type=element_type,
+        name=global_id,
+        bounding_box=BoundingBox(x, y, z, x + dx, y + dy, z + dz),
+    )
+
+
+@pytest.fixture
+def objects():
+    rng = random.Random(8)
+    types = ["IfcWall", "IfcBeam", "IfcDuctSegment", "IfcPipeSegment"]
+    return [
+        make_object(
+            f"g{i:04d}",
+            (rng.uniform(0, 50), rng.uniform(0, 50), rng.uniform(0, 10)),
+            (rng.uniform(0.2, 4), rng.uniform(0.2, 4), rng.uniform(0.2, 2)),
+            rng.choice(types),
+        )
+        for i in range(500)
+    ]
+
+
+def scan(objects, bbox):
+    return sorted(o.global_id for o in objects if o.bounding_box.intersects(bbox))
+
+
+# =============================================================================
+# Index Maintenance
+# =============================================================================
+
+class TestRTreeSpatialIndex:
+    """Tests for bulk loading, updates and persistence."""
+
+    def test_bulk_load_matches_scan(self, objects):
+        spatial_index = RTreeSpatialIndex()
+        assert spatial_index.insert_many(objects) == len(objects)
+
+        window = BoundingBox(10, 10, 0, 20, 25, 5)
+        assert sorted(spatial_index.intersects(window, objects_only=False)) == scan(objects, window)
+
+    def test_remove_and_update_change_query_results(self, objects):
+        spatial_index = RTreeSpatialIndex()
+        spatial_index.insert_many(objects)
+        target = objects[0]
+
+        assert spatial_index.remove(target.global_id)
+        assert target.global_id not in spatial_index.intersects(target.bounding_box, objects_only=False)
+        assert not spatial_index.remove(target.global_id)
+
+        moved = make_object(objects[1].global_id, (200, 200, 200), (1, 1, 1))
+        assert spatial_index.update(moved)
+        assert objects[1].global_id not in spatial_index.intersects(objects[1].bounding_box, objects_only=False)
+        assert spatial_index.window_query((199, 199, 199), (202, 202, 202)) == [moved]
+        assert len(spatial_index) == len(objects) - 1
+
+    def test_disk_index_reopens_with_changes(self, objects, tmp_path):
+        path = str(tmp_path / "model")
+        spatial_index = RTreeSpatialIndex(path=path)
+        spatial_index.insert_many(objects)
+        spatial_index.remove(objects[0].global_id)
+        spatial_index.insert(make_object("added", (300, 300, 300), (1, 1, 1)))
+        spatial_index.signature = "v1"
+        spatial_index.close()
+
+        reopened = RTreeSpatialIndex.open(path)
+        assert reopened.signature == "v1"
+        assert len(reopened) == len(objects)
+        assert reopened.get(objects[0].global_id) is None
+
+        window = BoundingBox(0, 0, 0, 400, 400, 400)
+        expected = scan(objects[1:], window) + ["added"]
+        assert sorted(reopened.intersects(window, objects_only=False)) == sorted(expected)
+
+    def test_open_missing_index(self, tmp_path):
+        assert RTreeSpatialIndex.open(str(tmp_path / "missing")) is None
+
+
+# =============================================================================
+# Clash Join
+# =============================================================================
+
+class TestClashPairs:
+    """Tests for the sweep self-join."""
+
+    def brute_force(self, objects, tolerance, types_a=None, types_b=None):
+        pad = tolerance / 2
+        pairs = set()
+
+        def matches(x, y):
+            return (not types_a or x in types_a) and (not types_b or y in types_b)
+
+        for i, a in enumerate(objects):
+            for b in objects[i + 1:]:
+                grown = BoundingBox(*(v - pad for v in a.bounding_box.to_tuple()[:3]),
+                                    *(v + pad for v in a.bounding_box.to_tuple()[3:]))
+                other = BoundingBox(*(v - pad for v in b.bounding_box.to_tuple()[:3]),
+                                    *(v + pad for v in b.bounding_box.to_tuple()[3:]))
+                if not grown.intersects(other):
+                    continue
+                if matches(a.element_type, b.element_type) or matches(b.element_type, a.element_type):
+                    pairs.add((a.global_id, b.global_id))
+        return pairs
+
+    @pytest.mark.parametrize("tolerance, types_a, types_b", [
+        (0.0, None, None),
+        (0.5, None, None),
+        (0.2, ["IfcDuctSegment"], ["IfcWall", "IfcBeam"]),
+        (0.1, ["IfcPipeSegment"], None),
+    ])
+    def test_pairs_match_brute_force(self, objects, tolerance, types_a, types_b):
+        spatial_index = RTreeSpatialIndex()
+        spatial_index.insert_many(objects)
+
+        result = spatial_index.clash_pairs(tolerance, types_a=types_a, types_b=types_b, chunk_pairs=100)
+
+        assert (result.first < result.second).all()
+        found = [(a, b) for a, b, _ in result.pairs()]
+        assert len(found) == len(set(found))
+        assert set(found) == self.brute_force(objects, tolerance, types_a, types_b)
+
+    def test_find_clashes_filters_by_overlap_volume(self, objects):
+        spatial_index = RTreeSpatialIndex()
+        spatial_index.insert_many(objects)
+
+        clashes = spatial_index.find_clashes(tolerance=0.5)
+
+        assert clashes
+        for a, b, overlap in clashes:
+            assert overlap > 0.5
+            assert overlap == pytest.approx(spatial_index._calculate_overlap(a.bounding_box, b.bounding_box))
+
+    def test_snapshot_follows_updates(self, objects):
+        spatial_index = RTreeSpatialIndex()
+        spatial_index.insert_many(objects[:2])
+        spatial_index.update(make_object(objects[1].global_id, (0, 0, 0), (1, 1, 1)))
+        spatial_index.update(make_object(objects[0].global_id, (0.5, 0.5, 0.5), (1, 1, 1)))
+
+        assert [(a, b) for a, b, _ in spatial_index.clash_pairs().pairs()] == [
+            (objects[0].global_id, objects[1].global_id)
+        ]
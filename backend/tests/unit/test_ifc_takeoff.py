@@ -0,0 +1,263 @@
+"""
+Unit Tests for IFC Quantity Takeoff
+
+Tests run without Postgres/Redis dependencies.
+"""
+
+import csv
+import os
+import random
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+pytest.importorskip("ifcopenshell")
+import ifcopenshell.guid
+
+from app.pipelines import ifc_properties, ifc_takeoff
+from app.pipelines.ifc_columnar import ColumnarFormat
+from app.pipelines.ifc_properties import IFCPropertyExtractor, RelationshipIndex, iter_element_chunks
+from app.pipelines.ifc_takeoff import QuantityTakeoffEngine
+
+
+COMMON_PSETS = {
+    "IfcWall": "Pset_WallCommon",
+    "IfcSlab": "Pset_SlabCommon",
+    "IfcDoor": "Pset_DoorCommon",
+    "IfcWindow": "Pset_WindowCommon",
+}
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+def crash_worker(ifc_file_path):
+    """Initializer that kills the worker process, breaking the pool."""
+    os._exit(1)
+
+
+@pytest.fixture
+def ifc_path(tmp_path):
+    """Small model with shared psets, qsets, materials and classification."""
+    rng = random.Random(3)
+    f = ifcopenshell.file(schema="IFC4")
+    new = ifcopenshell.guid.new
+
+    elements = []
+    for i in range(120):
+        ifc_class = rng.choice(list(COMMON_PSETS))
+        elements.append(f.create_entity(ifc_class, GlobalId=new(), Name=f"{ifc_class} {i}"))
+
+    shared = f.createIfcPropertySet(new(), None, "Pset_Shared", None, [
+        f.createIfcPropertySingleValue("IsExternal", None, f.createIfcBoolean(True), None)
+    ])
+    f.createIfcRelDefinesByProperties(new(), None, None, None, elements[::2], shared)
+
+    for element in elements:
+        properties = [
+            f.createIfcPropertySingleValue(name, None, f.createIfcLengthMeasure(rng.uniform(0.1, 5)), None)
+            for name in ("Width", "Length", "Height", "Thickness")
+        ]
+        pset = f.createIfcPropertySet(new(), None, COMMON_PSETS[element.is_a()], None, properties)
+        f.createIfcRelDefinesByProperties(new(), None, None, None, [element], pset)
+
+        qset = f.createIfcElementQuantity(new(), None, "Qto_BaseQuantities", None, None, [
+            f.createIfcQuantityLength("Length", None, None, rng.uniform(1, 10)),
+            f.createIfcQuantityArea("NetArea", None, None, rng.uniform(1, 10)),
+        ])
+        f.createIfcRelDefinesByProperties(new(), None, None, None, [element], qset)
+
+    for m in range(3):
+        material = f.createIfcMaterial(f"Material {m}", None, "Concrete")
+        f.createIfcRelAssociatesMaterial(new(), None, None, None, elements[m::3], material)
+    layers = f.createIfcMaterialLayerSet(
+        [f.createIfcMaterialLayer(f.createIfcMaterial("Brick"), 0.1)], "Layers"
+    )
+    f.createIfcRelAssociatesMaterial(new(), None, None, None, elements[::7], layers)
+
+    source = f.createIfcClassification(None, None, None, "Uniclass")
+    reference = f.createIfcClassificationReference(None, "Ss_25", "Walls", source)
+    f.createIfcRelAssociatesClassification(new(), None, None, None, elements[::4], reference)
+
+    path = str(tmp_path / "model.ifc")
+    f.write(path)
+    return path
+
+
+def comparable(properties):
+    return [{k: v for k, v in p.to_dict().items() if k != "extracted_at"} for p in properties]
+
+
+# =============================================================================
+# Relationship Index
+# =============================================================================
+
+class TestRelationshipIndex:
+    """Tests for the one-pass relationship index."""
+
+    def test_matches_per_element_walk(self, ifc_path):
+        extractor = IFCPropertyExtractor(ifc_path)
+        indexed = extractor.extract_all_properties(max_workers=1)
+
+        walker = IFCPropertyExtractor(ifc_path, ifc_file=extractor._ifc_file)
+        walker._relations = RelationshipIndex.for_element
+        walked = [walker.extract_element_properties(e) for e in walker._get_elements()]
+
+        assert len(indexed) == 120
+        assert comparable(indexed) == comparable(walked)
+        assert any(p.material_info.get("type") == "layer_set" for p in indexed)
+        assert any(p.classification.get("source") == "Uniclass" for p in indexed)
+
+    def test_shared_property_set_is_parsed_once(self, ifc_path):
+        extractor = IFCPropertyExtractor(ifc_path)
+        properties = extractor.extract_all_properties(max_workers=1)
+
+        shared = [p.get_property_set("Pset_Shared") for p in properties]
+        shared = [pset for pset in shared if pset]
+        assert len(shared) == 60
+        assert all(pset is shared[0] for pset in shared)
+
+    def test_worker_pool_matches_inline(self, ifc_path):
+        extractor = IFCPropertyExtractor(ifc_path)
+        progress = []
+        pooled = extractor.extract_all_properties(
+            max_workers=2, chunk_size=25, progress_callback=lambda done, total: progress.append(done)
+        )
+
+        assert comparable(pooled) == comparable(extractor.extract_all_properties(max_workers=1))
+        assert progress == [25, 50, 75, 100, 120]
+
+    def test_broken_pool_falls_back_inline(self, ifc_path, monkeypatch):
+        monkeypatch.setattr(ifc_properties, "_init_property_worker", crash_worker)
+        extractor = IFCPropertyExtractor(ifc_path)
+        progress = []
+        pooled = extractor.extract_all_properties(
+            max_workers=2, chunk_size=25, progress_callback=lambda done, total: progress.append(done)
+        )
+
+        assert comparable(pooled) == comparable(extractor.extract_all_properties())
+        assert progress == [25, 50, 75, 100, 120]
+
+    def test_broken_pool_without_fallback_raises(self, ifc_path):
+        chunks = iter_element_chunks(
+            ifc_path, list(range(1, 60)), ifc_properties._extract_properties_chunk, (True,),
+            crash_worker, max_workers=2, chunk_size=25
+        )
+
+        with pytest.raises(BrokenProcessPool):
+            list(chunks)
+
+
+# =============================================================================
+# Takeoff
+# =============================================================================
+
+class TestTakeoff:
+    """Tests for chunked takeoff and the summary."""
+
+    def test_worker_pool_matches_inline(self, ifc_path):
+        engine = QuantityTakeoffEngine(ifc_path)
+        inline = engine.generate_takeoff(max_workers=1)
+        pooled = engine.generate_takeoff(max_workers=2, chunk_size=25)
+
+        assert [t.to_dict() for t in pooled] == [t.to_dict() for t in inline]
+        walls = [t for t in inline if t.element_type == "IfcWall"]
+        assert walls and all(t.get_quantity("GrossVolume") for t in walls)
+
+    def test_broken_pool_falls_back_inline(self, ifc_path, monkeypatch):
+        monkeypatch.setattr(ifc_takeoff, "_init_takeoff_worker", crash_worker)
+        engine = QuantityTakeoffEngine(ifc_path)
+        pooled = engine.generate_takeoff(max_workers=2, chunk_size=25)
+
+        assert [t.to_dict() for t in pooled] == [t.to_dict() for t in engine.generate_takeoff()]
+
+    def test_summary_matches_loop(self, ifc_path):
+        engine = QuantityTakeoffEngine(ifc_path)
+        takeoffs = engine.generate_takeoff(max_workers=1)
+        summary = engine.generate_summary(takeoffs)
+
+        by_type, totals = {}, {}
+        for takeoff in takeoffs:
+            by_type[takeoff.element_type] = by_type.get(takeoff.element_type, 0) + 1
+            for q in takeoff.quantities:
+                named = totals.setdefault(q.quantity_type.value, {})
+                named[q.name] = named.get(q.name, 0) + q.value
+
+        assert summary.total_elements == len(takeoffs)
+        assert list(summary.total_by_type.items()) == list(by_type.items())
+        assert summary.total_quantities.keys() == totals.keys()
+        for qtype, named in totals.items():
+            assert list(summary.total_quantities[qtype]) == list(named)
+            assert summary.total_quantities[qtype] == pytest.approx(named)
+            assert summary.grand_totals[qtype] == pytest.approx(sum(named.values()))
+
+        assert engine.generate_summary([]).to_dict()["total_by_type"] == {}
+
+
+# =============================================================================
+# Columnar Export
+# =============================================================================
+
+class TestColumnarExport:
+    """Tests for row-group exports of properties and takeoffs."""
+
+    def test_takeoff_parquet_has_typed_row_groups(self, ifc_path, tmp_path):
+        pq = pytest.importorskip("pyarrow.parquet")
+        engine = QuantityTakeoffEngine(ifc_path)
+        takeoffs = engine.generate_takeoff(max_workers=1)
+        output = str(tmp_path / "takeoff.parquet")
+
+        assert engine.export_to_columnar(output, row_group_size=100, max_workers=1)
+
+        parquet = pq.ParquetFile(output)
+        expected = [(t.global_id, q.name, q.value) for t in takeoffs for q in t.quantities]
+        assert parquet.metadata.num_rows == len(expected)
+        assert parquet.metadata.num_row_groups == -(-len(expected) // 100)
+        assert str(parquet.schema_arrow.field("value").type) == "double"
+
+        table = parquet.read()
+        assert list(zip(
+            table.column("global_id").to_pylist(),
+            table.column("quantity_name").to_pylist(),
+            table.column("value").to_pylist(),
+        )) == expected
+
+    def test_properties_arrow_matches_extraction(self, ifc_path, tmp_path):
+        ipc = pytest.importorskip("pyarrow.ipc")
+        extractor = IFCPropertyExtractor(ifc_path)
+        properties = extractor.extract_all_properties(max_workers=1)
+        output = str(tmp_path / "properties.arrow")
+
+        assert extractor.export_to_columnar(output, properties, ColumnarFormat.ARROW, row_group_size=64)
+
+        table = ipc.open_file(output).read_all()
+        rows = [
+            (p.global_id, pset.name, prop.name)
+            for p in properties
+            for pset in p.property_sets + p.quantity_sets
+            for prop in pset.properties
+        ]
+        assert table.num_rows == len(rows)
+        widths = [
+            v for v, name in zip(table.column("numeric_value").to_pylist(), table.column("property_name").to_pylist())
+            if name == "Width"
+        ]
+        assert widths and all(isinstance(v, float) for v in widths)
+        assert set(table.column("value").to_pylist()) >= {"True"}
+
+    def test_csv_output_is_atomic(self, ifc_path, tmp_path):
+        engine = QuantityTakeoffEngine(ifc_path)
+        output = tmp_path / "takeoff.csv"
+
+        def failing():
+            yield from engine.generate_takeoff(max_workers=1)[:5]
+            raise RuntimeError("extraction failed")
+
+        assert not engine.export_to_columnar(str(output), failing(), ColumnarFormat.CSV)
+        assert list(tmp_path.iterdir()) == [tmp_path / "model.ifc"]
+
+        assert engine.export_to_columnar(str(output), format=ColumnarFormat.CSV, max_workers=1)
+        with open(output, newline="") as f:
+            rows = list(csv.DictReader(f))
+        assert rows and float(rows[0]["value"]) > 0
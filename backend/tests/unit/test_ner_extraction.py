@@ -0,0 +1,262 @@
+"""
+Unit Tests for Entity Extraction and Rule-Based Classification
+
+Tests run without Postgres/Redis dependencies.
+"""
+
+import asyncio
+import os
+import random
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from app.pipelines import ner_extraction
+from app.pipelines.document_classification import DocumentType, LayoutLMClassifier
+from app.pipelines.ner_extraction import (
+    EntityExtractorPipeline,
+    Entity,
+    EntityType,
+    SpacyNERExtractor,
+    split_windows,
+)
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+@pytest.fixture
+def extractor(monkeypatch):
+    """Regex-only extractor; no spaCy model is loaded."""
+    monkeypatch.setattr(ner_extraction, "SPACY_AVAILABLE", False)
+    return SpacyNERExtractor(window_chars=300)
+
+
+class StandInNLP:
+    """Stand-in for a spaCy pipeline: capitalized 'Acme ...' names are ORGs."""
+
+    def __init__(self):
+        self.calls = []
+
+    def pipe(self, texts, batch_size):
+        for text in texts:
+            self.calls.append(len(text))
+            yield SimpleNamespace(ents=[
+                SimpleNamespace(label_="ORG", start_char=m.start(), end_char=m.end(), text=m.group(0))
+                for m in re.finditer(r"Acme [A-Z][a-z]+", text)
+            ])
+
+
+def crash_once_windows(texts, batch_size):
+    """Pool task whose first call kills its worker process."""
+    try:
+        os.close(os.open(os.environ["NER_CRASH_MARKER"], os.O_CREAT | os.O_EXCL))
+    except FileExistsError:
+        return ner_extraction._pipe_entities(ner_extraction._worker_nlp, texts, batch_size)
+    os._exit(1)
+
+
+def make_document(rng, sentences):
+    words = ["concrete", "steel", "shall", "be", "placed", "by", "the", "Acme Builders", "Acme Steel"]
+    parts = []
+    for _ in range(sentences):
+        sentence = " ".join(rng.choice(words) for _ in range(rng.randint(3, 15)))
+        parts.append(sentence[0].upper() + sentence[1:] + ".")
+        if rng.random() < 0.1:
+            parts.append("Contract #{} issued.\n\n".format(rng.randint(1000, 9999)))
+    return " ".join(parts)
+
+
+def brute_force_dedup(entities):
+    """Reference: check every kept range for each entity."""
+    kept, covered = [], []
+    for entity in sorted(entities, key=lambda e: e.confidence, reverse=True):
+        if all(entity.end_char <= start or entity.start_char >= end for start, end in covered):
+            kept.append(entity)
+            covered.append((entity.start_char, entity.end_char))
+    return sorted(kept, key=lambda e: e.start_char)
+
+
+def per_pattern_scan(text):
+    """Reference: re.finditer for each custom pattern in turn."""
+    entities = []
+    for entity_type, patterns in SpacyNERExtractor.CUSTOM_PATTERNS.items():
+        for pattern in patterns:
+            for match in re.finditer(pattern, text, re.IGNORECASE):
+                entities.append(Entity(
+                    text=match.group(0),
+                    entity_type=entity_type,
+                    start_char=match.start(),
+                    end_char=match.end(),
+                    confidence=0.85,
+                    normalized_value=match.group(1) if match.groups() else match.group(0),
+                ))
+    return entities
+
+
+# =============================================================================
+# Custom Entities
+# =============================================================================
+
+class TestCustomEntities:
+    """Tests for the custom patterns and overlap sweep."""
+
+    def test_finds_each_type(self, extractor):
+        text = (
+            "Per Contract #45821-B the GC will email jane.roe@builder.com or call "
+            "(555) 201-3344. Site: 120 Harbor Street."
+        )
+        result = asyncio.run(extractor.extract_entities(text))
+        found = {(e.entity_type, e.text, e.normalized_value) for e in result.entities}
+
+        assert (EntityType.CONTRACT_NUMBER, "Contract #45821-B", "45821-B") in found
+        assert (EntityType.EMAIL, "jane.roe@builder.com", "jane.roe@builder.com") in found
+        assert (EntityType.PHONE, "(555) 201-3344", "(555) 201-3344") in found
+        assert (EntityType.ADDRESS, "120 Harbor Street", "120 Harbor Street") in found
+        assert result.entity_counts["CONTRACT_NUMBER"] == 1
+
+    def test_case_insensitive(self, extractor):
+        entities = asyncio.run(extractor._extract_custom_entities("AGREEMENT: ZX2024"))
+        assert [(e.entity_type, e.normalized_value) for e in entities] == [
+            (EntityType.CONTRACT_NUMBER, "ZX2024")
+        ]
+
+    def test_greedy_pattern_does_not_hide_later_patterns(self, extractor):
+        text = "Project: Riverside tower per contract 123456 call 555-123-4567 or email pm@acme.com"
+
+        result = asyncio.run(extractor.extract_entities(text))
+        found = {(e.entity_type, e.text) for e in result.entities}
+
+        assert (EntityType.CONTRACT_NUMBER, "contract 123456") in found
+        assert (EntityType.PHONE, "555-123-4567") in found
+        assert result.entities == extractor._deduplicate_entities(per_pattern_scan(text))
+
+    def test_candidates_match_per_pattern_scan(self, extractor):
+        rng = random.Random(11)
+        pieces = [
+            "Project: ", "job '", "Riverside tower", " per ", "contract ", "agreement #", "PO ",
+            "123456", "AB12", "-7", " call ", "555-123-4567", "(555) 201 3344", "201.3344",
+            " email ", "pm@acme.com", " at ", "12 Harbor St", "'", '"', ". ", "\n",
+        ]
+        for _ in range(300):
+            text = "".join(rng.choice(pieces) for _ in range(rng.randint(1, 25)))
+            expected = per_pattern_scan(text)
+            assert asyncio.run(extractor._extract_custom_entities(text)) == expected
+
+    def test_dedup_matches_brute_force(self, extractor):
+        rng = random.Random(4)
+        for _ in range(200):
+            entities = []
+            for i in range(50):
+                start = rng.randint(0, 120)
+                entities.append(Entity(
+                    text=str(i),
+                    entity_type=EntityType.QUANTITY,
+                    start_char=start,
+                    end_char=start + rng.randint(0, 10),
+                    confidence=rng.choice([0.5, 0.85, 0.9]),
+                ))
+            assert extractor._deduplicate_entities(entities) == brute_force_dedup(entities)
+
+
+# =============================================================================
+# Batch Extraction
+# =============================================================================
+
+class TestBatchExtraction:
+    """Tests for windowed, batched extraction."""
+
+    def test_windows_are_sentence_aligned(self):
+        rng = random.Random(5)
+        text = make_document(rng, 200)
+        windows = split_windows(text, 300)
+
+        assert "".join(w for _, w in windows) == text
+        for offset, window in windows:
+            assert text[offset:offset + len(window)] == window
+            assert len(window) <= 300
+            assert re.search(r"[.!?]\s+$|\n\s*\n$", window) or offset + len(window) == len(text)
+
+    def test_overlong_sentence_is_cut_at_whitespace(self):
+        text = " ".join(["word"] * 200)
+        windows = split_windows(text, 64)
+        assert "".join(w for _, w in windows) == text
+        assert all(w.endswith(" ") for _, w in windows[:-1])
+
+    def test_batch_matches_single_document(self, extractor):
+        rng = random.Random(6)
+        documents = [make_document(rng, rng.randint(0, 60)) for _ in range(12)]
+        extractor.nlp = StandInNLP()
+        progress = []
+
+        async def run():
+            single = [await extractor.extract_entities(text) for text in documents]
+            batch = await extractor.extract_entities_batch(
+                documents, batch_size=4, n_process=1, progress_callback=lambda d, t: progress.append(d)
+            )
+            return single, batch
+
+        single, batch = asyncio.run(run())
+
+        assert max(extractor.nlp.calls) <= 300
+        assert progress == list(range(1, len(documents) + 1))
+        for text, expected, result in zip(documents, single, batch):
+            assert [e.to_dict() for e in result.entities] == [e.to_dict() for e in expected.entities]
+            for entity in result.entities:
+                assert text[entity.start_char:entity.end_char] == entity.text
+            assert result.entity_counts.get("ORG", 0) == text.count("Acme")
+
+    def test_broken_pool_is_rebuilt(self, extractor, monkeypatch, tmp_path):
+        monkeypatch.setenv("NER_CRASH_MARKER", str(tmp_path / "crashed"))
+        monkeypatch.setattr(ner_extraction, "_load_nlp", lambda model_name: StandInNLP())
+        monkeypatch.setattr(ner_extraction, "_ner_windows", crash_once_windows)
+        rng = random.Random(7)
+        documents = [make_document(rng, 30) + " Contract #4821 issued." for _ in range(16)]
+        extractor.nlp = StandInNLP()
+
+        async def run():
+            return await extractor.extract_entities_batch(documents, batch_size=2, n_process=2)
+
+        try:
+            results = asyncio.run(run())
+            failed = [r for r in results if "ORG" not in r.entity_counts]
+            assert failed and len(failed) < len(results)
+            for text, result in zip(documents, results):
+                assert result.entity_counts["CONTRACT_NUMBER"] == text.count("Contract #")
+                assert result.entity_counts.get("ORG", 0) in (0, text.count("Acme"))
+            assert results[-1].entity_counts["ORG"] == documents[-1].count("Acme")
+
+            again = asyncio.run(run())
+            assert all(r.entity_counts["ORG"] == t.count("Acme") for t, r in zip(documents, again))
+        finally:
+            extractor.close()
+
+    def test_pipeline_batch_without_model(self, extractor):
+        pipeline = EntityExtractorPipeline.__new__(EntityExtractorPipeline)
+        pipeline.ner = extractor
+
+        results = asyncio.run(pipeline.batch_process([
+            ("a", "See agreement AB1234."),
+            ("b", ""),
+        ]))
+
+        assert results["a"]["entities"]["entity_counts"] == {"CONTRACT_NUMBER": 1}
+        assert results["b"]["entities"]["entities"] == []
+
+
+# =============================================================================
+# Rule-Based Classification
+# =============================================================================
+
+class TestRuleBasedClassification:
+    """Tests for keyword scoring."""
+
+    def test_invoice_text(self):
+        classifier = LayoutLMClassifier.__new__(LayoutLMClassifier)
+        result = asyncio.run(classifier._rule_based_classify(
+            b"", "INVOICE 2231\nSubtotal: 900.00\nTotal amount: 990.00\nPayment due in 30 days"
+        ))
+        assert result.primary_classification.document_type == DocumentType.INVOICE
+        assert result.primary_classification.confidence == 1.0
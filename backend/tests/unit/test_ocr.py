@@ -0,0 +1,342 @@
+"""
+Unit Tests for OCR Pipeline
+
+Tests run without Postgres/Redis dependencies. Tesseract itself is
+stubbed; only the scheduling around it is exercised.
+"""
+
+import asyncio
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from app.pipelines import ocr
+from app.pipelines.ocr import (
+    OCRBlock,
+    OCRLanguage,
+    OCRMode,
+    OCRPipeline,
+    OCRResult,
+    TesseractOCR,
+)
+
+TESSERACT_CMD = "/opt/tesseract/bin/tesseract"
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+@pytest.fixture
+def fake_tesseract(monkeypatch):
+    """Stand-in pytesseract module and a configured binary path."""
+    module = SimpleNamespace(pytesseract=SimpleNamespace(tesseract_cmd="tesseract"))
+    monkeypatch.setattr(ocr, "TESSERACT_AVAILABLE", True)
+    monkeypatch.setattr(ocr, "pytesseract", module, raising=False)
+    monkeypatch.setattr(ocr, "settings", SimpleNamespace(TESSERACT_CMD=TESSERACT_CMD))
+    return module
+
+
+@pytest.fixture
+def engine(fake_tesseract):
+    """TesseractOCR running pages on a thread pool."""
+    engine = TesseractOCR(max_workers=2)
+    engine._executor = ThreadPoolExecutor(max_workers=4)
+    yield engine
+    engine._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def page_result(page_number):
+    block = OCRBlock(
+        text=f"page {page_number}", confidence=90.0, x=0, y=0, width=10, height=10,
+        block_num=1, par_num=1, line_num=1, word_num=1
+    )
+    return [block], float(page_number)
+
+
+def make_result(text, page_count=1):
+    return OCRResult(
+        text=text, blocks=[], confidence=90.0, language="eng",
+        processing_time=0.1, page_count=page_count, word_count=len(text.split())
+    )
+
+
+class FakeOCR:
+    """Stands in for TesseractOCR; calls block until released."""
+
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+        self.release = asyncio.Event()
+
+    async def _run(self, kind, data, page_count):
+        self.calls.append((kind, data))
+        await self.release.wait()
+        if self.error:
+            raise self.error
+        return make_result(f"{kind} {len(self.calls)}", page_count)
+
+    async def process_image(self, data, language, mode):
+        return await self._run("image", data, 1)
+
+    async def process_pdf(self, data, language, mode):
+        return await self._run("pdf", data, 2)
+
+    def close(self):
+        pass
+
+
+class FakeMetrics:
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append((name, *args))
+
+
+@pytest.fixture
+def pipeline(fake_tesseract):
+    pipeline = OCRPipeline(max_workers=2)
+    pipeline.ocr = FakeOCR()
+    pipeline.ocr.release.set()
+    return pipeline
+
+
+def ocr_pages(engine, page_count, progress_callback=None):
+    return engine._ocr_pages("doc.pdf", page_count, 300, "eng", "--psm 6", True, progress_callback)
+
+
+# =============================================================================
+# Worker Setup
+# =============================================================================
+
+class TestWorkerSetup:
+    """Tests for the page worker initializer."""
+
+    def test_initializer_sets_tesseract_cmd(self, fake_tesseract, monkeypatch):
+        monkeypatch.delenv("OMP_THREAD_LIMIT", raising=False)
+        ocr._init_ocr_worker(TESSERACT_CMD)
+
+        assert fake_tesseract.pytesseract.tesseract_cmd == TESSERACT_CMD
+        assert os.environ["OMP_THREAD_LIMIT"] == "1"
+
+    def test_pool_passes_configured_cmd(self, fake_tesseract):
+        engine = TesseractOCR(max_workers=1)
+        assert fake_tesseract.pytesseract.tesseract_cmd == TESSERACT_CMD
+
+        executor = engine._get_executor()
+        try:
+            assert executor._initializer is ocr._init_ocr_worker
+            assert executor._initargs == (TESSERACT_CMD,)
+        finally:
+            engine.close()
+
+
+# =============================================================================
+# Page Scheduling
+# =============================================================================
+
+class TestOCRPages:
+    """Tests for bounded, ordered page OCR."""
+
+    def test_results_in_page_order(self, engine, monkeypatch):
+        running, peak = [0], [0]
+        lock = threading.Lock()
+
+        def fake_page(pdf_path, page_number, dpi, language, config, preprocess):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            # Later pages finish first
+            time.sleep(0.02 * (10 - page_number % 10))
+            with lock:
+                running[0] -= 1
+            return page_result(page_number)
+
+        monkeypatch.setattr(ocr, "_ocr_pdf_page", fake_page)
+        progress = []
+        pages = asyncio.run(ocr_pages(engine, 12, lambda done, total: progress.append((done, total))))
+
+        assert [confidence for _, confidence in pages] == list(range(1, 13))
+        assert [blocks[0].text for blocks, _ in pages] == [f"page {i}" for i in range(1, 13)]
+        assert progress == [(i, 12) for i in range(1, 13)]
+        assert peak[0] <= 2 * engine.max_workers
+
+    def test_cancellation_stops_queued_pages(self, fake_tesseract, monkeypatch):
+        engine = TesseractOCR(max_workers=1)
+        engine._executor = ThreadPoolExecutor(max_workers=1)
+        started, release = [], threading.Event()
+
+        def fake_page(pdf_path, page_number, *args):
+            started.append(page_number)
+            release.wait(5)
+            return page_result(page_number)
+
+        monkeypatch.setattr(ocr, "_ocr_pdf_page", fake_page)
+
+        async def run():
+            task = asyncio.create_task(ocr_pages(engine, 10))
+            while not started:
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+        release.set()
+        engine._executor.shutdown(wait=True)
+
+        assert started == [1]
+
+    def test_page_failure_propagates(self, engine, monkeypatch):
+        def fake_page(pdf_path, page_number, *args):
+            if page_number == 3:
+                raise RuntimeError("bad page")
+            return page_result(page_number)
+
+        monkeypatch.setattr(ocr, "_ocr_pdf_page", fake_page)
+
+        with pytest.raises(RuntimeError, match="bad page"):
+            asyncio.run(ocr_pages(engine, 6))
+
+
+# =============================================================================
+# Pipeline
+# =============================================================================
+
+class TestOCRPipeline:
+    """Tests for cached, deduplicated file processing."""
+
+    def test_identical_bytes_in_flight_are_processed_once(self, pipeline):
+        pipeline.ocr.release.clear()
+
+        async def run():
+            tasks = [
+                asyncio.create_task(pipeline.process_file(name, b"same image"))
+                for name in ("a.png", "b.png", "c.png")
+            ]
+            await asyncio.sleep(0.01)
+            pipeline.ocr.release.set()
+            return await asyncio.gather(*tasks)
+
+        results = asyncio.run(run())
+
+        assert pipeline.ocr.calls == [("image", b"same image")]
+        assert [r.metadata["source"] for r in results] == ["ocr", "cache", "cache"]
+        assert {r.text for r in results} == {"image 1"}
+        assert pipeline._in_flight == {}
+
+        cached = asyncio.run(pipeline.process_file("d.png", b"same image"))
+        assert cached.metadata["source"] == "cache"
+        assert len(pipeline.ocr.calls) == 1
+        assert (pipeline.cache.hits, pipeline.cache.misses) == (3, 1)
+
+    def test_options_and_contents_are_not_shared(self, pipeline):
+        async def run():
+            return await asyncio.gather(
+                pipeline.process_file("a.png", b"one"),
+                pipeline.process_file("b.png", b"two"),
+                pipeline.process_file("c.png", b"one", OCRLanguage.GERMAN),
+                pipeline.process_file("d.png", b"one", mode=OCRMode.FAST),
+            )
+
+        results = asyncio.run(run())
+
+        assert len(pipeline.ocr.calls) == 4
+        assert all(r.metadata["source"] == "ocr" for r in results)
+
+    def test_failure_is_shared_and_not_cached(self, pipeline):
+        pipeline.ocr.error = RuntimeError("tesseract crashed")
+        pipeline.ocr.release.clear()
+
+        async def run():
+            tasks = [
+                asyncio.create_task(pipeline.process_file(name, b"bad scan"))
+                for name in ("a.png", "b.png")
+            ]
+            await asyncio.sleep(0.01)
+            pipeline.ocr.release.set()
+            return await asyncio.gather(*tasks, return_exceptions=True)
+
+        errors = asyncio.run(run())
+
+        assert [str(e) for e in errors] == ["tesseract crashed"] * 2
+        assert len(pipeline.ocr.calls) == 1
+        assert pipeline._in_flight == {} and len(pipeline.cache) == 0
+
+        pipeline.ocr.error = None
+        result = asyncio.run(pipeline.process_file("a.png", b"bad scan"))
+        assert result.metadata["source"] == "ocr"
+        assert len(pipeline.ocr.calls) == 2
+
+    def test_batch_reports_failures_per_file(self, pipeline):
+        pipeline.ocr.error = RuntimeError("tesseract crashed")
+        progress = []
+
+        results = asyncio.run(pipeline.process_batch(
+            [("a.png", b"x"), ("b.png", b"x")],
+            progress_callback=lambda done, total: progress.append((done, total))
+        ))
+
+        assert all(r.metadata["error"] == "tesseract crashed" for r in results.values())
+        assert progress == [(1, 2), (2, 2)]
+
+    def test_text_layer_skips_ocr(self, pipeline, monkeypatch):
+        monkeypatch.setattr(
+            ocr, "_extract_text_layer", lambda data, min_chars: ["First page text", "Second page"]
+        )
+
+        result = asyncio.run(pipeline.process_file("spec.PDF", b"%PDF text"))
+
+        assert pipeline.ocr.calls == []
+        assert result.metadata["source"] == "text_layer"
+        assert result.text == "First page text\n\nSecond page"
+        assert (result.page_count, result.word_count) == (2, 5)
+
+    def test_scanned_pdf_is_ocrd(self, pipeline, monkeypatch):
+        monkeypatch.setattr(ocr, "_extract_text_layer", lambda data, min_chars: None)
+
+        result = asyncio.run(pipeline.process_file("scan.pdf", b"%PDF scan"))
+
+        assert pipeline.ocr.calls == [("pdf", b"%PDF scan")]
+        assert result.metadata["source"] == "ocr"
+
+    def test_text_layer_needs_every_page(self):
+        pytest.importorskip("PyPDF2")
+        from PyPDF2 import PdfWriter
+
+        writer = PdfWriter()
+        writer.add_blank_page(width=200, height=200)
+        buffer = io.BytesIO()
+        writer.write(buffer)
+
+        assert ocr._extract_text_layer(buffer.getvalue(), 20) is None
+        assert ocr._extract_text_layer(b"not a pdf", 20) is None
+
+    def test_metrics(self, pipeline, monkeypatch):
+        metrics = FakeMetrics()
+        monkeypatch.setattr(ocr, "METRICS_AVAILABLE", True)
+        monkeypatch.setattr(ocr, "infrastructure_metrics", metrics, raising=False)
+
+        asyncio.run(pipeline.process_file("a.png", b"img"))
+        asyncio.run(pipeline.process_file("b.png", b"img"))
+        pipeline.ocr.error = RuntimeError("tesseract crashed")
+        with pytest.raises(RuntimeError):
+            asyncio.run(pipeline.process_file("c.png", b"other"))
+
+        assert [c[0] for c in metrics.calls] == [
+            "record_cache_operation", "update_cache_hit_ratio", "record_ocr_document"
+        ] * 3
+        assert [c[-1] for c in metrics.calls if c[0] == "record_cache_operation"] == [False, True, False]
+        assert [c[1:] for c in metrics.calls if c[0] == "update_cache_hit_ratio"] == [
+            ("ocr", 0, 1), ("ocr", 1, 1), ("ocr", 1, 2)
+        ]
+        documents = [c for c in metrics.calls if c[0] == "record_ocr_document"]
+        assert [(c[1], c[3], c[4]) for c in documents] == [
+            ("ocr", 1, True), ("cache", 1, True), ("ocr", 0, False)
+        ]
@@ -0,0 +1,77 @@
+"""
+Unit Tests for the Content-Hash Result Cache
+
+Tests run without Postgres/Redis dependencies.
+"""
+
+import json
+from dataclasses import asdict, dataclass
+
+from app.core.result_cache import ResultCache
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+@dataclass
+class Result:
+    """Minimal pipeline result."""
+    text: str
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def size_of(result):
+    return len(json.dumps(result.to_dict(), default=str))
+
+
+# =============================================================================
+# Cache
+# =============================================================================
+
+class TestResultCache:
+    """Tests for the size-bounded LRU cache."""
+
+    def test_evicts_least_recently_used_by_size(self):
+        results = {key: Result(f"text {key} " * 10) for key in "abc"}
+        sizes = {key: size_of(r) for key, r in results.items()}
+        cache = ResultCache(max_bytes=sizes["a"] + sizes["b"] + sizes["c"] // 2)
+
+        cache.put("a", results["a"])
+        cache.put("b", results["b"])
+        assert cache.get("a") is results["a"]
+        cache.put("c", results["c"])
+
+        assert cache.get("b") is None
+        assert cache.get("a") is results["a"] and cache.get("c") is results["c"]
+        assert len(cache) == 2 and cache.evictions == 1
+        assert cache.total_bytes == sizes["a"] + sizes["c"]
+        assert (cache.hits, cache.misses) == (3, 1)
+
+    def test_replacing_and_oversized_entries(self):
+        small, large = Result("small"), Result("large " * 100)
+        cache = ResultCache(max_bytes=size_of(large) - 1)
+
+        cache.put("k", small)
+        cache.put("k", small)
+        assert len(cache) == 1
+        assert cache.total_bytes == size_of(small)
+
+        cache.put("big", large)
+        assert cache.get("big") is None and cache.evictions == 0
+
+    def test_key_covers_contents_and_options(self):
+        key = ResultCache.make_key(b"scan", "pdf", "eng", "standard")
+
+        assert ResultCache.make_key(b"scan", "pdf", "eng", "standard") == key
+        assert ResultCache.make_key(b"scan", "pdf", "deu", "standard") != key
+        assert ResultCache.make_key(b"scan2", "pdf", "eng", "standard") != key
+
+    def test_clear(self):
+        cache = ResultCache()
+        cache.put("k", Result("text"))
+        cache.clear()
+
+        assert len(cache) == 0 and cache.total_bytes == 0
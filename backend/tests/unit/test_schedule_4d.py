@@ -0,0 +1,273 @@
+"""
+Unit Tests for 4D Scheduling
+
+Tests run without Postgres/Redis dependencies.
+"""
+
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from app.vdc.schedule_4d import (
+    ConstructionTask,
+    GanttChartGenerator,
+    IntervalTree,
+    Schedule4DEngine,
+    TaskDependency,
+    TaskStatus,
+    TaskType,
+)
+from app.vdc.federated_models import (
+    BoundingBox,
+    Discipline,
+    DisciplineModel,
+    ElementType,
+    FederatedModel,
+    ModelElement,
+    Point3D,
+)
+
+
+BASE_DATE = date(2026, 3, 2)
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+def make_task(task_id, duration, offset=0):
+    """Build a task starting offset days after the base date."""
+    start = BASE_DATE + timedelta(days=offset)
+    return ConstructionTask(
+        id=task_id,
+        name=task_id,
+        wbs_code="1",
+        task_type=TaskType.STRUCTURE,
+        start_date=start,
+        end_date=start + timedelta(days=duration),
+        duration_days=duration,
+    )
+
+
+@pytest.fixture
+def engine():
+    return Schedule4DEngine()
+
+
+@pytest.fixture
+def network(engine):
+    """
+    A(5) -FS-> B(10) -FS-> D(3)
+    A(5) -SS+2-> C(4) -FF+1-> D(3)
+    """
+    schedule = engine.create_schedule("CPM", "p-1", "fed-1")
+    for task_id, duration in [("A", 5), ("B", 10), ("C", 4), ("D", 3)]:
+        engine.add_task(schedule.id, make_task(task_id, duration))
+
+    engine.add_dependency(schedule.id, TaskDependency("A", "B", "FS", 0))
+    engine.add_dependency(schedule.id, TaskDependency("A", "C", "SS", 2))
+    engine.add_dependency(schedule.id, TaskDependency("B", "D", "FS", 0))
+    engine.add_dependency(schedule.id, TaskDependency("C", "D", "FF", 1))
+    return schedule
+
+
+def task_state(schedule):
+    return {
+        t.id: (t.start_date, t.end_date, t.float_days, t.critical_path)
+        for t in schedule.tasks
+    }
+
+
+# =============================================================================
+# Critical Path
+# =============================================================================
+
+class TestCriticalPath:
+    """Tests for the forward/backward pass."""
+
+    def test_forward_and_backward_pass(self, engine, network):
+        critical = engine.calculate_critical_path(network.id)
+
+        assert critical == ["A", "B", "D"]
+        c = network.get_task_by_id("C")
+        assert c.start_date == BASE_DATE + timedelta(days=2)
+        assert c.float_days == 11.0
+        d = network.get_task_by_id("D")
+        assert d.start_date == BASE_DATE + timedelta(days=15)
+        assert network.end_date == BASE_DATE + timedelta(days=18)
+
+    def test_cycle_is_rejected(self, engine, network):
+        engine.add_dependency(network.id, TaskDependency("D", "A", "FS", 0))
+        with pytest.raises(ValueError):
+            engine.calculate_critical_path(network.id)
+
+    def test_progress_update_reschedules_downstream(self, engine, network):
+        engine.calculate_critical_path(network.id)
+
+        # A started on time but still needs 4 days at the data date
+        engine.update_task_progress(network.id, "A", 20.0, data_date=BASE_DATE + timedelta(days=3))
+
+        assert network.get_task_by_id("B").start_date == BASE_DATE + timedelta(days=7)
+        assert network.end_date == BASE_DATE + timedelta(days=20)
+
+    def test_incremental_matches_full_recalculation(self, engine):
+        rng = random.Random(3)
+        schedule = engine.create_schedule("Random", "p-1", "fed-1")
+        for i in range(300):
+            engine.add_task(schedule.id, make_task(f"t{i}", rng.randint(1, 15), rng.randint(0, 20)))
+        for i in range(1, 300):
+            for _ in range(rng.randint(0, 2)):
+                engine.add_dependency(schedule.id, TaskDependency(
+                    f"t{rng.randrange(max(0, i - 30), i)}",
+                    f"t{i}",
+                    rng.choice(["FS", "SS", "FF", "SF"]),
+                    rng.randint(-2, 4),
+                ))
+
+        engine.calculate_critical_path(schedule.id)
+        engine.update_task_progress(schedule.id, "t0", 10.0, data_date=BASE_DATE + timedelta(days=5))
+        for _ in range(30):
+            engine.update_task_progress(
+                schedule.id, f"t{rng.randrange(300)}", rng.choice([25.0, 60.0, 100.0])
+            )
+        incremental = task_state(schedule)
+
+        engine.calculate_critical_path(schedule.id)
+        assert task_state(schedule) == incremental
+
+    def test_completed_task_keeps_recorded_dates(self, engine, network):
+        engine.calculate_critical_path(network.id)
+        engine.update_task_progress(network.id, "A", 100.0)
+
+        a = network.get_task_by_id("A")
+        assert a.status == TaskStatus.COMPLETED
+        assert a.start_date == BASE_DATE
+        assert a.end_date == BASE_DATE + timedelta(days=5)
+
+
+# =============================================================================
+# Timeline
+# =============================================================================
+
+class TestTimeline:
+    """Tests for the date index and streamed playback."""
+
+    @pytest.fixture
+    def schedule(self, engine):
+        rng = random.Random(5)
+        schedule = engine.create_schedule("Timeline", "p-1", "fed-1")
+        for i in range(200):
+            task = make_task(f"t{i}", rng.randint(0, 20), rng.randint(0, 120))
+            task.linked_element_ids = [f"e{rng.randrange(150)}" for _ in range(2)]
+            task.status = rng.choice(list(TaskStatus))
+            engine.add_task(schedule.id, task)
+        return schedule
+
+    def test_interval_tree_matches_scan(self):
+        rng = random.Random(1)
+        intervals = []
+        for i in range(300):
+            start = rng.randint(0, 500)
+            intervals.append((start, start + rng.randint(0, 40), i))
+        tree = IntervalTree(intervals)
+
+        for point in range(-5, 560, 3):
+            expected = [i for start, end, i in intervals if start <= point <= end]
+            assert sorted(tree.query(point)) == expected
+
+    @pytest.mark.parametrize("granularity", ["daily", "weekly"])
+    def test_timeline_matches_date_scan(self, schedule, granularity):
+        generator = GanttChartGenerator(schedule)
+        start = BASE_DATE - timedelta(days=3)
+        frames = generator.generate_timeline_data(start, BASE_DATE + timedelta(days=150), granularity)
+
+        for frame in frames:
+            day = date.fromisoformat(frame["date"])
+            active = [t for t in schedule.tasks if t.start_date <= day <= t.end_date]
+            assert frame["tasks"] == [t.name for t in active]
+            assert frame["progress"] == pytest.approx(generator._calculate_progress_on_date(day))
+
+    def test_stream_reports_element_state_changes(self, engine, schedule):
+        frames = list(engine.stream_construction(schedule.id, granularity="weekly"))
+
+        state = {}
+        for frame in frames:
+            day = date.fromisoformat(frame["date"])
+            for element_id in frame["appearing_elements"]:
+                assert element_id not in state
+                state[element_id] = "in_progress"
+            for element_id in frame["completed_elements"]:
+                state[element_id] = "complete"
+
+            for element_id, current in state.items():
+                tasks = [t for t in schedule.tasks if element_id in t.linked_element_ids]
+                done = all(t.end_date < day for t in tasks)
+                assert current == ("complete" if done else "in_progress")
+
+        assert set(state.values()) == {"complete"}
+
+    def test_index_follows_schedule_changes(self, engine, schedule):
+        day = BASE_DATE + timedelta(days=300)
+        assert schedule.get_tasks_by_date(day) == []
+
+        engine.add_task(schedule.id, make_task("late", 5, 298))
+        assert [t.id for t in schedule.get_tasks_by_date(day)] == ["late"]
+
+    def test_index_follows_replaced_tasks(self, schedule):
+        assert schedule.get_task_by_id("t0") is not None
+
+        schedule.tasks[0] = make_task("swapped", 5, 298)
+        assert schedule.get_task_by_id("t0") is None
+        assert schedule.get_task_by_id("swapped") is schedule.tasks[0]
+        assert [t.id for t in schedule.get_tasks_by_date(BASE_DATE + timedelta(days=300))] == ["swapped"]
+
+    def test_index_follows_task_edits(self, engine, schedule):
+        task = schedule.tasks[0]
+        day = task.start_date
+        assert task in schedule.get_tasks_by_date(day)
+
+        task.start_date = task.end_date = day - timedelta(days=2)
+        assert task not in schedule.get_tasks_by_date(day)
+
+        task.linked_element_ids.append("moved-element")
+        frames = list(engine.stream_construction(schedule.id, granularity="daily"))
+        appeared = {e: f["date"] for f in frames for e in f["appearing_elements"]}
+        assert appeared["moved-element"] == task.start_date.isoformat()
+
+        task.id = "renamed"
+        assert schedule.get_task_by_id("renamed") is task
+
+    def test_elements_for_date_keep_model_order(self, schedule):
+        model = FederatedModel(id="fed-1", name="Tower", project_id="p-1")
+        model.add_discipline_model(DisciplineModel(
+            id="arch",
+            name="Architecture",
+            discipline=Discipline.ARCHITECTURAL,
+            version="1",
+            file_path="arch.ifc",
+            file_size=0,
+            elements=[
+                ModelElement(
+                    id=f"e{i}",
+                    global_id=f"e{i}",
+                    element_type=ElementType.WALL,
+                    name=f"Wall {i}",
+                    description=None,
+                    discipline=Discipline.ARCHITECTURAL,
+                    bounding_box=BoundingBox(Point3D(i, 0, 0), Point3D(i + 1, 1, 1)),
+                )
+                for i in range(150)
+            ],
+        ))
+        day = BASE_DATE + timedelta(days=40)
+        visible = {
+            element_id
+            for t in schedule.get_tasks_by_date(day)
+            if t.status in (TaskStatus.COMPLETED, TaskStatus.IN_PROGRESS)
+            for element_id in t.linked_element_ids
+        }
+
+        elements = schedule.get_elements_for_date(day, model)
+        assert [e.id for e in elements] == [f"e{i}" for i in range(150) if f"e{i}" in visible]
+        assert elements
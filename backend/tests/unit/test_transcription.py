@@ -0,0 +1,230 @@
+"""
+Unit Tests for Parallel Transcription
+
+Tests run without Postgres/Redis dependencies.
+"""
+
+import asyncio
+import random
+
+import pytest
+
+from app.core.result_cache import ResultCache
+from app.pipelines.transcription import (
+    ParallelTranscriber,
+    WhisperTranscriber,
+)
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+def make_script(count=400, seed=9):
+    """Words with absolute (start, end) times, spaced by short gaps."""
+    rng = random.Random(seed)
+    words, t = [], 0.0
+    for i in range(count):
+        length = rng.uniform(0.15, 0.6)
+        words.append((f"w{i}", t, t + length))
+        t += length + rng.uniform(0.02, 0.3)
+    return words, t
+
+
+class WindowChunker:
+    """Stand-in for the audio chunker; chunk bytes encode the window."""
+
+    def __init__(self, total, chunk, overlap, delay=0):
+        self.delay = delay
+        self.closed = False
+        self.windows = []
+        start = 0.0
+        while start < total:
+            self.windows.append((max(0.0, start - overlap), min(total, start + chunk)))
+            start += chunk
+
+    def stream_chunks(self, audio_data, filename):
+        # Held so that only an explicit aclose() can finish the stream
+        self.stream = self._stream()
+        return self.stream
+
+    async def _stream(self):
+        try:
+            for index, (start, end) in enumerate(self.windows):
+                await asyncio.sleep(self.delay)
+                yield index, f"{start}:{end}".encode(), start, end
+        finally:
+            self.closed = True
+
+
+class FakeWhisper(WhisperTranscriber):
+    """
+    Local stand-in for the Whisper API.
+
+    Answers with a verbose_json response for the script words heard
+    whole inside the chunk window, with chunk-relative times, grouped
+    into segments of up to five words. As with the real API, word
+    timestamps come back as one top-level list. Words cut by the window
+    edge come back garbled.
+    """
+
+    def __init__(self, script, fail_once=()):
+        super().__init__(api_key="test")
+        self.script = script
+        self.fail_once = set(fail_once)
+        self.calls = []
+
+    async def transcribe(self, audio_data, filename, language=None, timestamp_granularities=None):
+        assert timestamp_granularities == ["word", "segment"]
+        start, end = (float(x) for x in audio_data.decode().split(":"))
+        self.calls.append(start)
+        await asyncio.sleep(random.random() / 1000)
+        if start in self.fail_once:
+            self.fail_once.discard(start)
+            raise RuntimeError("upstream timeout")
+
+        heard = []
+        for word, w_start, w_end in self.script:
+            if w_end <= start or w_start >= end:
+                continue
+            whole = start <= w_start and w_end <= end
+            heard.append({
+                "word": word if whole else "???",
+                "start": max(w_start, start) - start,
+                "end": min(w_end, end) - start,
+            })
+
+        segments = [
+            {
+                "id": i,
+                "start": group[0]["start"],
+                "end": group[-1]["end"],
+                "text": " " + " ".join(w["word"] for w in group),
+                "avg_logprob": -0.1,
+            }
+            for i, group in enumerate(heard[j:j + 5] for j in range(0, len(heard), 5))
+        ]
+        return self._parse_verbose_response({
+            "text": "".join(s["text"] for s in segments),
+            "language": "english",
+            "duration": end - start,
+            "segments": segments,
+            "words": heard,
+        })
+
+
+def make_transcriber(script, total, fail_once=(), cache=None):
+    transcriber = ParallelTranscriber(
+        max_workers=3, transcriber=FakeWhisper(script, fail_once), cache=cache
+    )
+    transcriber.chunker = WindowChunker(total, chunk=20.0, overlap=3.0)
+    return transcriber
+
+
+# =============================================================================
+# Merging
+# =============================================================================
+
+class TestParallelTranscriber:
+    """Tests for pipelined transcription and seam dedup."""
+
+    def test_overlap_seams_are_deduplicated(self):
+        script, total = make_script()
+        transcriber = make_transcriber(script, total)
+
+        result = asyncio.run(transcriber.transcribe_large_file(b"", "audio.mp3"))
+
+        words = [w for s in result.segments for w in s.words]
+        assert [w["word"] for w in words] == [w for w, _, _ in script]
+        for merged, (_, start, end) in zip(words, script):
+            assert merged["start"] == pytest.approx(start)
+            assert merged["end"] == pytest.approx(end)
+        assert result.text.split() == [w for w, _, _ in script]
+        assert result.duration == pytest.approx(total)
+        assert [s.id for s in result.segments] == list(range(len(result.segments)))
+
+    def test_stream_yields_segments_in_order(self):
+        script, total = make_script()
+        transcriber = make_transcriber(script, total)
+
+        async def collect():
+            return [s async for s in transcriber.stream_transcript(b"", "audio.mp3")]
+
+        streamed = asyncio.run(collect())
+        starts = [s.start for s in streamed]
+        assert starts == sorted(starts)
+        assert " ".join(s.text for s in streamed).split() == [w for w, _, _ in script]
+
+    def test_retry_only_resends_failed_chunks(self):
+        script, total = make_script()
+        cache = ResultCache()
+        transcriber = make_transcriber(script, total, fail_once={37.0}, cache=cache)
+        whisper = transcriber.transcriber
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(transcriber.transcribe_large_file(b"", "audio.mp3"))
+        first_calls = list(whisper.calls)
+
+        whisper.calls.clear()
+        result = asyncio.run(transcriber.transcribe_large_file(b"", "audio.mp3"))
+
+        assert 37.0 in whisper.calls
+        assert not set(whisper.calls) & (set(first_calls) - {37.0})
+        assert result.text.split() == [w for w, _, _ in script]
+
+    def test_failure_closes_chunk_stream(self):
+        script, total = make_script()
+        transcriber = make_transcriber(script, total, fail_once={0.0})
+        chunker = transcriber.chunker = WindowChunker(total, chunk=20.0, overlap=3.0, delay=0.01)
+
+        async def run():
+            with pytest.raises(RuntimeError):
+                await transcriber.transcribe_large_file(b"", "audio.mp3")
+            return chunker.closed
+
+        assert asyncio.run(run())
+        assert len(transcriber.transcriber.calls) < len(chunker.windows)
+
+
+# =============================================================================
+# Response Parsing
+# =============================================================================
+
+class TestVerboseResponse:
+    """Tests for parsing Whisper verbose_json responses."""
+
+    def test_top_level_words_are_split_by_segment(self):
+        words = [
+            {"word": "Pour", "start": 0.0, "end": 0.4},
+            {"word": "level", "start": 0.4, "end": 0.8},
+            {"word": "three", "start": 0.8, "end": 1.3},
+            # Starts just before its segment; its middle falls inside
+            {"word": "Friday", "start": 1.38, "end": 1.9},
+            {"word": "morning", "start": 1.9, "end": 2.5},
+        ]
+        result = WhisperTranscriber(api_key="test")._parse_verbose_response({
+            "text": " Pour level three. Friday morning.",
+            "language": "english",
+            "duration": 2.5,
+            "segments": [
+                {"id": 0, "start": 0.0, "end": 1.4, "text": " Pour level three.", "avg_logprob": -0.2},
+                {"id": 1, "start": 1.4, "end": 2.5, "text": " Friday morning.", "avg_logprob": -0.3},
+            ],
+            "words": words,
+        })
+
+        assert [s.text for s in result.segments] == ["Pour level three.", "Friday morning."]
+        assert [[w["word"] for w in s.words] for s in result.segments] == [
+            ["Pour", "level", "three"], ["Friday", "morning"]
+        ]
+        assert result.word_count == 5
+
+    def test_segment_words_are_kept(self):
+        words = [{"word": "Hold", "start": 0.1, "end": 0.5}]
+        result = WhisperTranscriber(api_key="test")._parse_verbose_response({
+            "text": " Hold.",
+            "segments": [{"start": 0.0, "end": 0.6, "text": " Hold.", "words": words}],
+        })
+
+        assert result.segments[0].words == words
+        assert result.segments[0].words is not words
@@ -0,0 +1,154 @@
+"""
+Unit Tests for the Trigger Engine
+
+Tests run without Postgres/Redis dependencies.
+"""
+
+import asyncio
+
+import pytest
+
+from app.triggers import engine as engine_module
+from app.triggers.engine import EventType, TriggerEngine
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+@pytest.fixture(autouse=True)
+def local_events(monkeypatch):
+    """Process events on the local queue rather than Celery."""
+    monkeypatch.setattr(engine_module, "USE_DISTRIBUTED_TRIGGERS", False)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+# =============================================================================
+# Scheduling
+# =============================================================================
+
+class TestScheduling:
+    """Tests for priority order, consumers and per-type limits."""
+
+    def test_priority_order_and_fifo_within_priority(self):
+        async def scenario():
+            engine = TriggerEngine(num_workers=1)
+            seen = []
+
+            async def record(event):
+                seen.append((event.type, event.payload["i"]))
+
+            engine.register_all(record)
+            for i in range(3):
+                await engine.emit(engine.create_event(EventType.FILE_UPLOADED, "test", {"i": i}))
+            await engine.emit(engine.create_event(EventType.USER_LOGIN, "test", {"i": 0}))
+            await engine.emit(engine.create_event(EventType.SAFETY_VIOLATION_DETECTED, "test", {"i": 0}))
+
+            await engine.start()
+            await engine.stop()
+            return seen
+
+        assert run(scenario()) == [
+            (EventType.SAFETY_VIOLATION_DETECTED, 0),
+            (EventType.USER_LOGIN, 0),
+            (EventType.FILE_UPLOADED, 0),
+            (EventType.FILE_UPLOADED, 1),
+            (EventType.FILE_UPLOADED, 2),
+        ]
+
+    def test_type_limit_leaves_consumers_for_other_events(self):
+        async def scenario():
+            engine = TriggerEngine(num_workers=4, type_limits={EventType.FILE_UPLOADED: 2})
+            running, peak = 0, 0
+            release = asyncio.Event()
+            alerted = asyncio.Event()
+
+            async def slow_upload(event):
+                nonlocal running, peak
+                running += 1
+                peak = max(peak, running)
+                await release.wait()
+                running -= 1
+
+            async def alert(event):
+                alerted.set()
+
+            engine.register(EventType.FILE_UPLOADED, slow_upload)
+            engine.register(EventType.SAFETY_ALERT_CREATED, alert)
+            await engine.start()
+
+            for i in range(20):
+                await engine.emit(engine.create_event(EventType.FILE_UPLOADED, "test", {"i": i}))
+            await engine.emit(engine.create_event(EventType.SAFETY_ALERT_CREATED, "test", {}))
+
+            # Uploads are stuck, yet the alert is handled
+            await asyncio.wait_for(alerted.wait(), timeout=1)
+            assert engine.get_metrics()["queue_depth"] == 18
+
+            release.set()
+            await engine.stop()
+            return peak, engine.get_metrics()
+
+        peak, metrics = run(scenario())
+        assert peak == 2
+        assert metrics["events_processed"] == 21
+        assert metrics["queue_depth"] == 0
+
+
+# =============================================================================
+# Backpressure and Metrics
+# =============================================================================
+
+class TestBackpressure:
+    """Tests for emit backpressure and metric histograms."""
+
+    def test_emit_waits_when_queue_is_full(self):
+        async def scenario():
+            engine = TriggerEngine(num_workers=1, max_queue_size=3)
+
+            async def handler(event):
+                await asyncio.sleep(0)
+
+            engine.register(EventType.CUSTOM, handler)
+            for _ in range(3):
+                await engine.emit(engine.create_event(EventType.CUSTOM, "test", {}))
+
+            blocked = asyncio.ensure_future(engine.emit(engine.create_event(EventType.CUSTOM, "test", {})))
+            await asyncio.sleep(0.01)
+            assert not blocked.done()
+
+            await engine.start()
+            await asyncio.wait_for(blocked, timeout=1)
+            await engine.stop()
+            return engine.get_metrics()
+
+        metrics = run(scenario())
+        assert metrics["emit_backpressure_waits"] == 1
+        assert metrics["events_processed"] == 4
+
+    def test_histograms_are_reported(self):
+        async def scenario():
+            engine = TriggerEngine(num_workers=2)
+
+            async def handler(event):
+                await asyncio.sleep(0.002)
+
+            engine.register(EventType.CUSTOM, handler)
+            engine.register_all(handler)
+            await engine.start()
+            for _ in range(10):
+                await engine.emit(engine.create_event(EventType.CUSTOM, "test", {}))
+            await engine.stop()
+            return engine.get_metrics()["histograms"]
+
+        histograms = run(scenario())
+        assert histograms["queue_depth"]["count"] == 10
+        assert histograms["wait_time_seconds"]["count"] == 10
+        latency = histograms["handler_latency_seconds"]
+        assert latency["count"] == 20
+        assert latency["sum"] >= 0.04
+        assert latency["buckets"]["30.0"] == 20
+        assert latency["buckets"]["0.001"] == 0
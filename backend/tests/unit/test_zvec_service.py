@@ -0,0 +1,171 @@
+"""
+Unit Tests for ZVec Vector Store
+
+Tests run without Postgres/Redis dependencies.
+"""
+
+import json
+import math
+import os
+import random
+
+import pytest
+
+from app.services.zvec_service import NumpyZVecDB
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+DIMENSION = 16
+
+
+def random_vector(rng):
+    return [rng.uniform(-1, 1) for _ in range(DIMENSION)]
+
+
+def cosine(a, b):
+    dot = sum(x * y for x, y in zip(a, b))
+    return dot / (math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(x * x for x in b)))
+
+
+@pytest.fixture
+def documents():
+    rng = random.Random(4)
+    return {f"doc-{i}": random_vector(rng) for i in range(200)}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "zvec")
+
+
+# =============================================================================
+# Search
+# =============================================================================
+
+class TestNumpyZVecDB:
+    """Tests for the segment-backed vector store."""
+
+    def test_search_matches_cosine_ranking(self, db_path, documents):
+        os.makedirs(db_path)
+        db = NumpyZVecDB(db_path, DIMENSION)
+        db.add_many(list(documents), list(documents.values()), ["{}"] * len(documents))
+
+        query = random_vector(random.Random(9))
+        expected = sorted(documents, key=lambda d: cosine(query, documents[d]), reverse=True)[:5]
+        results = db.search(query, top_k=5)
+
+        assert [r["id"] for r in results] == expected
+        assert results[0]["score"] == pytest.approx(cosine(query, documents[expected[0]]), abs=1e-5)
+
+    def test_readding_supersedes_and_survives_reload(self, db_path, documents):
+        os.makedirs(db_path)
+        db = NumpyZVecDB(db_path, DIMENSION)
+        for doc_id, vector in documents.items():
+            db.add(doc_id, vector, json.dumps({"id": doc_id}))
+        db.add("doc-7", [1.0] * DIMENSION, '{"updated": true}')
+        db.close()
+
+        reopened = NumpyZVecDB(db_path, DIMENSION)
+        assert reopened.count() == len(documents)
+        hits = reopened.search([1.0] * DIMENSION, top_k=len(documents))
+        assert [r["id"] for r in hits].count("doc-7") == 1
+        assert hits[0] == {"id": "doc-7", "score": pytest.approx(1.0), "metadata": '{"updated": true}'}
+
+    def test_legacy_json_is_migrated(self, db_path, documents):
+        os.makedirs(db_path)
+        legacy = {doc_id: {"vector": v, "metadata": "{}"} for doc_id, v in documents.items()}
+        with open(os.path.join(db_path, "documents.json"), "w") as f:
+            json.dump({"documents": legacy}, f)
+
+        db = NumpyZVecDB(db_path, DIMENSION)
+        assert db.count() == len(documents)
+        assert db.search(documents["doc-3"], top_k=1)[0]["id"] == "doc-3"
+        assert not os.path.exists(os.path.join(db_path, "documents.json"))
+
+    def test_segments_are_compacted(self, db_path, documents, monkeypatch):
+        os.makedirs(db_path)
+        monkeypatch.setattr(NumpyZVecDB, "MAX_SEGMENTS", 2)
+        for doc_id, vector in list(documents.items())[:4]:
+            db = NumpyZVecDB(db_path, DIMENSION)
+            db.add(doc_id, vector, "{}")
+            db.add("shared", vector, "{}")
+            db.close()
+
+        db = NumpyZVecDB(db_path, DIMENSION)
+        segments = [n for n in os.listdir(db_path) if n.endswith(".jsonl")]
+        assert len(segments) <= 2
+        assert "segment-00000.jsonl" not in segments
+        assert db.count() == 5
+        assert len(db.search(documents["doc-0"], top_k=10)) == 5
+
+    def test_compaction_waits_for_live_writers(self, db_path, documents, monkeypatch):
+        os.makedirs(db_path)
+        monkeypatch.setattr(NumpyZVecDB, "MAX_SEGMENTS", 2)
+        items = list(documents.items())
+        for doc_id, vector in items[:2]:
+            db = NumpyZVecDB(db_path, DIMENSION)
+            db.add(doc_id, vector, "{}")
+            db.close()
+
+        writer = NumpyZVecDB(db_path, DIMENSION)
+        writer.add(*items[2], "{}")
+        with writer._lock():
+            NumpyZVecDB(db_path, DIMENSION)
+            assert len([n for n in os.listdir(db_path) if n.endswith(".jsonl")]) == 3
+
+        # Compaction removes the writer's open segment; its next add starts a new one
+        writer.add(*items[3], "{}")
+        NumpyZVecDB(db_path, DIMENSION)
+        writer.add(*items[4], "{}")
+        writer.close()
+
+        reopened = NumpyZVecDB(db_path, DIMENSION)
+        assert reopened.count() == 5
+        assert reopened.search(items[4][1], top_k=1)[0]["id"] == items[4][0]
+
+    def test_failed_load_does_not_reuse_segments(self, db_path, documents):
+        os.makedirs(db_path)
+        db = NumpyZVecDB(db_path, DIMENSION)
+        db.add("doc-0", documents["doc-0"], "{}")
+        db.close()
+        with open(os.path.join(db_path, "segment-00001.jsonl"), "w") as f:
+            f.write(json.dumps({"id": "broken"}) + "\n")
+        with open(os.path.join(db_path, "segment-00001.f32"), "wb") as f:
+            f.write(b"\0" * DIMENSION * 4)
+        with open(os.path.join(db_path, "segment-00000.jsonl")) as f:
+            before = f.read()
+
+        broken = NumpyZVecDB(db_path, DIMENSION)
+        assert broken.count() == 0
+        broken.add("doc-1", documents["doc-1"], "{}")
+        broken.close()
+
+        with open(os.path.join(db_path, "segment-00000.jsonl")) as f:
+            assert f.read() == before
+        assert os.path.exists(os.path.join(db_path, "segment-00002.jsonl"))
+
+    def test_single_adds_grow_flags_geometrically(self, db_path):
+        os.makedirs(db_path)
+        db = NumpyZVecDB(db_path, DIMENSION)
+        rng = random.Random(6)
+        latest, flag_arrays = {}, set()
+        for i in range(3000):
+            doc_id = f"doc-{rng.randrange(1500)}"
+            latest[doc_id] = random_vector(rng)
+            db.add(doc_id, latest[doc_id], "{}")
+            flag_arrays.add(id(db._live))
+
+        assert len(flag_arrays) <= 3
+        query = random_vector(rng)
+        expected = sorted(latest, key=lambda d: cosine(query, latest[d]), reverse=True)[:10]
+        assert [r["id"] for r in db.search(query, top_k=10)] == expected
+        assert len(db.search(query, top_k=5000)) == len(latest) == db.count()
+
+    def test_empty_store(self, db_path):
+        os.makedirs(db_path)
+        db = NumpyZVecDB(db_path, DIMENSION)
+        assert db.count() == 0
+        assert db.search([0.5] * DIMENSION) == []